@@ -26,3 +26,99 @@ KNOWLEDGE_BASE_PATH = "lancedb_data"
 
 # LanceDB Configuration
 LANCE_TABLE_NAME = "genesis_knowledge_base"
+
+# Knowledge Graph Configuration
+# Storage backend of the GraphStore: "sqlite" keeps the graph in an indexed on-disk store
+# that is opened without reading the graph into memory, "oxigraph" uses the Oxigraph
+# store (requires `oxrdflib`), and "memory" parses and rewrites the Turtle file.
+# The Turtle file stays the import/export format for all backends.
+GRAPH_STORE_BACKEND = "sqlite"
+KNOWLEDGE_GRAPH_PATH = "meta_context_studio/knowledge_base/ontologies/knowledge_graph.ttl"
+# The memory backend appends each save to a delta log next to the Turtle snapshot and
+# rewrites the snapshot in the background once the log reaches this size.
+GRAPH_DELTA_LOG_COMPACTION_BYTES = 8 * 1024 * 1024
+# "inline" copies each block's text into the graph; "reference" stores the block's chunk id
+# and reads the text from LanceDB when a document is materialized.
+GRAPH_CONTENT_MODE = "inline"
+# LRU sizes of GraphStore's parsed-query cache and of its SPARQL result cache.
+SPARQL_PREPARED_QUERY_CACHE_SIZE = 256
+SPARQL_RESULT_CACHE_SIZE = 1024
+# Paginated queries (knowledge base browser): rows per page, total rows a query may
+# return, and the evaluation time it may spend across all of its pages.
+SPARQL_PAGE_SIZE = 100
+SPARQL_MAX_ROWS = 10000
+SPARQL_QUERY_TIMEOUT_SECONDS = 10.0
+
+# Retrieval Configuration
+# Graph centrality computed by `compute-centrality` is stored in LanceDB and mixed into
+# the ranking as final = (1 - weight) * similarity + weight * centrality. 0 disables it.
+# It stays disabled by default: without links between documents, a document's centrality
+# only grows with its number of blocks and would act as a document-length prior.
+CENTRALITY_SCORES_PATH = "centrality_scores.npz"
+RETRIEVAL_CENTRALITY_WEIGHT = 0.0
+# Retrieval fetches top_k * this many candidates, which are reranked and diversified with
+# maximal marginal relevance: MMR_LAMBDA weighs relevance against novelty (1.0 disables
+# diversification), and a candidate whose cosine similarity to an already selected chunk
+# reaches DUPLICATE_SIMILARITY_THRESHOLD is dropped as a near-duplicate.
+RETRIEVAL_CANDIDATE_MULTIPLIER = 3
+MMR_LAMBDA = 0.7
+DUPLICATE_SIMILARITY_THRESHOLD = 0.95
+# Optional cross-encoder reranking: RERANKER_CANDIDATES nearest chunks are scored against
+# the query on the CPU. If scoring all of them would exceed the latency budget (estimated
+# from the measured time per pair), only the leading candidates are scored.
+RERANKER_ENABLED = False
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RERANKER_CANDIDATES = 50
+RERANKER_BATCH_SIZE = 32
+RERANKER_LATENCY_BUDGET_MS = 300.0
+RERANKER_INITIAL_MS_PER_PAIR = 4.0
+# Optional graph expansion: the vector hits are extended with related blocks from the
+# knowledge graph (e.g. the other sections of a hit's document), at most
+# GRAPH_EXPANSION_MAX_BLOCKS blocks within GRAPH_EXPANSION_MAX_HOPS hops, before reranking.
+# Hits are matched to graph nodes by their document_id and block_index columns.
+GRAPH_EXPANSION_ENABLED = False
+GRAPH_EXPANSION_MAX_HOPS = 2
+GRAPH_EXPANSION_MAX_BLOCKS = 5
+# Query embeddings are cached by normalized query text and embedding model: an in-process
+# LRU of this size, backed by a SQLite file that is shared across processes (None keeps
+# the cache in memory only). Entries older than the TTL are recomputed.
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+QUERY_EMBEDDING_CACHE_PATH = os.path.join(KNOWLEDGE_BASE_PATH, "query_cache.sqlite")
+# chat_with_kb answers a question from the semantic response cache when a cached question
+# is at least this similar (cosine) and the chunks behind its answer are unchanged.
+SEMANTIC_CACHE_SIMILARITY_THRESHOLD = 0.95
+SEMANTIC_CACHE_MAX_ENTRIES = 512
+# Retrieved chunks are summarized with at most this many LLM calls in flight. Summaries
+# are memoized by chunk text and prompt version in a SQLite file shared across processes.
+SUMMARIZATION_MAX_CONCURRENCY = 8
+SUMMARY_CACHE_SIZE = 4096
+SUMMARY_CACHE_PATH = os.path.join(KNOWLEDGE_BASE_PATH, "query_cache.sqlite")
+# `summarize-chunks` precomputes the LanceDB `summary` column in batches of this size,
+# starting at most this many LLM calls per minute.
+SUMMARY_INGEST_BATCH_SIZE = 64
+SUMMARY_REQUESTS_PER_MINUTE = 60
+# Retrieved context is packed into this many prompt tokens per retrieval (see
+# RelevanceFilter). Each item also reserves tokens for its header; an item that does not
+# fit is compressed into the remaining space if at least CONTEXT_MIN_COMPRESSED_TOKENS are left.
+CONTEXT_TOKEN_BUDGET = 3000
+CONTEXT_ITEM_OVERHEAD_TOKENS = 16
+CONTEXT_MIN_COMPRESSED_TOKENS = 64
+# tiktoken encoding used to count tokens, and the number of per-chunk counts cached.
+TOKENIZER_ENCODING = "cl100k_base"
+TOKEN_COUNT_CACHE_SIZE = 8192
+
+# Port of the local Prometheus-format metrics endpoint (/metrics) started by the chat UI,
+# exposing retrieval stage latency histograms. None disables it.
+METRICS_PORT = 9464
+
+# Ingestion Configuration
+# Number of documents buffered before the ingestion journal commits them in bulk
+# to LanceDB, the graph store and the processed-files log.
+INGESTION_COMMIT_BATCH_SIZE = 16
+
+# Dead-letter queue for documents that fail ingestion. Failed documents are skipped
+# until their retry is due; the delay doubles with every failed attempt.
+DEAD_LETTER_QUEUE_PATH = "dead_letter_queue.json"
+DEAD_LETTER_BASE_DELAY_SECONDS = 300
+DEAD_LETTER_MAX_DELAY_SECONDS = 24 * 60 * 60
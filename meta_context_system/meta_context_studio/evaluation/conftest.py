@@ -0,0 +1,22 @@
+import pytest
+
+from meta_context_studio.src.ingestion.data_models import ParsedDocument, ContentBlock, ContentBlockType, DocumentType
+
+
+@pytest.fixture
+def make_document():
+    """Builds ParsedDocuments with `blocks` paragraphs whose text is '<document_id> text <index>'."""
+
+    def make(document_id: str, blocks: int = 1) -> ParsedDocument:
+        return ParsedDocument(
+            document_id=document_id,
+            document_type=DocumentType.TECHNICAL_REPORT,
+            source_path=f"/reports/{document_id}.html",
+            metadata={"title": document_id},
+            content_blocks=[
+                ContentBlock(block_type=ContentBlockType.PARAGRAPH, content=f"{document_id} text {i}", block_index=i)
+                for i in range(blocks)
+            ],
+        )
+
+    return make
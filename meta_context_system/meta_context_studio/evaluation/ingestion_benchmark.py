@@ -0,0 +1,250 @@
+"""
+Ingestion throughput benchmarks.
+
+Generates a seeded synthetic corpus and drives `parse_html_document`, `IngestionPipeline`
+and `LanceDBIngestionPipeline` over it, reporting docs/s, chunks/s, per-stage latency and
+peak RSS. Each target runs in its own spawned process (not a fork, which would inherit the
+parent's memory) so peak RSS is measured per target, and writes its knowledge base, graph
+and dead-letter queue to a scratch directory. Results are written as JSON so that runs
+can be compared with `--compare`.
+
+Usage:
+    python -m meta_context_studio.evaluation.ingestion_benchmark --documents 20 --size-kb 512
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from meta_context_studio.evaluation.synthetic_corpus import SyntheticCorpusGenerator
+
+DEFAULT_RESULTS_DIR = "benchmark_results"
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of the current process in megabytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _throughput(count: int, seconds: float) -> float:
+    return count / seconds if seconds > 0 else 0.0
+
+
+def benchmark_parser(file_paths: List[str], work_dir: str) -> Dict[str, Any]:
+    """Benchmarks `parse_html_document` on its own."""
+    from meta_context_studio.src.ingestion.data_models import DocumentType
+    from meta_context_studio.src.ingestion.parsers.html_parser import parse_html_document
+    from meta_context_studio.src.utils.timing import StageTimer
+
+    timer = StageTimer()
+    blocks = 0
+    start = time.perf_counter()
+    for file_path in file_paths:
+        with timer.stage("read"):
+            with open(file_path, "r", encoding="utf-8") as f:
+                source_content = f.read()
+        with timer.stage("parse"):
+            parsed_document = parse_html_document(file_path, DocumentType.TECHNICAL_REPORT, source_content)
+        blocks += len(parsed_document.content_blocks)
+    elapsed = time.perf_counter() - start
+    return {
+        "documents": len(file_paths),
+        "chunks": blocks,
+        "elapsed_s": elapsed,
+        "docs_per_s": _throughput(len(file_paths), elapsed),
+        "chunks_per_s": _throughput(blocks, elapsed),
+        "stages": timer.summary(),
+    }
+
+
+def benchmark_ingestion_pipeline(file_paths: List[str], work_dir: str) -> Dict[str, Any]:
+    """Benchmarks the full `IngestionPipeline` (parse, journaled commit)."""
+    from meta_context_studio.src.ingestion.pipeline import IngestionPipeline
+
+    pipeline = IngestionPipeline(
+        ingestion_queue_path=os.path.dirname(file_paths[0]) if file_paths else work_dir,
+        processed_files_log=os.path.join(work_dir, "processed_files.log"),
+        staging_area_path=os.path.join(work_dir, "ingestion_done"),
+        dead_letter_queue_path=os.path.join(work_dir, "dead_letter_queue.json"),
+        knowledge_base_path=os.path.join(work_dir, "lancedb_benchmark"),
+        graph_path=os.path.join(work_dir, "knowledge_graph.ttl"),
+    )
+    start = time.perf_counter()
+    documents = pipeline.run_ingestion_pipeline(file_paths)
+    elapsed = time.perf_counter() - start
+    chunks = sum(len(document.content_blocks) for document in documents)
+    return {
+        "documents": len(documents),
+        "chunks": chunks,
+        "elapsed_s": elapsed,
+        "docs_per_s": _throughput(len(documents), elapsed),
+        "chunks_per_s": _throughput(chunks, elapsed),
+        "stages": pipeline.stage_timer.summary(),
+    }
+
+
+def benchmark_lancedb_pipeline(file_paths: List[str], work_dir: str) -> Dict[str, Any]:
+    """Benchmarks `LanceDBIngestionPipeline.ingest_files` against a scratch database."""
+    from meta_context_studio.src.lancedb_ingestion.ingestion_pipeline import LanceDBIngestionPipeline
+
+    pipeline = LanceDBIngestionPipeline(
+        db_path=os.path.join(work_dir, "lancedb_benchmark"),
+        table_name="benchmark_documents",
+    )
+    rows_before = pipeline.table.count_rows()
+    start = time.perf_counter()
+    pipeline.ingest_files(file_paths)
+    elapsed = time.perf_counter() - start
+    chunks = pipeline.table.count_rows() - rows_before
+    return {
+        "documents": len(file_paths),
+        "chunks": chunks,
+        "elapsed_s": elapsed,
+        "docs_per_s": _throughput(len(file_paths), elapsed),
+        "chunks_per_s": _throughput(chunks, elapsed),
+        "stages": {},
+    }
+
+
+BENCHMARK_TARGETS: Dict[str, Callable[[List[str], str], Dict[str, Any]]] = {
+    "parse_html_document": benchmark_parser,
+    "ingestion_pipeline": benchmark_ingestion_pipeline,
+    "lancedb_ingestion_pipeline": benchmark_lancedb_pipeline,
+}
+
+
+def _run_target(target: str, file_paths: List[str], work_dir: str) -> Dict[str, Any]:
+    """Entry point of the isolated worker process for one target."""
+    try:
+        result = BENCHMARK_TARGETS[target](file_paths, work_dir)
+        result["status"] = "ok"
+    except Exception as e:
+        result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(
+    targets: List[str],
+    num_documents: int,
+    generator: SyntheticCorpusGenerator,
+    results_dir: str = DEFAULT_RESULTS_DIR,
+) -> str:
+    """
+    Generates the corpus, runs every target in a fresh process and writes the results.
+
+    Returns:
+        str: The path of the JSON results file.
+    """
+    with tempfile.TemporaryDirectory(prefix="ingestion_benchmark_") as work_dir:
+        corpus_dir = os.path.join(work_dir, "corpus")
+        file_paths = generator.write_corpus(corpus_dir, num_documents)
+        corpus_bytes = sum(os.path.getsize(path) for path in file_paths)
+
+        results = {}
+        for target in targets:
+            target_dir = os.path.join(work_dir, target)
+            os.makedirs(target_dir, exist_ok=True)
+            print(f"Benchmark: running '{target}' on {num_documents} documents...")
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                results[target] = executor.submit(_run_target, target, file_paths, target_dir).result()
+            print(f"Benchmark: '{target}' finished: {json.dumps({k: v for k, v in results[target].items() if k != 'stages'})}")
+
+    report = {
+        "timestamp": datetime.datetime.now().strftime("%Y%m%dT%H%M%S"),
+        "git_commit": _git_commit(),
+        "python_version": platform.python_version(),
+        "platform": f"{platform.system()} {platform.release()}",
+        "corpus": {
+            "seed": generator.seed,
+            "documents": num_documents,
+            "target_size_kb": generator.target_size_kb,
+            "nesting_depth": generator.nesting_depth,
+            "code_ratio": generator.code_ratio,
+            "table_ratio": generator.table_ratio,
+            "total_mb": corpus_bytes / (1024 * 1024),
+        },
+        "results": results,
+    }
+    os.makedirs(results_dir, exist_ok=True)
+    results_path = os.path.join(results_dir, f"ingestion_benchmark_{report['timestamp']}.json")
+    with open(results_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return results_path
+
+
+def compare_results(baseline_path: str, candidate_path: str) -> Dict[str, Dict[str, float]]:
+    """
+    Compares two result files target by target.
+
+    Returns:
+        Dict[str, Dict[str, float]]: For each target present in both runs, the ratio
+        candidate / baseline of docs/s, chunks/s and peak RSS.
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    with open(candidate_path, "r", encoding="utf-8") as f:
+        candidate = json.load(f)["results"]
+
+    comparison = {}
+    for target in sorted(set(baseline) & set(candidate)):
+        ratios = {}
+        for metric in ("docs_per_s", "chunks_per_s", "peak_rss_mb"):
+            before, after = baseline[target].get(metric), candidate[target].get(metric)
+            if before and after is not None:
+                ratios[metric] = after / before
+        comparison[target] = ratios
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion throughput on a synthetic corpus.")
+    parser.add_argument("--targets", nargs="+", choices=sorted(BENCHMARK_TARGETS), default=["parse_html_document", "ingestion_pipeline"])
+    parser.add_argument("--documents", type=int, default=10, help="Number of synthetic reports to generate.")
+    parser.add_argument("--size-kb", type=int, default=256, help="Approximate size of each report.")
+    parser.add_argument("--nesting-depth", type=int, default=3)
+    parser.add_argument("--code-ratio", type=float, default=0.1)
+    parser.add_argument("--table-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", type=str, default=DEFAULT_RESULTS_DIR)
+    parser.add_argument("--compare", type=str, default=None, help="Baseline results JSON to compare this run against.")
+    args = parser.parse_args()
+
+    generator = SyntheticCorpusGenerator(
+        seed=args.seed,
+        target_size_kb=args.size_kb,
+        nesting_depth=args.nesting_depth,
+        code_ratio=args.code_ratio,
+        table_ratio=args.table_ratio,
+    )
+    results_path = run_benchmarks(args.targets, args.documents, generator, args.output_dir)
+    print(f"Benchmark results written to {results_path}")
+
+    if args.compare:
+        for target, ratios in compare_results(args.compare, results_path).items():
+            formatted = ", ".join(f"{metric} x{ratio:.2f}" for metric, ratio in ratios.items())
+            print(f"  {target}: {formatted}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,334 @@
-"""Implements RAG evaluation metrics."""
+"""
+Implements RAG evaluation metrics.
+
+Builds a labeled query set from the reports in `ingestion_done`: every section heading
+becomes a query whose relevant passage is the section it introduces. The query set is
+run against one or more retriever configurations, reporting recall@k, MRR and nDCG@k
+together with per-query latency percentiles and throughput. Results are written as JSON
+so that runs can be compared with `--compare`.
+
+A retrieved chunk counts as relevant when it comes from the query's document and most of
+its words (or most of the section's, for short sections) occur in the section. Each query
+has one relevant section, so recall@k is the share of queries whose section appears in the
+top k, and the ideal DCG is 1.
+
+Usage:
+    python -m meta_context_studio.evaluation.rag_evaluator --configs vector retriever --k 5
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from meta_context_studio.evaluation.ingestion_benchmark import _git_commit
+from meta_context_studio.src.utils.timing import percentile
+
+DEFAULT_CORPUS_DIR = "ingestion_done"
+DEFAULT_RESULTS_DIR = "benchmark_results"
+
+_BLOCK_TAGS = ["h1", "h2", "h3", "h4", "h5", "h6", "p", "pre", "li", "div"]
+# Numbered section headings of the PDF exports, e.g. "2.1. Comparative Analysis of Models"
+_NUMBERED_HEADING = re.compile(r"^(\d+(?:\.\d+)*)\.?\s+(\S.*)$")
+_WORD = re.compile(r"\w+")
+
+
+def _words(text: str) -> set:
+    return {word for word in _WORD.findall(text.lower()) if len(word) > 2}
+
+
+def _heading_text(element, text: str) -> Optional[str]:
+    """The heading of a block without its numbering, or None if the block is not a heading."""
+    match = _NUMBERED_HEADING.match(text)
+    if element.name.startswith("h"):
+        return match.group(2) if match else text
+    if not match or len(text) > 100 or text.endswith(",") or "accessed" in text:
+        return None
+    # Numbered list items in running text are mostly lower case; headings are title case
+    words = [word for word in match.group(2).split() if len(word) > 3]
+    if not words or sum(word[0].isupper() for word in words) / len(words) < 0.5:
+        return None
+    return match.group(2)
+
+
+def extract_sections(html: str, min_section_words: int = 40) -> List[Dict[str, str]]:
+    """
+    Splits an HTML report into (heading, section) pairs.
+
+    Only leaf blocks are read, so the nested wrapper divs of the PDF exports do not repeat
+    the page text. `<h1>`-`<h6>` elements and numbered, title-cased lines are headings.
+
+    Args:
+        html (str): The report's HTML.
+        min_section_words (int): Sections with fewer words are skipped.
+
+    Returns:
+        List[Dict[str, str]]: `heading` and `section` of every section, in document order.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    sections = []
+    heading, lines = None, []
+
+    def flush():
+        if heading and len(" ".join(lines).split()) >= min_section_words:
+            sections.append({"heading": heading, "section": " ".join(lines)})
+
+    for element in soup.find_all(_BLOCK_TAGS):
+        if element.find(_BLOCK_TAGS) is not None:
+            continue
+        text = element.get_text(separator=" ", strip=True)
+        if not text:
+            continue
+        if text.lower().startswith("works cited"):
+            break
+        next_heading = _heading_text(element, text)
+        if next_heading:
+            flush()
+            heading, lines = next_heading, []
+        elif heading:
+            lines.append(text)
+    flush()
+    return sections
+
+
+def build_query_set(
+    corpus_dir: str = DEFAULT_CORPUS_DIR,
+    max_queries_per_document: Optional[int] = None,
+    min_section_words: int = 40,
+    seed: int = 42,
+) -> List[Dict[str, str]]:
+    """
+    Builds labeled queries (heading -> section) from every HTML report in a directory.
+
+    Args:
+        corpus_dir (str): Directory of processed reports.
+        max_queries_per_document (Optional[int]): Samples this many sections per report.
+        min_section_words (int): Sections with fewer words are skipped.
+        seed (int): Seed for sampling sections, so that runs use the same query set.
+
+    Returns:
+        List[Dict[str, str]]: `query`, `source` (the report's file name) and `section`.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for file_name in sorted(os.listdir(corpus_dir)):
+        if not file_name.lower().endswith((".html", ".htm")):
+            continue
+        with open(os.path.join(corpus_dir, file_name), "r", encoding="utf-8") as f:
+            sections = extract_sections(f.read(), min_section_words)
+        if max_queries_per_document is not None and len(sections) > max_queries_per_document:
+            sampled = sorted(rng.sample(range(len(sections)), max_queries_per_document))
+            sections = [sections[index] for index in sampled]
+        for section in sections:
+            queries.append({"query": section["heading"], "source": file_name, "section": section["section"]})
+    return queries
+
+
+def is_relevant(result: Dict[str, Any], labeled_query: Dict[str, str], min_overlap: float = 0.5) -> bool:
+    """Whether a retrieved row comes from the query's document and overlaps its section."""
+    if os.path.basename(result.get("source") or "") != labeled_query["source"]:
+        return False
+    chunk_words, section_words = _words(result.get("text") or ""), _words(labeled_query["section"])
+    if not chunk_words or not section_words:
+        return False
+    return len(chunk_words & section_words) / min(len(chunk_words), len(section_words)) >= min_overlap
+
+
+def ranking_metrics(relevance: List[bool], k: int) -> Dict[str, float]:
+    """
+    Recall@k, reciprocal rank and nDCG@k of one ranked result list with a single relevant item.
+
+    Args:
+        relevance (List[bool]): Whether each result, best first, matches the relevant item.
+        k (int): Cutoff rank.
+    """
+    first = next((rank for rank, relevant in enumerate(relevance[:k], start=1) if relevant), None)
+    if first is None:
+        return {"recall": 0.0, "mrr": 0.0, "ndcg": 0.0}
+    return {"recall": 1.0, "mrr": 1.0 / first, "ndcg": 1.0 / math.log2(first + 1)}
+
+
+def evaluate(
+    search_fn: Callable[[str, int], List[Dict[str, Any]]],
+    queries: List[Dict[str, str]],
+    k: int = 5,
+) -> Dict[str, Any]:
+    """
+    Runs every labeled query through a retriever and aggregates quality and latency.
+
+    Args:
+        search_fn (Callable[[str, int], List[Dict[str, Any]]]): Returns the ranked rows
+            (with `text` and `source`) for a query and a number of results.
+        queries (List[Dict[str, str]]): Labeled queries from `build_query_set`.
+        k (int): Cutoff rank of the metrics.
+
+    Returns:
+        Dict[str, Any]: Mean recall@k, MRR and nDCG@k, latency percentiles in
+        milliseconds, queries per second and the number of failed queries.
+    """
+    totals = {"recall": 0.0, "mrr": 0.0, "ndcg": 0.0}
+    latencies = []
+    failed = 0
+    start = time.perf_counter()
+    for labeled_query in queries:
+        query_start = time.perf_counter()
+        try:
+            results = search_fn(labeled_query["query"], k)
+        except Exception as e:
+            print(f"RAGEvaluator: Query '{labeled_query['query']}' failed: {type(e).__name__}: {e}")
+            failed += 1
+            continue
+        latencies.append(time.perf_counter() - query_start)
+        for metric, value in ranking_metrics([is_relevant(result, labeled_query) for result in results], k).items():
+            totals[metric] += value
+    elapsed = time.perf_counter() - start
+
+    # Failed queries count as misses
+    count = max(len(queries), 1)
+    ordered = sorted(latencies)
+    return {
+        "queries": len(queries),
+        "failed": failed,
+        f"recall@{k}": totals["recall"] / count,
+        "mrr": totals["mrr"] / count,
+        f"ndcg@{k}": totals["ndcg"] / count,
+        "latency_ms": {
+            "p50": percentile(ordered, 50) * 1000,
+            "p95": percentile(ordered, 95) * 1000,
+            "p99": percentile(ordered, 99) * 1000,
+            "mean": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+        },
+        "queries_per_s": len(latencies) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def vector_search() -> Callable[[str, int], List[Dict[str, Any]]]:
+    """Plain LanceDB nearest-neighbour search."""
+    from meta_context_studio.config import settings
+    from meta_context_studio.src.lancedb_ingestion.ingestion_pipeline import LanceDBIngestionPipeline
+
+    pipeline = LanceDBIngestionPipeline(db_path=settings.KNOWLEDGE_BASE_PATH, table_name=settings.LANCE_TABLE_NAME)
+    return lambda query, k: pipeline.search(query, limit=k)
+
+
+def retriever_search() -> Callable[[str, int], List[Dict[str, Any]]]:
+    """ContextRetriever with MMR diversification and the configured centrality weight (0 by default)."""
+    from meta_context_studio.src.context_management.retrieval.context_retriever import ContextRetriever
+
+    return ContextRetriever(rerank=False).search
+
+
+def reranked_search() -> Callable[[str, int], List[Dict[str, Any]]]:
+    """ContextRetriever with the cross-encoder reranking stage."""
+    from meta_context_studio.src.context_management.retrieval.context_retriever import ContextRetriever
+
+    return ContextRetriever(rerank=True).search
+
+
+RETRIEVER_CONFIGS: Dict[str, Callable[[], Callable[[str, int], List[Dict[str, Any]]]]] = {
+    "vector": vector_search,
+    "retriever": retriever_search,
+    "reranked": reranked_search,
+}
+
+
+def run_evaluation(
+    configs: List[str],
+    queries: List[Dict[str, str]],
+    k: int = 5,
+    results_dir: str = DEFAULT_RESULTS_DIR,
+) -> str:
+    """
+    Evaluates every retriever configuration on the same query set and writes the results.
+
+    Returns:
+        str: The path of the JSON results file.
+    """
+    results = {}
+    for config in configs:
+        print(f"RAGEvaluator: Evaluating '{config}' on {len(queries)} queries...")
+        try:
+            results[config] = {"status": "ok", **evaluate(RETRIEVER_CONFIGS[config](), queries, k)}
+        except Exception as e:
+            results[config] = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+        print(f"RAGEvaluator: '{config}' finished: {json.dumps(results[config])}")
+
+    report = {
+        "timestamp": datetime.datetime.now().strftime("%Y%m%dT%H%M%S"),
+        "git_commit": _git_commit(),
+        "k": k,
+        "query_set": {
+            "queries": len(queries),
+            "documents": len({labeled_query["source"] for labeled_query in queries}),
+        },
+        "results": results,
+    }
+    os.makedirs(results_dir, exist_ok=True)
+    results_path = os.path.join(results_dir, f"rag_evaluation_{report['timestamp']}.json")
+    with open(results_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return results_path
+
+
+def compare_results(baseline_path: str, candidate_path: str) -> Dict[str, Dict[str, float]]:
+    """
+    Compares two result files configuration by configuration.
+
+    Returns:
+        Dict[str, Dict[str, float]]: For each configuration present in both runs, the
+        difference candidate - baseline of every quality metric and the ratio candidate /
+        baseline of p95 latency and throughput.
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    with open(candidate_path, "r", encoding="utf-8") as f:
+        candidate = json.load(f)["results"]
+
+    comparison = {}
+    for config in sorted(set(baseline) & set(candidate)):
+        before, after = baseline[config], candidate[config]
+        changes = {}
+        for metric in sorted(set(before) & set(after)):
+            if metric.startswith(("recall@", "ndcg@")) or metric == "mrr":
+                changes[f"{metric} delta"] = after[metric] - before[metric]
+        if before.get("latency_ms", {}).get("p95") and "latency_ms" in after:
+            changes["p95 latency x"] = after["latency_ms"]["p95"] / before["latency_ms"]["p95"]
+        if before.get("queries_per_s") and "queries_per_s" in after:
+            changes["queries_per_s x"] = after["queries_per_s"] / before["queries_per_s"]
+        comparison[config] = changes
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate retrieval quality and latency on headings from the processed reports.")
+    parser.add_argument("--configs", nargs="+", choices=sorted(RETRIEVER_CONFIGS), default=["vector", "retriever"])
+    parser.add_argument("--corpus-dir", type=str, default=DEFAULT_CORPUS_DIR)
+    parser.add_argument("--k", type=int, default=5, help="Cutoff rank of recall, MRR and nDCG.")
+    parser.add_argument("--max-queries-per-document", type=int, default=None)
+    parser.add_argument("--min-section-words", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", type=str, default=DEFAULT_RESULTS_DIR)
+    parser.add_argument("--compare", type=str, default=None, help="Baseline results JSON to compare this run against.")
+    args = parser.parse_args()
+
+    queries = build_query_set(args.corpus_dir, args.max_queries_per_document, args.min_section_words, args.seed)
+    if not queries:
+        print(f"RAGEvaluator: No sections found in '{args.corpus_dir}'.")
+        return
+    results_path = run_evaluation(args.configs, queries, args.k, args.output_dir)
+    print(f"Evaluation results written to {results_path}")
+
+    if args.compare:
+        for config, changes in compare_results(args.compare, results_path).items():
+            formatted = ", ".join(f"{name} {value:+.3f}" if "delta" in name else f"{name}{value:.2f}" for name, value in changes.items())
+            print(f"  {config}: {formatted}")
+
+
+if __name__ == "__main__":
+    main()
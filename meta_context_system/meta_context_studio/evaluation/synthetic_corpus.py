@@ -0,0 +1,146 @@
+"""Seeded generator for synthetic HTML reports shaped like the `ingestion_done` exports."""
+import base64
+import os
+import random
+from typing import List
+
+# Vocabulary drawn from the kind of reports that land in the ingestion queue.
+_WORDS = (
+    "agent context engineering knowledge graph vector embedding retrieval pipeline ingestion "
+    "orchestration lancedb ontology schema latency throughput semantic chunk document workflow "
+    "evaluation reasoning prompt architecture component framework index query cache storage "
+    "metadata governance policy interface model inference generalization encapsulation process"
+).split()
+
+_CODE_LINES = (
+    "def ingest(path: str) -> None:",
+    "    table = db.open_table(\"genesis_knowledge_base\")",
+    "    for chunk in splitter.split(text):",
+    "        vectors.append(model.encode(chunk))",
+    "results = table.search(query_vector).limit(5).to_list()",
+    "graph.add((doc_uri, RDF.type, GENESIS.Document))",
+    "return {\"status\": \"ok\", \"count\": len(rows)}",
+)
+
+# The real exports are PDF-to-HTML conversions: a large inline style sheet with
+# embedded fonts, then absolutely positioned page divs full of styled spans.
+_STYLE_HEADER = """<STYLE>
+.stl_01 { position: absolute; white-space: nowrap; }
+.stl_02 { font-size: 1em; line-height: 0.0em; width: 51em; height: 66em; border-style: none; display: block; margin: 0em; }
+.stl_03 { position: relative; }
+.stl_05 { position: relative; width: 51em; }
+@font-face { font-family:"SYNTH+Arial"; src:url("data:application/octet-stream;base64,%s") format("woff"); }
+</STYLE>"""
+
+
+class SyntheticCorpusGenerator:
+    """
+    Produces deterministic HTML reports for benchmarking the ingestion path.
+
+    Args:
+        seed (int): Seed for the random generator; the same seed yields the same corpus.
+        target_size_kb (int): Approximate size of each generated report in kilobytes.
+        nesting_depth (int): How many wrapper divs enclose each content block.
+        code_ratio (float): Fraction of blocks emitted as `<pre>` code blocks.
+        table_ratio (float): Fraction of blocks emitted as `<table>` blocks.
+        font_blob_kb (int): Size of the embedded base64 font, which the real exports carry.
+    """
+
+    def __init__(
+        self,
+        seed: int = 42,
+        target_size_kb: int = 256,
+        nesting_depth: int = 3,
+        code_ratio: float = 0.1,
+        table_ratio: float = 0.05,
+        font_blob_kb: int = 32,
+    ):
+        if code_ratio + table_ratio > 1:
+            raise ValueError("code_ratio and table_ratio must not add up to more than 1.")
+        self.seed = seed
+        self.target_size_kb = target_size_kb
+        self.nesting_depth = nesting_depth
+        self.code_ratio = code_ratio
+        self.table_ratio = table_ratio
+        self.font_blob_kb = font_blob_kb
+
+    def _sentence(self, rng: random.Random, min_words: int = 8, max_words: int = 24) -> str:
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(min_words, max_words))]
+        return " ".join(words).capitalize() + "."
+
+    def _paragraph_block(self, rng: random.Random, top: float) -> str:
+        spans = "".join(
+            f'<span class="stl_{rng.randint(10, 40):02d}">{self._sentence(rng)} </span>'
+            for _ in range(rng.randint(2, 6))
+        )
+        return f'<div class="stl_01" style="left:5.6em;top:{top:.4f}em;">{spans}</div>'
+
+    def _heading_block(self, rng: random.Random, section: int) -> str:
+        level = rng.randint(1, 3)
+        return f"<h{level}>{section}. {self._sentence(rng, 3, 7)[:-1]}</h{level}>"
+
+    def _code_block(self, rng: random.Random) -> str:
+        lines = [rng.choice(_CODE_LINES) for _ in range(rng.randint(3, 12))]
+        return "<pre><code>" + "\n".join(lines) + "</code></pre>"
+
+    def _table_block(self, rng: random.Random) -> str:
+        columns = rng.randint(2, 5)
+        header = "".join(f"<th>{rng.choice(_WORDS)}</th>" for _ in range(columns))
+        rows = "".join(
+            "<tr>" + "".join(f"<td>{rng.choice(_WORDS)} {rng.randint(1, 999)}</td>" for _ in range(columns)) + "</tr>"
+            for _ in range(rng.randint(2, 8))
+        )
+        return f"<table><tr>{header}</tr>{rows}</table>"
+
+    def _nest(self, html: str) -> str:
+        for depth in range(self.nesting_depth):
+            html = f'<div class="stl_{depth + 3:02d}">{html}</div>'
+        return html
+
+    def generate_report(self, index: int) -> str:
+        """Generates the HTML of the `index`-th report of the corpus."""
+        rng = random.Random(f"{self.seed}:{index}")
+        font_blob = base64.b64encode(rng.randbytes(self.font_blob_kb * 768)).decode("ascii")
+        parts: List[str] = [
+            '<!DOCTYPE html><!--[if IE]>  <html class="stl_ie"> <![endif]-->',
+            "<html><head><meta charset=\"utf-8\" />",
+            f"<title>Synthetic Report {index}: {self._sentence(rng, 3, 6)[:-1]}</title>",
+            _STYLE_HEADER % font_blob,
+            '</head><body><div class="stl_ stl_02">',
+        ]
+        size = sum(len(part) for part in parts)
+        target = self.target_size_kb * 1024
+        section, top = 0, 0.0
+        while size < target:
+            roll = rng.random()
+            if roll < self.code_ratio:
+                block = self._code_block(rng)
+            elif roll < self.code_ratio + self.table_ratio:
+                block = self._table_block(rng)
+            elif roll < self.code_ratio + self.table_ratio + 0.08:
+                section += 1
+                block = self._heading_block(rng, section)
+            else:
+                top += 1.4
+                block = self._paragraph_block(rng, top)
+            block = self._nest(block)
+            parts.append(block)
+            size += len(block)
+        parts.append("</div></body></html>")
+        return "".join(parts)
+
+    def write_corpus(self, output_dir: str, num_documents: int) -> List[str]:
+        """
+        Writes `num_documents` reports to `output_dir`.
+
+        Returns:
+            List[str]: The paths of the generated files.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        for index in range(num_documents):
+            path = os.path.join(output_dir, f"synthetic_report_{self.seed}_{index:04d}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.generate_report(index))
+            paths.append(path)
+        return paths
@@ -0,0 +1,28 @@
+import numpy as np
+
+from meta_context_studio.src.knowledge_base.centrality import CentralityScores
+from meta_context_studio.src.knowledge_base.graph_adjacency import GraphAdjacency
+from meta_context_studio.src.knowledge_base.graph_store import GraphStore
+
+
+def test_document_scores_and_warm_start(tmp_path, make_document):
+    store = GraphStore(str(tmp_path / "knowledge_graph.ttl"), backend="memory")
+    store.add_document_to_graph(make_document("large", blocks=8))
+    store.add_document_to_graph(make_document("small", blocks=2))
+    adjacency = GraphAdjacency(store)
+
+    scores, cold_iterations = CentralityScores.compute(adjacency)
+    assert np.isclose(scores.pagerank.sum(), 1.0)
+    documents = scores.document_scores(store)
+    assert documents["/reports/large.html"] == (1.0, 1.0)
+    assert documents["/reports/small.html"][0] < 1.0
+
+    scores_path = str(tmp_path / "centrality.npz")
+    scores.save(scores_path)
+    _, unchanged_iterations = CentralityScores.compute(adjacency, previous=CentralityScores.load(scores_path))
+    assert unchanged_iterations < cold_iterations
+
+    store.add_document_to_graph(make_document("other", blocks=2))
+    rescored, warm_iterations = CentralityScores.compute(adjacency, previous=CentralityScores.load(scores_path))
+    assert warm_iterations <= cold_iterations
+    assert "/reports/other.html" in rescored.document_scores(store)
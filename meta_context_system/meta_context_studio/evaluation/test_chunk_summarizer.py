@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+from meta_context_studio.src.context_management.retrieval.chunk_summarizer import ChunkSummarizer
+from meta_context_studio.src.utils.persistent_cache import PersistentCache
+
+
+def test_chunks_are_summarized_concurrently_and_once(tmp_path):
+    calls = []
+
+    async def summarize(text: str) -> str:
+        calls.append(text)
+        await asyncio.sleep(0.1)
+        if text == "bad":
+            raise RuntimeError("LLM unavailable")
+        return f"summary of {text}"
+
+    cache = PersistentCache("chunk_summaries", db_path=str(tmp_path / "cache.sqlite"))
+    summarizer = ChunkSummarizer(summarize, prompt_version="v1", max_concurrency=5, cache=cache)
+
+    started = time.perf_counter()
+    summaries = summarizer.summarize(["a", "b", "c", "a", "bad"])
+    assert time.perf_counter() - started < 0.3
+    assert summaries == ["summary of a", "summary of b", "summary of c", "summary of a", "bad"]
+
+    assert summarizer.summarize(["c", "a"]) == ["summary of c", "summary of a"]
+    assert sorted(calls) == ["a", "b", "bad", "c"]
+
+    ChunkSummarizer(summarize, prompt_version="v2", cache=cache).summarize(["a"])
+    assert len(calls) == 5
+
+
+class FakeVectorStore:
+    def __init__(self, texts):
+        self.texts = texts
+        self.summaries = {}
+        self.writes = 0
+
+    def chunk_ids_without_summary(self):
+        return [chunk_id for chunk_id in self.texts if chunk_id not in self.summaries]
+
+    def get_texts_by_chunk_ids(self, chunk_ids):
+        return {chunk_id: self.texts[chunk_id] for chunk_id in chunk_ids}
+
+    def update_summaries(self, summaries):
+        self.writes += 1
+        self.summaries.update(summaries)
+        return len(summaries)
+
+
+def test_pending_chunks_are_summarized_in_checkpointed_batches(tmp_path):
+    async def summarize(text: str) -> str:
+        if text == "bad":
+            raise RuntimeError("LLM unavailable")
+        return text.upper()
+
+    store = FakeVectorStore({"doc:0": "a", "doc:1": "b", "doc:2": "bad", "doc:3": "c"})
+    cache = PersistentCache("chunk_summaries", db_path=str(tmp_path / "cache.sqlite"))
+    summarizer = ChunkSummarizer(summarize, prompt_version="v1", cache=cache, requests_per_minute=6000)
+
+    assert summarizer.summarize_pending(store, batch_size=2) == 3
+    assert store.writes == 2
+    assert store.summaries == {"doc:0": "A", "doc:1": "B", "doc:3": "C"}
+    assert store.chunk_ids_without_summary() == ["doc:2"]
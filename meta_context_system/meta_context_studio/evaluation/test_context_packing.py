@@ -0,0 +1,41 @@
+from meta_context_studio.src.context_management.heuristics.relevance_filter import RelevanceFilter
+from meta_context_studio.src.context_management.heuristics.summarizer import Summarizer
+from meta_context_studio.src.context_management.heuristics.token_counter import TokenCounter
+
+
+def whitespace_tokens(text: str):
+    return text.split()
+
+
+def test_greedy_packing_stays_within_the_budget():
+    counter = TokenCounter(encode=whitespace_tokens)
+    relevance_filter = RelevanceFilter(token_budget=40, per_item_overhead=2, min_compressed_tokens=5, token_counter=counter)
+    items = [
+        " ".join(["alpha"] * 10),
+        " ".join(["beta"] * 30),
+        "LanceDB stores chunks. " + " ".join(["filler"] * 20) + ". Graphs link chunks to documents.",
+    ]
+
+    packed = relevance_filter.pack(items, "how are chunks linked", scores=[0.9, 0.5, 0.8])
+    assert [index for index, _ in packed] == [0, 2]
+    assert packed[0][1] == items[0]
+    assert packed[1][1] == "LanceDB stores chunks. Graphs link chunks to documents."
+    assert sum(counter.count(text) + 2 for _, text in packed) <= 40
+
+
+def test_extractive_summary_prefers_query_sentences_and_counts_are_cached():
+    calls = []
+
+    def encode(text):
+        calls.append(text)
+        return text.split()
+
+    counter = TokenCounter(encode=encode)
+    text = "The ingestion journal commits batches. Centrality ranks documents by links. Tokens are counted once."
+    summary = Summarizer(counter).summarize(text, max_tokens=6, query="centrality of documents")
+    assert summary == "Centrality ranks documents by links."
+
+    counted = len(calls)
+    counter.count(text)
+    assert len(calls) == counted
+    assert counter.truncate("one two three four", 2) == "one two"
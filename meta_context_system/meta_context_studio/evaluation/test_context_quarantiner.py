@@ -0,0 +1,21 @@
+import numpy as np
+
+from meta_context_studio.src.context_management.heuristics.context_quarantiner import ContextQuarantiner
+
+
+def test_mmr_drops_near_duplicates_and_prefers_novel_context():
+    embeddings = np.array([
+        [1.0, 0.0, 0.0],
+        [0.99, 0.05, 0.0],  # overlapping chunk of the first passage
+        [0.8, 0.6, 0.0],
+        [0.0, 0.0, 1.0],
+    ])
+    relevance = [0.9, 0.89, 0.8, 0.5]
+
+    quarantiner = ContextQuarantiner(mmr_lambda=0.5, duplicate_threshold=0.95)
+    assert quarantiner.select(embeddings, relevance=relevance) == [0, 3, 2]
+    assert ContextQuarantiner(mmr_lambda=1.0, duplicate_threshold=1.1).select(embeddings, relevance=relevance, k=3) == [0, 1, 2]
+
+    items = ["Chunk A", "chunk  a", "Chunk B"]
+    assert quarantiner.quarantine(items) == ["Chunk A", "Chunk B"]
+    assert quarantiner.quarantine(["a", "a'", "c", "d"], embeddings=embeddings, relevance=relevance, k=2) == ["a", "d"]
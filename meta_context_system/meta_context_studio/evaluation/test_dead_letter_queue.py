@@ -0,0 +1,31 @@
+from meta_context_studio.src.ingestion.dead_letter_queue import DeadLetterQueue
+
+
+def test_failures_back_off_exponentially(tmp_path):
+    queue = DeadLetterQueue(str(tmp_path / "dlq.json"), base_delay_seconds=10, max_delay_seconds=25)
+
+    first = queue.record_failure("/queue/bad.html", "hash_1", "fp", "ValueError: broken")
+    assert first.next_retry_at - first.last_failed_at == 10
+    second = queue.record_failure("/queue/bad.html", "hash_1", "fp", "ValueError: broken")
+    assert second.attempts == 2
+    assert second.next_retry_at - second.last_failed_at == 20
+    third = queue.record_failure("/queue/bad.html", "hash_1", "fp", "ValueError: broken")
+    assert third.next_retry_at - third.last_failed_at == 25
+
+    assert queue.is_quarantined("/queue/bad.html", "hash_1")
+    assert not queue.is_quarantined("/queue/bad.html", "hash_1", now=third.next_retry_at)
+    # A changed document is retried right away
+    assert not queue.is_quarantined("/queue/bad.html", "hash_2")
+
+
+def test_queue_persists_and_requeues(tmp_path):
+    store_path = str(tmp_path / "dlq.json")
+    DeadLetterQueue(store_path).record_failure("/queue/bad.html", "hash_1", "fp", "ValueError: broken")
+
+    reopened = DeadLetterQueue(store_path)
+    assert reopened.is_quarantined("/queue/bad.html")
+    assert reopened.requeue() == ["/queue/bad.html"]
+    assert not DeadLetterQueue(store_path).is_quarantined("/queue/bad.html")
+
+    reopened.record_success("/queue/bad.html")
+    assert DeadLetterQueue(store_path).entries() == []
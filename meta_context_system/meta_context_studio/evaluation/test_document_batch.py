@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from meta_context_studio.src.ingestion.data_models import ContentBlockType, DocumentType
+from meta_context_studio.src.ingestion.document_batch import DocumentBatch
+from meta_context_studio.src.ingestion.parsers.html_parser import parse_html_document, parse_html_to_batch
+
+HTML = """
+<html><head><title>Batch Report</title></head>
+<body><h1>Introduction</h1><p>This is a test paragraph.</p><pre><code>print("hi")</code></pre></body>
+</html>
+"""
+
+
+def test_parser_builds_columnar_batch_and_compatible_view():
+    batch = parse_html_to_batch("/reports/batch.html", DocumentType.TECHNICAL_REPORT, HTML)
+
+    assert len(batch) == 3
+    assert batch.block_text(1) == "This is a test paragraph."
+    assert batch.block_type(2) == ContentBlockType.CODE_BLOCK
+
+    view = parse_html_document("/reports/batch.html", DocumentType.TECHNICAL_REPORT, HTML)
+    assert view.metadata["title"] == "Batch Report"
+    assert [block.content for block in view.content_blocks] == batch.texts()
+    assert [block.block_index for block in view.content_blocks] == [0, 1, 2]
+
+
+def test_embeddings_round_trip_through_dict_form():
+    batch = parse_html_to_batch("/reports/batch.html", DocumentType.TECHNICAL_REPORT, HTML)
+    embeddings = np.arange(9, dtype=np.float32).reshape(3, 3)
+    batch.set_embeddings(embeddings, np.array([True, False, True]))
+
+    restored = DocumentBatch.from_dict(batch.to_dict())
+    np.testing.assert_array_equal(restored.embeddings, embeddings)
+    assert restored.texts() == batch.texts()
+
+    view = restored.to_parsed_document()
+    assert view.content_blocks[0].embedding == pytest.approx([0.0, 1.0, 2.0])
+    assert view.content_blocks[1].embedding is None
+
+    table = restored.to_arrow()
+    assert table.num_rows == 2
+    assert table.column("block_index").to_pylist() == [0, 2]
+
+    # The journal form leaves the embeddings out; a store that embeds itself gets every text block
+    slim = DocumentBatch.from_dict(batch.to_dict(include_embeddings=False))
+    assert slim.embeddings is None
+    assert slim.to_arrow(include_vectors=False).column("block_index").to_pylist() == [0, 1, 2]
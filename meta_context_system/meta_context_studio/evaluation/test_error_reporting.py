@@ -0,0 +1,65 @@
+import os
+
+from meta_context_studio.src.utils.error_reporting import ErrorReportAggregator, fingerprint_exception, message_template
+
+
+def fail_on(file_path: str):
+    raise FileNotFoundError(f"Could not read '{file_path}' after 3 attempts")
+
+
+def capture(file_path: str) -> Exception:
+    try:
+        fail_on(file_path)
+    except Exception as e:
+        return e
+
+
+def test_message_template_strips_input_specific_values():
+    assert message_template("Could not read '/queue/a.html' after 3 attempts") == "Could not read <str> after <num> attempts"
+
+
+def test_same_failure_on_different_inputs_shares_a_fingerprint():
+    assert fingerprint_exception(capture("/queue/a.html")) == fingerprint_exception(capture("/queue/b.html"))
+    assert fingerprint_exception(capture("/queue/a.html")) != fingerprint_exception(ValueError("other"))
+
+
+def test_aggregator_writes_one_report_per_fingerprint(tmp_path):
+    aggregator = ErrorReportAggregator(report_dir=str(tmp_path), flush_interval=60)
+    paths = {
+        aggregator.record(
+            summary="Ingestion pipeline failed",
+            error=capture(f"/queue/{name}.html"),
+            code_context={"agent_name": "IngestionAgent"},
+            reproduction_steps={"input_file": f"/queue/{name}.html"},
+            key_dependencies=["rdflib"],
+        )
+        for name in ("a", "b", "c")
+    }
+    aggregator.flush()
+
+    assert len(paths) == 1
+    assert os.listdir(tmp_path) == [os.path.basename(paths.pop())]
+    report = (tmp_path / os.listdir(tmp_path)[0]).read_text(encoding="utf-8")
+    assert "- Count: 3" in report
+    assert "  - Sample Input: /queue/c.html" in report
+
+    # A new process continues the existing report instead of starting over
+    restarted = ErrorReportAggregator(report_dir=str(tmp_path), flush_interval=60)
+    restarted.record("Ingestion pipeline failed", capture("/queue/d.html"), {"agent_name": "IngestionAgent"},
+                     {"input_file": "/queue/d.html"}, ["rdflib"])
+    restarted.flush()
+    report = (tmp_path / os.listdir(tmp_path)[0]).read_text(encoding="utf-8")
+    assert "- Count: 4" in report
+
+
+def test_close_stops_the_writer_and_flushes(tmp_path):
+    aggregator = ErrorReportAggregator(report_dir=str(tmp_path), flush_interval=60)
+    path = aggregator.record("Ingestion pipeline failed", capture("/queue/a.html"), {"agent_name": "IngestionAgent"},
+                             {"input_file": "/queue/a.html"}, ["rdflib"])
+    writer = aggregator._writer
+    assert writer.is_alive()
+
+    aggregator.close()
+    assert not writer.is_alive()
+    assert "- Count: 1" in open(path, encoding="utf-8").read()
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
@@ -0,0 +1,40 @@
+from meta_context_studio.src.knowledge_base.graph_adjacency import GraphAdjacency
+from meta_context_studio.src.knowledge_base.graph_store import GraphStore, GENESIS
+from meta_context_studio.src.reasoning_core.hybrid_reasoning import HybridReasoning
+
+
+def test_expansion_reaches_the_hits_document_and_its_sections(tmp_path, make_document):
+    store = GraphStore(str(tmp_path / "knowledge_graph.ttl"), backend="memory")
+    store.add_document_to_graph(make_document("doc_a", blocks=3))
+    store.add_document_to_graph(make_document("doc_b", blocks=3))
+    adjacency = GraphAdjacency(store)
+
+    expanded = dict(adjacency.expand({GENESIS["doc_a_block_0"]: 1.0}, max_hops=2))
+    assert set(expanded) == {GENESIS["doc_a"], GENESIS["doc_a_block_1"], GENESIS["doc_a_block_2"]}
+    assert expanded[GENESIS["doc_a"]] > expanded[GENESIS["doc_a_block_1"]]
+    assert not adjacency.refresh()
+
+    # Only the changed document is re-read; the matrix picks up its new block
+    changed = make_document("doc_b_v2", blocks=4)
+    changed.source_path = "/reports/doc_b.html"
+    store.add_document_to_graph(changed)
+    assert adjacency.refresh()
+    assert GENESIS["doc_b_v2_block_3"] in dict(adjacency.neighbors(GENESIS["doc_b_v2"]))
+    assert adjacency.neighbors(GENESIS["doc_b"]) == []
+    # Nodes of the replaced version are dropped instead of piling up in the matrix
+    assert GENESIS["doc_b_block_0"] not in adjacency.node_ids
+    assert len(adjacency.nodes) == adjacency.matrix.shape[0] == 2 + 3 + 4
+
+
+def test_graph_expanded_retrieval_appends_related_blocks(tmp_path, make_document):
+    store = GraphStore(str(tmp_path / "knowledge_graph.ttl"), backend="memory")
+    store.add_document_to_graph(make_document("doc_a", blocks=3))
+    reasoning = HybridReasoning(graph_store=store)
+
+    hits = [{"text": "doc_a text 0", "source": "/reports/doc_a.html", "document_id": "doc_a", "block_index": 0, "_distance": 0.0}]
+    results = reasoning.graph_expanded_retrieval(hits, max_expanded=5)
+    assert results[0]["origin"] == "vector"
+    graph_texts = {result["text"] for result in results if result["origin"] == "graph"}
+    assert graph_texts == {"doc_a", "doc_a text 1", "doc_a text 2"}
+    graph_chunk_ids = {result["chunk_id"] for result in results if result["origin"] == "graph"}
+    assert graph_chunk_ids == {None, "doc_a:1", "doc_a:2"}
@@ -0,0 +1,239 @@
+import os
+
+import pytest
+
+from meta_context_studio.src.knowledge_base import compiled_graph
+from meta_context_studio.src.knowledge_base.graph_store import GraphStore, GENESIS
+from meta_context_studio.src.ingestion.data_models import ContentBlock, ContentBlockType
+
+CONTENT_QUERY = """
+PREFIX genesis: <http://genesis.engine.org/ontology/>
+SELECT ?block ?content WHERE { ?block genesis:hasContent ?content }
+"""
+
+
+def test_sqlite_backend_persists_committed_triples(tmp_path, make_document):
+    graph_path = str(tmp_path / "knowledge_graph.ttl")
+    store = GraphStore(graph_path, backend="sqlite")
+    store.add_document_to_graph(make_document("doc_a"))
+    store.save_graph()
+    store.close()
+
+    reopened = GraphStore(graph_path, backend="sqlite")
+    assert len(reopened.graph) == 10
+    assert (GENESIS["doc_a"], GENESIS.hasSourcePath, None) in reopened.graph
+    rows = reopened.query_graph(CONTENT_QUERY)
+    assert [str(row["content"]) for row in rows] == ["doc_a text 0"]
+    reopened.close()
+
+
+def test_failed_sqlite_commit_is_raised(tmp_path, monkeypatch, make_document):
+    store = GraphStore(str(tmp_path / "knowledge_graph.ttl"), backend="sqlite")
+    store.add_document_to_graph(make_document("doc_a"))
+
+    def failing_commit():
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store.graph, "commit", failing_commit)
+    with pytest.raises(OSError):
+        store.save_graph()
+
+
+def test_failed_delta_log_append_keeps_the_changes(tmp_path, monkeypatch, make_document):
+    graph_path = str(tmp_path / "knowledge_graph.ttl")
+    store = GraphStore(graph_path, backend="memory")
+    store.add_document_to_graph(make_document("doc_a"))
+    append = store.delta_log.append
+
+    def failing_append(changes, path=None):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store.delta_log, "append", failing_append)
+    with pytest.raises(OSError):
+        store.save_graph()
+    monkeypatch.setattr(store.delta_log, "append", append)
+    store.save_graph()
+
+    reopened = GraphStore(graph_path, backend="memory")
+    assert len(reopened.graph) == len(store.graph)
+
+
+def test_turtle_file_is_imported_once_and_exported(tmp_path, make_document):
+    graph_path = str(tmp_path / "knowledge_graph.ttl")
+    memory_store = GraphStore(graph_path, backend="memory")
+    memory_store.add_document_to_graph(make_document("doc_a"))
+    memory_store.export_turtle()
+
+    store = GraphStore(graph_path, backend="sqlite")
+    assert len(store.graph) == len(memory_store.graph)
+    store.add_document_to_graph(make_document("doc_b"))
+    exported = store.export_turtle(str(tmp_path / "export.ttl"))
+    store.close()
+
+    # The store is no longer empty, so the Turtle file is not imported a second time
+    reopened = GraphStore(graph_path, backend="sqlite")
+    assert len(reopened.graph) == 2 * len(memory_store.graph)
+    reopened.close()
+    assert len(GraphStore(exported, backend="memory").graph) == 2 * len(memory_store.graph)
+
+
+def test_memory_backend_appends_deltas_and_compacts(tmp_path, make_document):
+    graph_path = str(tmp_path / "knowledge_graph.ttl")
+    store = GraphStore(graph_path, backend="memory", compaction_threshold_bytes=10 ** 9)
+    store.add_document_to_graph(make_document("doc_a"))
+    store.save_graph()
+    store.graph.remove((GENESIS["doc_a_block_0"], None, None))
+    store.add_document_to_graph(make_document("doc_b"))
+    store.save_graph()
+    assert not os.path.exists(store.snapshot_path)
+
+    # Loading replays the delta log on top of the (missing) snapshot
+    reopened = GraphStore(graph_path, backend="memory")
+    assert set(reopened.graph) == set(store.graph)
+
+    store.compact()
+    assert os.path.exists(store.snapshot_path)
+    assert not os.path.exists(store.delta_log.path)
+    assert set(GraphStore(graph_path, backend="memory").graph) == set(store.graph)
+
+
+def test_reference_mode_resolves_block_text_lazily(tmp_path, make_document):
+    requested = []
+
+    def resolve(chunk_ids):
+        requested.append(chunk_ids)
+        return {chunk_id: f"Text of {chunk_id}" for chunk_id in chunk_ids}
+
+    store = GraphStore(str(tmp_path / "knowledge_graph.ttl"), backend="memory", content_mode="reference", content_resolver=resolve)
+    store.add_document_to_graph(make_document("doc_a"))
+    assert (None, GENESIS.hasContent, None) not in store.graph
+    assert requested == []
+
+    block_uri = GENESIS["doc_a_block_0"]
+    assert store.resolve_block_contents([block_uri]) == {block_uri: "Text of doc_a:0"}
+    assert requested == [["doc_a:0"]]
+
+    unresolved = GraphStore(str(tmp_path / "unresolved.ttl"), backend="memory", content_mode="reference")
+    unresolved.add_document_to_graph(make_document("doc_a"))
+    with pytest.raises(RuntimeError):
+        unresolved.get_document_by_id("doc_a")
+
+
+def test_reingesting_a_document_replaces_only_its_named_graph(tmp_path, make_document):
+    store = GraphStore(str(tmp_path / "knowledge_graph.ttl"), backend="sqlite")
+    assert store.add_document_to_graph(make_document("doc_a"))
+    other = make_document("doc_b")
+    assert store.add_document_to_graph(other)
+    assert not store.add_document_to_graph(make_document("doc_a"))
+
+    # A changed file gets a new content hash (document_id) but keeps its source path
+    changed = make_document("doc_a_v2")
+    changed.source_path = "/reports/doc_a.html"
+    changed.content_blocks.append(
+        ContentBlock(block_type=ContentBlockType.PARAGRAPH, content="Added text.", block_index=1)
+    )
+    assert store.add_document_to_graph(changed)
+
+    assert (GENESIS["doc_a"], None, None) not in store.graph
+    assert (GENESIS["doc_a_v2_block_1"], GENESIS.hasContent, None) in store.graph
+    assert (GENESIS["doc_b"], None, None) in store.graph
+    assert store.remove_document("/reports/doc_b.html")
+    assert (GENESIS["doc_b"], None, None) not in store.graph
+    store.close()
+
+
+def test_query_results_are_cached_until_the_graph_changes(tmp_path, make_document):
+    store = GraphStore(str(tmp_path / "knowledge_graph.ttl"), backend="memory")
+    store.add_document_to_graph(make_document("doc_a"))
+
+    assert len(store.query_graph(CONTENT_QUERY)) == 1
+    rows = store.query_graph(CONTENT_QUERY)
+    assert store.query_cache.hits == 1
+    rows.clear()  # callers get their own copy of the cached rows
+    assert len(store.query_graph(CONTENT_QUERY, init_bindings={"block": GENESIS["doc_a_block_0"]})) == 1
+
+    store.add_document_to_graph(make_document("doc_b"))
+    assert len(store.query_graph(CONTENT_QUERY)) == 2
+    assert store.query_cache.hits == 1
+
+
+def test_sqlite_query_cache_sees_commits_from_other_stores(tmp_path, make_document):
+    graph_path = str(tmp_path / "knowledge_graph.ttl")
+    reader = GraphStore(graph_path, backend="sqlite")
+    writer = GraphStore(graph_path, backend="sqlite")
+    writer.add_document_to_graph(make_document("doc_a"))
+    writer.save_graph()
+
+    assert len(reader.query_graph(CONTENT_QUERY)) == 1
+    assert len(reader.query_graph(CONTENT_QUERY)) == 1
+    assert reader.query_cache.hits == 1
+
+    # A commit through another connection to the same file invalidates the reader's cache
+    writer.add_document_to_graph(make_document("doc_b"))
+    writer.save_graph()
+    assert len(reader.query_graph(CONTENT_QUERY)) == 2
+    reader.close()
+    writer.close()
+
+
+def test_get_document_by_id_returns_blocks_in_order(tmp_path, make_document):
+    store = GraphStore(str(tmp_path / "knowledge_graph.ttl"), backend="sqlite")
+    document = make_document("doc_a")
+    document.content_blocks = [
+        ContentBlock(block_type=ContentBlockType.HEADING, content=f"Block {i}", block_index=i, metadata={"level": i})
+        for i in range(12)
+    ]
+    store.add_document_to_graph(document)
+
+    restored = store.get_document_by_id("doc_a")
+    assert [block.block_index for block in restored.content_blocks] == list(range(12))
+    assert [block.content for block in restored.content_blocks] == [f"Block {i}" for i in range(12)]
+    assert restored.content_blocks[3].metadata == {"level": "3"}
+    assert restored.metadata == {"title": "doc_a"}
+    assert store.get_document_by_id("missing") is None
+    store.close()
+
+
+def test_cursor_streams_pages_up_to_the_row_limit(tmp_path, make_document):
+    store = GraphStore(str(tmp_path / "knowledge_graph.ttl"), backend="memory")
+    for i in range(5):
+        store.add_document_to_graph(make_document(f"doc_{i}"))
+
+    cursor = store.open_cursor(CONTENT_QUERY, page_size=2, max_rows=4)
+    assert cursor.columns == ["block", "content"]
+    assert len(cursor.fetch_page()) == 2
+    assert not cursor.exhausted
+    assert len(cursor.fetch_page()) == 2
+    assert cursor.stop_reason == "row_limit"
+    assert cursor.fetch_page() == []
+
+    cursor = store.open_cursor(CONTENT_QUERY, page_size=10)
+    assert len(cursor.fetch_page()) == 5
+    assert cursor.stop_reason == "end"
+
+    cursor = store.open_cursor(CONTENT_QUERY, timeout_seconds=0)
+    assert cursor.fetch_page() == []
+    assert cursor.stop_reason == "timeout"
+
+
+def test_compiled_cache_is_reused_until_the_source_changes(tmp_path, make_document):
+    source = tmp_path / "ontology.ttl"
+    source.write_text("@prefix ex: <http://example.org/> .\nex:a ex:b ex:c .\n")
+    assert compiled_graph.load_compiled(str(source)) is None
+    quads, namespaces = compiled_graph.parse_cached(str(source))
+    cached_quads, cached_namespaces = compiled_graph.load_compiled(str(source))
+    assert list(cached_quads) == quads and cached_namespaces == namespaces
+    assert ("ex", compiled_graph.URIRef("http://example.org/")) in namespaces
+
+    source.write_text("@prefix ex: <http://example.org/> .\nex:a ex:b ex:c , ex:d .\n")
+    assert compiled_graph.load_compiled(str(source)) is None
+    assert len(list(compiled_graph.parse_cached(str(source))[0])) == 2
+
+    store = GraphStore(str(tmp_path / "knowledge_graph.ttl"), backend="memory")
+    store.add_document_to_graph(make_document("doc_a"))
+    store.save_graph()
+    store.compact()
+    assert compiled_graph.load_compiled(store.snapshot_path) is not None
+    reopened = GraphStore(str(tmp_path / "knowledge_graph.ttl"), backend="memory")
+    assert len(reopened.graph) == len(store.graph)
+    assert reopened.get_document_by_id("doc_a").content_blocks[0].content == "doc_a text 0"
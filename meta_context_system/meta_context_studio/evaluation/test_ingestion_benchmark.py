@@ -0,0 +1,29 @@
+import json
+
+from meta_context_studio.evaluation.ingestion_benchmark import benchmark_parser, compare_results, run_benchmarks
+from meta_context_studio.evaluation.synthetic_corpus import SyntheticCorpusGenerator
+
+
+def test_synthetic_corpus_is_deterministic_and_sized(tmp_path):
+    generator = SyntheticCorpusGenerator(seed=7, target_size_kb=16, font_blob_kb=1)
+    report = generator.generate_report(0)
+    assert report == SyntheticCorpusGenerator(seed=7, target_size_kb=16, font_blob_kb=1).generate_report(0)
+    assert report != generator.generate_report(1)
+    assert 16 * 1024 <= len(report) < 20 * 1024
+
+    paths = generator.write_corpus(str(tmp_path / "corpus"), 2)
+    result = benchmark_parser(paths, str(tmp_path))
+    assert result["documents"] == 2 and result["chunks"] > 0
+    assert set(result["stages"]) == {"read", "parse"}
+
+
+def test_benchmark_runs_targets_in_isolated_processes(tmp_path):
+    generator = SyntheticCorpusGenerator(seed=7, target_size_kb=8, font_blob_kb=1)
+    results_path = run_benchmarks(["parse_html_document"], 2, generator, str(tmp_path))
+    with open(results_path) as f:
+        report = json.load(f)
+    result = report["results"]["parse_html_document"]
+    assert result["status"] == "ok" and result["documents"] == 2
+    assert result["peak_rss_mb"] > 0
+
+    assert compare_results(results_path, results_path)["parse_html_document"]["docs_per_s"] == 1.0
@@ -0,0 +1,127 @@
+import json
+import os
+import pytest
+from unittest.mock import MagicMock
+
+from meta_context_studio.src.ingestion.journal import IngestionJournal, JournalCommitError
+
+
+@pytest.fixture
+def journal_paths(tmp_path):
+    return str(tmp_path / "processed_files.log.wal"), str(tmp_path / "processed_files.log")
+
+
+def test_journal_commits_full_batch_in_bulk(journal_paths, make_document):
+    journal_path, processed_log = journal_paths
+    graph_store, vector_store = MagicMock(), MagicMock()
+    journal = IngestionJournal(journal_path, processed_log, graph_store, vector_store, batch_size=2)
+
+    # Blocks reach the vector store whether or not an embedding was computed for them
+    embedded = make_document("doc_a")
+    embedded.content_blocks[0].embedding = [0.1, 0.2]
+    assert journal.stage(embedded, "hash_a", "/queue/a.html") is False
+    assert journal.is_staged("hash_a")
+    assert journal.stage(make_document("doc_b"), "hash_b", "/queue/b.html") is True
+
+    vector_store.upsert_chunks.assert_called_once()
+    chunks = vector_store.upsert_chunks.call_args[0][0]
+    assert len(chunks) == 2
+    # The vector store embeds the texts with its own model
+    assert "vector" not in chunks.column_names
+    assert graph_store.add_document_to_graph.call_count == 2
+    graph_store.save_graph.assert_called_once()
+    with open(processed_log) as f:
+        assert f.read() == "hash_a,/queue/a.html\nhash_b,/queue/b.html\n"
+    # A fully committed journal is checkpointed away
+    assert not os.path.exists(journal_path)
+    assert journal.pending_count() == 0
+
+
+class SimulatedCrash(BaseException):
+    """Stands in for the process dying mid-commit; not caught like a sink error."""
+
+
+def test_journal_replays_only_unapplied_sinks(journal_paths, make_document):
+    journal_path, processed_log = journal_paths
+    vector_store = MagicMock()
+    crashing_graph_store = MagicMock()
+    crashing_graph_store.save_graph.side_effect = SimulatedCrash()
+    journal = IngestionJournal(journal_path, processed_log, crashing_graph_store, vector_store, batch_size=10)
+
+    journal.stage(make_document("doc_a"), "hash_a", "/queue/a.html")
+    with pytest.raises(SimulatedCrash):
+        journal.flush()
+    assert os.path.exists(journal_path)
+    assert not os.path.exists(processed_log)
+
+    # Restart: the vector write already happened, the graph and processed log did not
+    graph_store, restarted_vector_store = MagicMock(), MagicMock()
+    restarted = IngestionJournal(journal_path, processed_log, graph_store, restarted_vector_store)
+    assert restarted.replay() == 1
+
+    restarted_vector_store.upsert_chunks.assert_not_called()
+    replayed_document = graph_store.add_document_to_graph.call_args[0][0].to_parsed_document()
+    assert replayed_document.document_id == "doc_a"
+    # Embeddings are not journaled; the vector store computes its own
+    assert replayed_document.content_blocks[0].embedding is None
+    with open(processed_log) as f:
+        assert f.read() == "hash_a,/queue/a.html\n"
+    assert not os.path.exists(journal_path)
+
+
+def test_failed_batch_is_aborted_instead_of_replayed(journal_paths, make_document):
+    journal_path, processed_log = journal_paths
+    failing_vector_store = MagicMock()
+    failing_vector_store.upsert_chunks.side_effect = ValueError("vector dimension mismatch")
+    journal = IngestionJournal(journal_path, processed_log, MagicMock(), failing_vector_store, batch_size=10)
+    journal.stage(make_document("doc_a"), "hash_a", "/queue/a.html")
+    with pytest.raises(JournalCommitError) as failure:
+        journal.flush()
+    # The error names the documents of the failed batch so that they can be dead-lettered
+    assert [entry.document_hash for entry in failure.value.entries] == ["hash_a"]
+    assert isinstance(failure.value.cause, ValueError)
+
+    # The dead-letter queue owns the retry; a restart does not apply the batch behind its back
+    restarted_vector_store = MagicMock()
+    restarted = IngestionJournal(journal_path, processed_log, MagicMock(), restarted_vector_store)
+    assert restarted.replay() == 0
+    restarted_vector_store.upsert_chunks.assert_not_called()
+    assert not os.path.exists(processed_log)
+
+
+def test_batch_that_fails_on_replay_is_quarantined(journal_paths, make_document):
+    journal_path, processed_log = journal_paths
+    crashing_vector_store = MagicMock()
+    crashing_vector_store.upsert_chunks.side_effect = SimulatedCrash()
+    journal = IngestionJournal(journal_path, processed_log, MagicMock(), crashing_vector_store, batch_size=10)
+    journal.stage(make_document("doc_a"), "hash_a", "/queue/a.html")
+    with pytest.raises(SimulatedCrash):
+        journal.flush()
+
+    # The batch fails again on restart; that no longer prevents the journal from opening
+    failing_vector_store = MagicMock()
+    failing_vector_store.upsert_chunks.side_effect = ValueError("vector dimension mismatch")
+    restarted = IngestionJournal(journal_path, processed_log, MagicMock(), failing_vector_store)
+    assert restarted.replay() == 0
+    assert not os.path.exists(journal_path)
+    assert not os.path.exists(processed_log)
+    with open(restarted.quarantine_path) as f:
+        quarantined = [json.loads(line) for line in f]
+    assert [entry["document_hash"] for entry in quarantined[0]["entries"]] == ["hash_a"]
+    assert "vector dimension mismatch" in quarantined[0]["error"]
+    assert IngestionJournal(journal_path, processed_log, MagicMock(), failing_vector_store).replay() == 0
+
+
+def test_failed_batch_does_not_keep_the_journal_open(journal_paths, make_document):
+    journal_path, processed_log = journal_paths
+    vector_store = MagicMock()
+    vector_store.upsert_chunks.side_effect = [ValueError("LanceDB unavailable"), None]
+    journal = IngestionJournal(journal_path, processed_log, MagicMock(), vector_store, batch_size=10)
+
+    journal.stage(make_document("doc_a"), "hash_a", "/queue/a.html")
+    with pytest.raises(JournalCommitError):
+        journal.flush()
+    journal.stage(make_document("doc_b"), "hash_b", "/queue/b.html")
+    assert journal.flush() == 1
+    # The next successful commit truncates the journal instead of letting it grow
+    assert not os.path.exists(journal_path)
@@ -0,0 +1,97 @@
+import pytest
+
+pytest.importorskip("lancedb")
+pytest.importorskip("lance")
+pytest.importorskip("langchain_google_genai")
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+
+from meta_context_studio.src.lancedb_ingestion import ingestion_pipeline
+from meta_context_studio.src.lancedb_ingestion.ingestion_pipeline import LanceDBIngestionPipeline
+
+
+class LengthEmbeddings:
+    """Embeds a text as its length followed by zeros; stands in for the Gemini embedding model."""
+
+    def __init__(self, *args, **kwargs):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text))] + [0.0] * 767 for text in texts]
+
+    def embed_query(self, query):
+        return [float(len(query))] + [0.0] * 767
+
+
+@pytest.fixture
+def vector_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion_pipeline, "GoogleGenerativeAIEmbeddings", LengthEmbeddings)
+    return LanceDBIngestionPipeline(str(tmp_path / "lancedb"), "chunks")
+
+
+def chunks(document_id, source, texts):
+    return pa.table({
+        "text": texts,
+        "source": [source] * len(texts),
+        "document_id": [document_id] * len(texts),
+        "block_index": pa.array(range(len(texts)), type=pa.int32()),
+        "chunk_id": [f"{document_id}:{i}" for i in range(len(texts))],
+    })
+
+
+def test_reingested_document_replaces_its_earlier_version(vector_store):
+    assert vector_store.upsert_chunks(chunks("doc_a_v1", "/reports/a.html", ["old intro", "old body"])) == 2
+    assert vector_store.upsert_chunks(chunks("doc_b", "/reports/b.html", ["other"])) == 1
+    # Replaying the same batch neither embeds nor writes again
+    assert vector_store.upsert_chunks(chunks("doc_b", "/reports/b.html", ["other"])) == 0
+
+    assert vector_store.upsert_chunks(chunks("doc_a_v2", "/reports/a.html", ["new intro"])) == 1
+    rows = vector_store.table.to_arrow().select(["chunk_id", "document_id", "block_index"]).to_pylist()
+    assert sorted(row["chunk_id"] for row in rows) == ["doc_a_v2:0", "doc_b:0"]
+    assert vector_store.get_texts_by_chunk_ids(["doc_a_v1:0", "doc_a_v2:0"]) == {"doc_a_v2:0": "new intro"}
+
+
+def test_files_are_upserted_and_lookups_are_batched(vector_store, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion_pipeline, "KEY_FILTER_BATCH_SIZE", 2)
+    # Keep the loaders in-process, where the stand-in embedding model is patched in
+    monkeypatch.setattr(ingestion_pipeline, "ProcessPoolExecutor", ThreadPoolExecutor)
+    report = tmp_path / "report.txt"
+    report.write_text("\n\n".join(f"Paragraph {i} " + "word " * 200 for i in range(5)))
+
+    vector_store.ingest_files([str(report)])
+    first = vector_store.table.count_rows()
+    assert first > 2
+    # Ingesting the unchanged file again writes nothing and leaves the chunk ids unique
+    vector_store.ingest_files([str(report)])
+    chunk_ids = vector_store.table.to_arrow().column("chunk_id").to_pylist()
+    assert len(chunk_ids) == first == len(set(chunk_ids))
+
+    assert len(vector_store.get_rows_by_chunk_ids(chunk_ids)) == first
+    assert sorted(vector_store.chunk_ids_without_summary()) == sorted(chunk_ids)
+    assert vector_store.update_summaries({chunk_id: "summary" for chunk_id in chunk_ids[:3]}) == 3
+    assert len(vector_store.chunk_ids_without_summary()) == first - 3
+
+
+def test_centrality_is_merged_by_chunk_for_moved_sources_only(vector_store):
+    vector_store.upsert_chunks(chunks("doc_a", "/reports/a.html", ["intro", "body"]))
+    vector_store.upsert_chunks(chunks("doc_b", "/reports/b.html", ["other"]))
+
+    scores = {"/reports/a.html": (0.5, 0.25), "/reports/b.html": (0.1, 0.05), "/reports/missing.html": (0.9, 0.9)}
+    assert vector_store.update_centrality(scores) == 2
+    assert vector_store.update_centrality(scores) == 0
+    scores["/reports/b.html"] = (0.2, 0.05)
+    assert vector_store.update_centrality(scores) == 1
+
+    rows = {
+        row["chunk_id"]: (row["centrality"], row["degree_centrality"])
+        for row in vector_store.table.to_arrow().select(["chunk_id", "centrality", "degree_centrality"]).to_pylist()
+    }
+    assert rows == {
+        "doc_a:0": pytest.approx((0.5, 0.25)),
+        "doc_a:1": pytest.approx((0.5, 0.25)),
+        "doc_b:0": pytest.approx((0.2, 0.05)),
+    }
+    assert vector_store.table.count_rows() == 3
@@ -0,0 +1,33 @@
+import urllib.request
+
+from meta_context_studio.src.utils.metrics import MetricsRegistry, start_metrics_server
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage latency.", label="stage", buckets=(0.01, 0.1))
+    assert registry.histogram("stage_seconds", "Stage latency.", label="stage") is histogram
+    for seconds in (0.005, 0.05, 0.5):
+        histogram.observe("search", seconds)
+
+    assert histogram.snapshot("search") == {"count": 3, "sum": 0.555}
+    assert histogram.snapshot("rerank") is None
+    lines = registry.render().splitlines()
+    assert 'stage_seconds_bucket{stage="search",le="0.01"} 1' in lines
+    assert 'stage_seconds_bucket{stage="search",le="0.1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="search",le="+Inf"} 3' in lines
+    assert 'stage_seconds_count{stage="search"} 3' in lines
+
+
+def test_metrics_server_serves_the_registry():
+    registry = MetricsRegistry()
+    registry.histogram("stage_seconds", "Stage latency.", label="stage").observe("embed", 0.002)
+    server = start_metrics_server(0, registry=registry)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode("utf-8")
+        assert 'stage_seconds_count{stage="embed"} 1' in body
+    finally:
+        server.shutdown()
+        server.server_close()
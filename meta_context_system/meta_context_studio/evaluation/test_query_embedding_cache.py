@@ -0,0 +1,42 @@
+from meta_context_studio.src.context_management.retrieval.query_embedding_cache import QueryEmbeddingCache
+from meta_context_studio.src.utils.persistent_cache import PersistentCache
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, query: str):
+        self.calls += 1
+        return [float(len(query)), 1.0]
+
+
+def test_repeated_queries_skip_the_embedding_model(tmp_path):
+    db_path = str(tmp_path / "query_cache.sqlite")
+    embedder = CountingEmbedder()
+    cache = QueryEmbeddingCache(db_path=db_path)
+
+    first = cache.embed("Backend best practices", "models/embedding-001", embedder)
+    assert cache.embed("  backend   BEST practices ", "models/embedding-001", embedder) == first
+    assert embedder.calls == 1
+    cache.embed("backend best practices", "models/other-model", embedder)
+    assert embedder.calls == 2
+
+    # A second process reads the shared SQLite file instead of embedding again
+    other_process = QueryEmbeddingCache(db_path=db_path)
+    assert other_process.embed("backend best practices", "models/embedding-001", embedder) == first
+    assert embedder.calls == 2
+
+
+def test_entries_expire_and_are_evicted(tmp_path):
+    now = [0.0]
+    cache = PersistentCache("test", max_entries=2, ttl_seconds=10, db_path=str(tmp_path / "cache.sqlite"), clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("c", 3)
+    assert list(cache._entries) == ["b", "c"]
+    assert cache.get("a") == 1  # evicted from the LRU, still on disk
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+    assert cache.purge_expired() == 3
@@ -0,0 +1,64 @@
+import json
+import math
+
+from meta_context_studio.evaluation.rag_evaluator import (
+    build_query_set,
+    compare_results,
+    evaluate,
+    extract_sections,
+    ranking_metrics,
+)
+
+REPORT = """<html><body>
+<div class="stl_02"><div class="stl_view">
+<div class="stl_01"><span>1. Vector Retrieval Strategies</span></div>
+<div class="stl_01"><span>Embeddings of every chunk are stored in lancedb and searched by cosine distance.</span></div>
+<div class="stl_01"><span>1. Retrieve: an initial retrieval mechanism returns the nearest candidates.</span></div>
+<div class="stl_01"><span>2.1. Graph Centrality Priors</span></div>
+<div class="stl_01"><span>Pagerank over the document graph boosts chunks from well connected reports.</span></div>
+<div class="stl_01"><span>Works cited</span></div>
+<div class="stl_01"><span>3. Ignored Reference Heading</span></div>
+</div></div>
+</body></html>"""
+
+
+def test_extracts_numbered_sections_from_leaf_blocks(tmp_path):
+    sections = extract_sections(REPORT, min_section_words=5)
+    assert [section["heading"] for section in sections] == ["Vector Retrieval Strategies", "Graph Centrality Priors"]
+    # Lower-case numbered list items stay part of the section
+    assert "1. Retrieve" in sections[0]["section"]
+
+    (tmp_path / "report.html").write_text(REPORT, encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("not a report", encoding="utf-8")
+    queries = build_query_set(str(tmp_path), max_queries_per_document=1, min_section_words=5)
+    assert len(queries) == 1 and queries[0]["source"] == "report.html"
+
+
+def test_metrics_and_comparison(tmp_path):
+    assert ranking_metrics([False, True, True], k=5) == {"recall": 1.0, "mrr": 0.5, "ndcg": 1 / math.log2(3)}
+    assert ranking_metrics([False, False, True], k=2)["recall"] == 0.0
+
+    queries = [
+        {"query": "vector retrieval", "source": "a.html", "section": "embeddings stored in lancedb searched by cosine distance"},
+        {"query": "centrality", "source": "b.html", "section": "pagerank over the document graph boosts chunks"},
+    ]
+    rows = {
+        "vector retrieval": [
+            {"source": "/data/b.html", "text": "embeddings stored in lancedb searched by cosine distance"},
+            {"source": "/data/a.html", "text": "embeddings stored in lancedb"},
+        ],
+        "centrality": [{"source": "/data/a.html", "text": "unrelated text about dashboards"}],
+    }
+    report = evaluate(lambda query, k: rows[query][:k], queries, k=5)
+    assert report["recall@5"] == 0.5 and report["mrr"] == 0.25
+    assert report["latency_ms"]["p99"] >= report["latency_ms"]["p50"] >= 0
+    assert report["queries"] == 2 and report["failed"] == 0
+
+    baseline, candidate = tmp_path / "baseline.json", tmp_path / "candidate.json"
+    baseline.write_text(json.dumps({"results": {"vector": report}}))
+    improved = {**report, "mrr": 0.75, "queries_per_s": report["queries_per_s"] * 2}
+    candidate.write_text(json.dumps({"results": {"vector": improved, "reranked": improved}}))
+    changes = compare_results(str(baseline), str(candidate))
+    assert list(changes) == ["vector"]
+    assert changes["vector"]["mrr delta"] == 0.5
+    assert math.isclose(changes["vector"]["queries_per_s x"], 2.0)
@@ -0,0 +1,35 @@
+import time
+
+from meta_context_studio.src.context_management.retrieval.reranker import CrossEncoderReranker
+
+
+class KeywordCrossEncoder:
+    """Scores a pair by how many query words the chunk contains; each pair costs 2 ms."""
+
+    def __init__(self):
+        self.scored = []
+
+    def predict(self, pairs, batch_size=32):
+        self.scored.append(len(pairs))
+        time.sleep(0.002 * len(pairs))
+        return [sum(word in text for word in query.split()) for query, text in pairs]
+
+
+def test_reranks_in_one_batch_and_truncates_to_the_budget():
+    candidates = [{"text": "unrelated"}, {"text": "graph centrality"}, {"text": "centrality"}, {"text": "graph"}]
+    model = KeywordCrossEncoder()
+
+    reranker = CrossEncoderReranker(latency_budget_ms=None, model=model)
+    reranked = reranker.rerank("graph centrality", candidates, top_k=2)
+    assert [row["text"] for row in reranked] == ["graph centrality", "centrality"]
+    # Logits are squashed into (0, 1); a logit of 0 scores 0.5
+    assert 0.5 < reranked[1]["rerank_score"] < reranked[0]["rerank_score"] < 1.0
+    assert model.scored == [4]
+    assert reranker.ms_per_pair > 0
+
+    reranker = CrossEncoderReranker(latency_budget_ms=5, model=model)
+    reranker.ms_per_pair = 2.0
+    reranked = reranker.rerank("graph centrality", candidates)
+    assert model.scored[-1] == 2
+    assert reranker.last_truncated == 2
+    assert [row["text"] for row in reranked] == ["graph centrality", "unrelated"]
@@ -0,0 +1,31 @@
+from meta_context_studio.src.context_management.retrieval.semantic_response_cache import SemanticResponseCache
+
+RESULTS = [{"chunk_id": "doc:0", "text": "LanceDB stores the chunks."}, {"chunk_id": "doc:1", "text": "Graphs link them."}]
+
+
+def test_paraphrases_hit_until_their_chunks_change():
+    cache = SemanticResponseCache(similarity_threshold=0.95, max_entries=4)
+    assert cache.put("Where are chunks stored?", [1.0, 0.0, 0.1], RESULTS, "In LanceDB.", table_version=1)
+
+    assert cache.lookup([1.0, 0.02, 0.1], table_version=1)["answer"] == "In LanceDB."
+    assert cache.lookup([0.0, 1.0, 0.0], table_version=1) is None
+
+    # A write elsewhere in the table keeps the entry valid once its chunks are checked
+    unchanged = {row["chunk_id"]: row["text"] for row in RESULTS}
+    assert cache.lookup([1.0, 0.0, 0.1], table_version=2, fetch_texts=lambda ids: unchanged) is not None
+    changed = {**unchanged, "doc:1": "Graphs link documents."}
+    assert cache.lookup([1.0, 0.0, 0.1], table_version=3, fetch_texts=lambda ids: changed) is None
+    assert cache.stats() == {"entries": 0, "hits": 2, "misses": 2, "hit_rate": 0.5, "stale": 1, "evictions": 0}
+
+
+def test_least_recently_used_answer_is_evicted():
+    cache = SemanticResponseCache(similarity_threshold=0.99, max_entries=2)
+    cache.put("a", [1.0, 0.0, 0.0], RESULTS, "A", table_version=1)
+    cache.put("b", [0.0, 1.0, 0.0], RESULTS, "B", table_version=1)
+    cache.lookup([1.0, 0.0, 0.0], table_version=1)
+    cache.put("c", [0.0, 0.0, 1.0], RESULTS, "C", table_version=1)
+
+    assert cache.lookup([0.0, 1.0, 0.0], table_version=1) is None
+    assert cache.lookup([1.0, 0.0, 0.0], table_version=1)["answer"] == "A"
+    assert cache.evictions == 1
+    assert not cache.put("d", [1.0, 1.0, 0.0], [{"text": "no chunk id"}], "D", table_version=1)
@@ -1,7 +1,11 @@
 import gradio as gr
 import pandas as pd
 from pathlib import Path
+from typing import Optional
+from meta_context_studio.config import settings
 from meta_context_studio.src.context_management.modeling.knowledge_graph_engine import KnowledgeGraphEngine
+from meta_context_studio.src.knowledge_base.compiled_graph import load_graph_cached
+from meta_context_studio.src.knowledge_base.query_cursor import QueryCursor
 
 # --- Knowledge Base Setup ---
 # This part might be slow, so it's good to do it once at startup.
@@ -11,8 +15,8 @@ ontology_path = Path(__file__).resolve().parents[1] / "knowledge_base" / "ontolo
 def initialize_kb():
     """Loads the ontology and some sample data into the knowledge base."""
     try:
-        # Load the ontology
-        knowledge_base.graph.parse(str(ontology_path), format="turtle")
+        # Load the ontology, from its compiled cache when the file is unchanged
+        load_graph_cached(knowledge_base.graph, str(ontology_path), format="turtle")
 
         # Add some example data for demonstration
         # In a real scenario, this would come from the data_ingestion_pipeline
@@ -28,25 +32,62 @@ def initialize_kb():
 
 IS_KB_LOADED, KB_LOAD_MESSAGE = initialize_kb()
 
-def knowledge_base_query_fn(query: str):
-    """Executes a SPARQL query and returns the results as a DataFrame."""
+def _page_frame(cursor: QueryCursor, rows) -> pd.DataFrame:
+    """Converts one page of rdflib terms to strings for display."""
+    return pd.DataFrame(
+        [[str(term) if term is not None else None for term in row] for row in rows],
+        columns=cursor.columns,
+    )
+
+def _page_status(cursor: QueryCursor, page_rows: int) -> str:
+    if cursor.rows_read == 0:
+        return "Query returned no results."
+    first = cursor.rows_read - page_rows + 1
+    status = f"Showing rows {first}-{cursor.rows_read}" if page_rows else f"No more rows after row {cursor.rows_read}"
+    if cursor.stop_reason == "row_limit":
+        return f"{status}. Row limit of {cursor.max_rows} reached; refine the query to see more."
+    if cursor.stop_reason == "timeout":
+        return f"{status}. Query stopped after {cursor.timeout_seconds:g}s; refine the query to see more."
+    if cursor.stop_reason == "end":
+        return f"{status} (end of results)."
+    return f"{status}. More rows available."
+
+def knowledge_base_query_fn(query: str, cursor: Optional[QueryCursor] = None):
+    """
+    Starts a SPARQL query and returns its first page as a DataFrame.
+
+    Rows are streamed from the graph through a QueryCursor, which is kept in the session
+    state so that `next_page_fn` can fetch later pages on demand.
+    """
+    if cursor is not None:
+        cursor.close()
     if not IS_KB_LOADED:
-        return pd.DataFrame(), KB_LOAD_MESSAGE
+        return pd.DataFrame(), KB_LOAD_MESSAGE, None, gr.update(interactive=False)
 
     try:
-        results = knowledge_base.query(query)
-        if not results:
-            return pd.DataFrame(), "Query returned no results."
-        
-        # Convert results to a pandas DataFrame for display
-        df = pd.DataFrame(results, columns=[str(var) for var in results.vars])
-        # Convert rdflib terms to strings for better display
-        for col in df.columns:
-            df[col] = df[col].apply(lambda x: str(x) if x else None)
+        cursor = QueryCursor(
+            knowledge_base.graph,
+            query,
+            page_size=settings.SPARQL_PAGE_SIZE,
+            max_rows=settings.SPARQL_MAX_ROWS,
+            timeout_seconds=settings.SPARQL_QUERY_TIMEOUT_SECONDS,
+        )
+        rows = cursor.fetch_page()
+    except Exception as e:
+        return pd.DataFrame(), f"Query failed: {e}", None, gr.update(interactive=False)
+    return _page_frame(cursor, rows), _page_status(cursor, len(rows)), cursor, gr.update(interactive=not cursor.exhausted)
 
-        return df, "Query successful."
+def next_page_fn(cursor: Optional[QueryCursor]):
+    """Fetches the next page of the current query."""
+    if cursor is None or cursor.exhausted:
+        return gr.update(), "No more rows for this query.", cursor, gr.update(interactive=False)
+    try:
+        rows = cursor.fetch_page()
     except Exception as e:
-        return pd.DataFrame(), f"Query failed: {e}"
+        cursor.close()
+        return gr.update(), f"Query failed: {e}", None, gr.update(interactive=False)
+    frame = _page_frame(cursor, rows) if rows else gr.update()
+    return frame, _page_status(cursor, len(rows)), cursor, gr.update(interactive=not cursor.exhausted)
 
 # --- Gradio UI ---
 with gr.Blocks(theme=gr.themes.Soft(), title="Knowledge Base Explorer") as demo:
@@ -62,11 +103,16 @@ WHERE {
 }
 LIMIT 10""",
         language="sql", label="SPARQL Query", lines=10)
-    query_button = gr.Button("Execute Query")
+    with gr.Row():
+        query_button = gr.Button("Execute Query")
+        next_page_button = gr.Button("Next Page", interactive=False)
     status_output = gr.Textbox(label="Status", interactive=False, value=KB_LOAD_MESSAGE)
     results_output = gr.DataFrame(label="Query Results", wrap=True)
+    cursor_state = gr.State(None)
 
-    query_button.click(fn=knowledge_base_query_fn, inputs=[query_input], outputs=[results_output, status_output])
+    page_outputs = [results_output, status_output, cursor_state, next_page_button]
+    query_button.click(fn=knowledge_base_query_fn, inputs=[query_input, cursor_state], outputs=page_outputs)
+    next_page_button.click(fn=next_page_fn, inputs=[cursor_state], outputs=page_outputs)
 
 def main():
     """Launches the Gradio web server."""
@@ -1,7 +1,9 @@
 import gradio as gr
 from meta_context_studio.src.context_management.retrieval.context_retriever import ContextRetriever
+from meta_context_studio.src.context_management.retrieval.semantic_response_cache import SemanticResponseCache
 from meta_context_studio.config import settings
 from meta_context_studio.src.utils.environment import verify_venv
+from meta_context_studio.src.utils.metrics import start_metrics_server
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
@@ -30,27 +32,52 @@ except Exception as e:
     LLM_SUCCESS = False
     INITIALIZATION_MESSAGE = f"Error initializing LLM: {e}"
 
+# Answers to earlier questions, reused for paraphrases while their chunks are unchanged.
+response_cache = SemanticResponseCache()
+
 
 def chat_fn(query: str, history: list):
     """
     Function to handle the chat interaction.
     'history' is managed by Gradio and is a list of [user, bot] message pairs.
+
+    This is a generator: the question is shown before any retrieval work starts and the
+    answer is streamed into the last history entry as the LLM produces it. The query is
+    embedded once; the cache lookup and retrieval share that embedding.
     """
     history = history or []
 
     if not RETRIEVER_SUCCESS or not LLM_SUCCESS:
         history.append((query, INITIALIZATION_MESSAGE))
-        return history
+        yield history
+        return
 
     if not query:
         # Silently ignore empty queries, or you could add a message like:
         # history.append((None, "Please enter a question."))
-        return history
-
-    # 1. Retrieve context from the knowledge base
-    retrieved_context = context_retriever.retrieve_context(query, top_k=3)
-
-    # 2. Create prompt for LLM
+        yield history
+        return
+
+    # 1. Show the question before embedding it
+    history.append((query, ""))
+    yield history
+
+    # 2. Serve near-paraphrases of earlier questions from the response cache
+    pipeline = context_retriever.ingestion_pipeline
+    query_vector = pipeline.embed_query(query)
+    table_version = pipeline.table_version()
+    cached = response_cache.lookup(query_vector, table_version, pipeline.get_texts_by_chunk_ids)
+    if cached is not None:
+        print(f"Answered from response cache (similarity {cached['similarity']:.3f}): {response_cache.stats()}")
+        history[-1] = (query, cached["answer"])
+        yield history
+        return
+
+    # 3. Retrieve context from the knowledge base; the embedding is served from the query cache
+    search_results = context_retriever.search(query, top_k=3)
+    retrieved_context = context_retriever.format_context(search_results, query=query)
+
+    # 4. Create prompt for LLM
     prompt_template = f"""You are a helpful assistant for the Genesis Engine project. Answer the user's question based ONLY on the following context provided. If the context does not contain the answer, state that you cannot answer based on the provided information.
 
 --- CONTEXT ---
@@ -60,17 +87,21 @@ def chat_fn(query: str, history: list):
 Question: {query}
 """
 
-    # 3. Invoke LLM to generate a conversational answer
+    # 5. Stream the LLM's answer into the conversation as tokens arrive
+    response_text = ""
     try:
         messages = [HumanMessage(content=prompt_template)]
-        ai_response = llm.invoke(messages)
-        response_text = ai_response.content
+        for chunk in llm.stream(messages):
+            if chunk.content:
+                response_text += chunk.content
+                history[-1] = (query, response_text)
+                yield history
+        response_cache.put(query, query_vector, search_results, response_text, table_version)
     except Exception as e:
-        response_text = f"An error occurred while generating the response: {e}"
-
-    # 4. Update history
-    history.append((query, response_text))
-    return history
+        error = f"An error occurred while generating the response: {e}"
+        response_text = f"{response_text}\n\n{error}" if response_text else error
+        history[-1] = (query, response_text)
+        yield history
 
 # --- Gradio UI ---
 with gr.Blocks(theme=gr.themes.Soft(), title="Chat with Knowledge Base") as demo:
@@ -88,6 +119,12 @@ with gr.Blocks(theme=gr.themes.Soft(), title="Chat with Knowledge Base") as demo
 
 def main():
     """Launches the Gradio web server."""
+    if settings.METRICS_PORT is not None:
+        try:
+            start_metrics_server(settings.METRICS_PORT)
+        except OSError as e:
+            # Metrics are optional; a taken port must not keep the chat UI from starting
+            print(f"Could not start the metrics server on port {settings.METRICS_PORT}: {e}")
     demo.launch()
 
 if __name__ == "__main__":
@@ -0,0 +1,40 @@
+# meta_context_studio/scripts/requeue_dead_letters.py
+"""Lists or requeues documents held in the ingestion dead-letter queue."""
+
+import argparse
+import os
+
+from meta_context_studio.config import settings
+from meta_context_studio.src.ingestion.dead_letter_queue import DeadLetterQueue, format_timestamp
+
+
+def main():
+    """Lists quarantined documents, or makes them due for retry on the next ingestion run."""
+    parser = argparse.ArgumentParser(description="Inspect and requeue documents in the ingestion dead-letter queue.")
+    parser.add_argument("files", nargs="*", help="Documents to requeue. Omit together with --all to only list the queue.")
+    parser.add_argument("--all", action="store_true", help="Requeue every document in the dead-letter queue.")
+    parser.add_argument("--queue-path", type=str, default=settings.DEAD_LETTER_QUEUE_PATH, help="Path of the dead-letter queue file.")
+    args = parser.parse_args()
+
+    queue = DeadLetterQueue(args.queue_path)
+
+    if args.all or args.files:
+        requeued = queue.requeue(None if args.all else [os.path.abspath(path) for path in args.files])
+        print(f"Requeued {len(requeued)} documents.")
+        for path in requeued:
+            print(f"  - {path}")
+        return
+
+    entries = queue.entries()
+    if not entries:
+        print("The dead-letter queue is empty.")
+        return
+    print(f"{len(entries)} documents in the dead-letter queue:")
+    for entry in entries:
+        print(f"  - {entry.file_path}")
+        print(f"    attempts: {entry.attempts}, next retry: {format_timestamp(entry.next_retry_at)}, fingerprint: {entry.fingerprint}")
+        print(f"    last error: {entry.last_error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# meta_context_studio/scripts/summarize_chunks.py
+"""Precomputes chunk summaries and stores them in the LanceDB `summary` column."""
+
+import argparse
+import time
+
+from meta_context_studio.config import settings
+from meta_context_studio.src.context_management.retrieval.context_retriever import ContextRetriever
+
+
+def main():
+    """Summarizes every chunk that has no summary yet, so summarized retrieval needs no LLM call."""
+    parser = argparse.ArgumentParser(description="Precompute chunk summaries for summarized retrieval.")
+    parser.add_argument("--batch-size", type=int, default=settings.SUMMARY_INGEST_BATCH_SIZE, help="Chunks summarized and written per batch.")
+    parser.add_argument("--requests-per-minute", type=float, default=settings.SUMMARY_REQUESTS_PER_MINUTE, help="Maximum LLM calls started per minute.")
+    parser.add_argument("--limit", type=int, default=None, help="Summarize at most this many chunks in this run.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    # The retriever's summarizer uses the same prompt and memo as query-time summaries
+    retriever = ContextRetriever()
+    summarizer = retriever.chunk_summarizer
+    summarizer.requests_per_minute = args.requests_per_minute
+    written = summarizer.summarize_pending(retriever.ingestion_pipeline, batch_size=args.batch_size, limit=args.limit)
+    print(f"Stored {written} chunk summaries in {time.perf_counter() - start:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
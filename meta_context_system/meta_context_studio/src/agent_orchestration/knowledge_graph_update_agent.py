@@ -1,6 +1,7 @@
-from typing import List
+from typing import List, Union
 
 from meta_context_studio.src.ingestion.data_models import ParsedDocument
+from meta_context_studio.src.ingestion.document_batch import DocumentBatch
 from meta_context_studio.src.knowledge_base.graph_store import GraphStore
 
 class KnowledgeGraphUpdateAgent:
@@ -11,9 +12,9 @@ class KnowledgeGraphUpdateAgent:
     def __init__(self, graph_store: GraphStore):
         self.graph_store = graph_store
 
-    def validate_and_merge(self, documents: List[ParsedDocument]) -> None:
+    def validate_and_merge(self, documents: List[Union[ParsedDocument, DocumentBatch]]) -> None:
         """
-        Validates a list of ParsedDocuments and merges their information into the graph.
+        Validates a list of ParsedDocuments (or DocumentBatches) and merges their information into the graph.
         This is a simplified validation. In a real system, this would involve:
         1.  Schema validation against ontologies.
         2.  Consistency checks (e.g., no conflicting facts).
@@ -27,8 +28,11 @@ class KnowledgeGraphUpdateAgent:
                 print("Validation failed for a document: Missing document_id. Skipping.")
                 continue
 
-            # Add document to the graph (simplified - actual merging logic would be here)
-            self.graph_store.add_document_to_graph(document)
-            print(f"KnowledgeGraphUpdateAgent: Merged document {document.document_id} into graph.")
+            # Add document to the graph (simplified - actual merging logic would be here).
+            # Documents already committed by the ingestion journal are left untouched.
+            if self.graph_store.add_document_to_graph(document):
+                print(f"KnowledgeGraphUpdateAgent: Merged document {document.document_id} into graph.")
+            else:
+                print(f"KnowledgeGraphUpdateAgent: Document {document.document_id} is already up to date in the graph.")
         self.graph_store.save_graph()
         print("KnowledgeGraphUpdateAgent: Validation and merging complete.")
@@ -18,7 +18,8 @@ class MetaAgent:
     def __init__(self):
         self.agents: List[str] = [] # Placeholder for registered agents
         self.context_retriever = ContextRetriever()
-        self.graph_store = GraphStore()
+        # Blocks stored by reference ("reference" content mode) are read from the retriever's table
+        self.graph_store = GraphStore(content_resolver=self.context_retriever.ingestion_pipeline.get_texts_by_chunk_ids)
         self.llm = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash", temperature=0.7) # Initialize LLM for agents
         self.architect_agent = ArchitectAgent(llm=self.llm)
         self.backend_engineer_agent = BackendEngineerAgent(llm=self.llm)
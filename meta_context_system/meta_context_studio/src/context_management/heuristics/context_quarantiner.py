@@ -1,23 +1,112 @@
 """Heuristic for managing conflicting/distracting context."""
+from typing import List, Optional
+
+import numpy as np
+
+from meta_context_studio.config import settings
+
 
 class ContextQuarantiner:
     """
     Strategically isolates potentially distracting or conflicting information
     to prevent it from degrading model performance.
+
+    Redundant context is the common case: overlapping chunks and duplicated reports make
+    the top results repeat each other. Candidates are therefore selected by maximal
+    marginal relevance (MMR), which trades an item's relevance against its similarity to
+    the items already selected, and candidates that are near-duplicates of a selected
+    item are dropped. All pairwise cosine similarities come from one matrix product over
+    the candidate embeddings.
     """
 
-    def quarantine(self, context_items: list[str]) -> list[str]:
+    def __init__(
+        self,
+        mmr_lambda: float = settings.MMR_LAMBDA,
+        duplicate_threshold: float = settings.DUPLICATE_SIMILARITY_THRESHOLD,
+    ):
+        """
+        Args:
+            mmr_lambda: Weight of relevance against diversity; 1.0 ranks by relevance only.
+            duplicate_threshold: Cosine similarity at or above which a candidate counts as a
+                duplicate of an already selected item.
+        """
+        self.mmr_lambda = mmr_lambda
+        self.duplicate_threshold = duplicate_threshold
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    def select(
+        self,
+        embeddings,
+        relevance=None,
+        query_embedding=None,
+        k: Optional[int] = None,
+    ) -> List[int]:
+        """
+        Chooses a diverse, duplicate-free subset of candidates.
+
+        Args:
+            embeddings: (n, d) candidate embeddings.
+            relevance: Relevance of each candidate, e.g. retrieval similarity. Defaults to the
+                cosine similarity with `query_embedding`, or to the candidate order.
+            query_embedding: Embedding of the query, used when `relevance` is not given.
+            k: Maximum number of candidates selected; defaults to all that are not duplicates.
+
+        Returns:
+            Indices of the selected candidates in selection order.
+        """
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        n = len(vectors)
+        if n == 0:
+            return []
+        if relevance is not None:
+            relevance = np.asarray(relevance, dtype=np.float32)
+        elif query_embedding is not None:
+            relevance = vectors @ self._normalize(np.asarray(query_embedding, dtype=np.float32))
+        else:
+            relevance = np.linspace(1.0, 0.5, n, dtype=np.float32)
+        k = n if k is None else min(k, n)
+
+        similarities = vectors @ vectors.T
+        # Highest similarity of every candidate to the selection so far
+        redundancy = np.full(n, -np.inf, dtype=np.float32)
+        available = np.ones(n, dtype=bool)
+        selected: List[int] = []
+        while len(selected) < k and available.any():
+            penalty = np.where(np.isfinite(redundancy), redundancy, 0.0)
+            mmr = self.mmr_lambda * relevance - (1.0 - self.mmr_lambda) * penalty
+            mmr[~available] = -np.inf
+            best = int(np.argmax(mmr))
+            selected.append(best)
+            available[best] = False
+            redundancy = np.maximum(redundancy, similarities[best])
+            available &= redundancy < self.duplicate_threshold
+        return selected
+
+    def quarantine(self, context_items: list[str], embeddings=None, relevance=None, k: Optional[int] = None) -> list[str]:
         """
-        Simulates quarantining context items that are deemed conflicting or distracting.
-        For now, this is a placeholder and simply returns the original list.
+        Removes redundant context items and orders the rest by maximal marginal relevance.
 
         Args:
             context_items: A list of context strings.
+            embeddings: Embedding of each item. Without embeddings only exact duplicates
+                (ignoring case and whitespace) are removed.
+            relevance: Relevance of each item to the task.
+            k: Maximum number of items kept.
 
         Returns:
             A filtered list of context strings.
         """
-        # In a real implementation, this would involve analyzing context for conflicts
-        # or irrelevance based on current task and knowledge base.
-        print("ContextQuarantiner: Simulating context quarantining.")
-        return context_items
\ No newline at end of file
+        if embeddings is None:
+            seen = set()
+            unique = []
+            for item in context_items:
+                key = " ".join(item.lower().split())
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(item)
+            return unique[:k] if k is not None else unique
+        return [context_items[i] for i in self.select(embeddings, relevance=relevance, k=k)]
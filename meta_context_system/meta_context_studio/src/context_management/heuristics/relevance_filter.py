@@ -1,25 +1,119 @@
 """Heuristic for filtering context based on relevance."""
-from typing import List
+import re
+from typing import List, Optional, Tuple
+
+from meta_context_studio.config import settings
+from meta_context_studio.src.context_management.heuristics.summarizer import Summarizer, query_terms
+from meta_context_studio.src.context_management.heuristics.token_counter import TokenCounter
+
+_WORD = re.compile(r"\w+")
+
 
 class RelevanceFilter:
     """
     Prioritizes information based on its semantic relevance to the current task,
     ensuring the LLM focuses on the most pertinent details.
+
+    Context items are packed into a token budget with a greedy knapsack: items are taken
+    in order of relevance per token while they fit, and the most relevant item that did
+    not fit is compressed by the extractive Summarizer into the space that is left. The
+    packed context therefore never exceeds the budget.
     """
 
-    def filter_context(self, context_items: List[str], query: str) -> List[str]:
+    def __init__(
+        self,
+        token_budget: int = settings.CONTEXT_TOKEN_BUDGET,
+        per_item_overhead: int = settings.CONTEXT_ITEM_OVERHEAD_TOKENS,
+        min_compressed_tokens: int = settings.CONTEXT_MIN_COMPRESSED_TOKENS,
+        token_counter: Optional[TokenCounter] = None,
+        summarizer: Optional[Summarizer] = None,
+    ):
+        """
+        Args:
+            token_budget: Default number of tokens the packed context may use.
+            per_item_overhead: Tokens reserved per item for its header and separators.
+            min_compressed_tokens: Smallest space worth filling with a compressed item.
+            token_counter: Shared token counter (and count cache).
+            summarizer: Extractive summarizer used to compress overflowing items.
+        """
+        self.token_budget = token_budget
+        self.per_item_overhead = per_item_overhead
+        self.min_compressed_tokens = min_compressed_tokens
+        self.token_counter = token_counter or TokenCounter()
+        self.summarizer = summarizer or Summarizer(self.token_counter)
+
+    @staticmethod
+    def lexical_scores(context_items: List[str], query: str) -> List[float]:
+        """Share of the query's terms that occur in each item, for items without a retrieval score."""
+        terms = query_terms(query)
+        if not terms:
+            return [1.0] * len(context_items)
+        return [len(terms & set(_WORD.findall(item.lower()))) / len(terms) for item in context_items]
+
+    def pack(
+        self,
+        context_items: List[str],
+        query: str,
+        scores: Optional[List[float]] = None,
+        token_budget: Optional[int] = None,
+    ) -> List[Tuple[int, str]]:
+        """
+        Selects the context that fits the token budget.
+
+        Args:
+            context_items: Candidate context strings.
+            query: The query or current task description.
+            scores: Relevance of each item, e.g. retrieval similarities. Defaults to
+                query-term overlap.
+            token_budget: Tokens available for this call; defaults to `self.token_budget`.
+
+        Returns:
+            (index, text) pairs of the selected items, most relevant first. The text of at
+            most one item is an extractive summary of the original.
+        """
+        budget = self.token_budget if token_budget is None else token_budget
+        if scores is None:
+            scores = self.lexical_scores(context_items, query)
+        costs = [self.token_counter.count(item) + self.per_item_overhead for item in context_items]
+        by_density = sorted(range(len(context_items)), key=lambda i: (-scores[i] / max(costs[i], 1), i))
+
+        selected: List[Tuple[int, str]] = []
+        overflow: List[int] = []
+        remaining = budget
+        for i in by_density:
+            if costs[i] <= remaining:
+                selected.append((i, context_items[i]))
+                remaining -= costs[i]
+            else:
+                overflow.append(i)
+
+        space = remaining - self.per_item_overhead
+        if overflow and space >= self.min_compressed_tokens:
+            best = max(overflow, key=lambda i: (scores[i], -i))
+            compressed = self.summarizer.summarize(context_items[best], max_tokens=space, query=query)
+            if compressed:
+                selected.append((best, compressed))
+
+        selected.sort(key=lambda pair: (-scores[pair[0]], pair[0]))
+        return selected
+
+    def filter_context(
+        self,
+        context_items: List[str],
+        query: str,
+        scores: Optional[List[float]] = None,
+        token_budget: Optional[int] = None,
+    ) -> List[str]:
         """
-        Simulates filtering context items based on relevance to a query.
-        For now, this is a placeholder and simply returns the original list.
+        Filters context items down to the most relevant ones that fit the token budget.
 
         Args:
             context_items: A list of context strings.
             query: The query or current task description.
+            scores: Relevance of each item, e.g. retrieval similarities.
+            token_budget: Tokens available for this call.
 
         Returns:
-            A filtered list of context strings.
+            A filtered list of context strings, most relevant first.
         """
-        # In a real implementation, this would use embedding similarity
-        # or keyword matching to filter irrelevant information.
-        print(f"RelevanceFilter: Simulating relevance filtering for query: {query[:50]}...")
-        return context_items
\ No newline at end of file
+        return [text for _, text in self.pack(context_items, query, scores=scores, token_budget=token_budget)]
@@ -1,26 +1,67 @@
 """Heuristic for compressing long context."""
+import re
+from typing import List, Optional
+
+from meta_context_studio.src.context_management.heuristics.token_counter import TokenCounter
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+_WORD = re.compile(r"\w+")
+
+
+def query_terms(query: Optional[str]) -> set:
+    """Lower-cased words of a query, ignoring very short ones."""
+    return {word for word in _WORD.findall((query or "").lower()) if len(word) > 2}
+
 
 class Summarizer:
     """
     Employs techniques to reduce token usage by summarizing long documents
     or code snippets while meticulously preserving essential task information.
+
+    Summaries are extractive: the text is split into sentences, each sentence is scored by
+    its overlap with the query plus a small bonus for appearing early, and the best
+    sentences that fit the token budget are kept in their original order. No LLM call is
+    made, so compression is fast and deterministic.
     """
 
-    def summarize(self, text: str, max_tokens: int = 500) -> str:
+    def __init__(self, token_counter: Optional[TokenCounter] = None):
+        self.token_counter = token_counter or TokenCounter()
+
+    def summarize(self, text: str, max_tokens: int = 500, query: Optional[str] = None) -> str:
         """
-        Simulates summarizing a given text.
-        For now, this is a placeholder and simply truncates the text.
+        Compresses a text to at most `max_tokens` tokens.
 
         Args:
             text: The input text to summarize.
             max_tokens: The maximum number of tokens for the summary.
+            query: The task or question; sentences that mention its terms are preferred.
 
         Returns:
             The summarized text.
         """
-        # In a real implementation, this would use an LLM or a dedicated
-        # summarization model.
-        print(f"Summarizer: Simulating summarization for text length {len(text)} to {max_tokens} tokens.")
-        if len(text) > max_tokens * 4:  # Rough estimate of chars per token
-            return text[:max_tokens * 4] + "... [truncated]"
-        return text
\ No newline at end of file
+        if max_tokens <= 0:
+            return ""
+        if self.token_counter.count(text) <= max_tokens:
+            return text
+        sentences = [sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+        terms = query_terms(query)
+        scored = []
+        for position, sentence in enumerate(sentences):
+            words = set(_WORD.findall(sentence.lower()))
+            overlap = len(terms & words) / len(terms) if terms else 0.0
+            scored.append((overlap + 0.1 / (1 + position), position))
+
+        selected: List[int] = []
+        used = 0
+        for _, position in sorted(scored, reverse=True):
+            tokens = self.token_counter.count(sentences[position])
+            if used + tokens <= max_tokens:
+                selected.append(position)
+                used += tokens
+        if not selected:
+            # Even the best sentence is too long: keep its beginning
+            best = max(scored)[1]
+            return self.token_counter.truncate(sentences[best], max_tokens)
+        summary = " ".join(sentences[position] for position in sorted(selected))
+        # Joining can merge tokens differently than counting sentences one by one
+        return self.token_counter.truncate(summary, max_tokens)
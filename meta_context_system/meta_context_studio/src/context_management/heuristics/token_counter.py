@@ -0,0 +1,85 @@
+"""Token counting for context budgets."""
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from meta_context_studio.config import settings
+
+# Rough stand-in for a BPE tokenizer: words, numbers and single punctuation marks.
+_APPROXIMATE_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def _load_encoding(encoding_name: str) -> Optional[Callable[[str], List[int]]]:
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(encoding_name).encode
+    except Exception as e:
+        # tiktoken is missing, or its encoding file could not be downloaded
+        print(f"TokenCounter: Tokenizer '{encoding_name}' unavailable ({e}); approximating token counts.")
+        return None
+
+
+class TokenCounter:
+    """
+    Counts tokens with a BPE tokenizer (tiktoken) and caches the count of every text by
+    its hash, so a chunk that is packed into many prompts is tokenized once.
+
+    Without tiktoken (or when its encoding cannot be loaded) counts fall back to a
+    word-and-punctuation estimate, which is close to BPE counts for English prose.
+    """
+
+    def __init__(
+        self,
+        encoding_name: str = settings.TOKENIZER_ENCODING,
+        cache_size: int = settings.TOKEN_COUNT_CACHE_SIZE,
+        encode: Optional[Callable[[str], List[int]]] = None,
+    ):
+        """
+        Args:
+            encoding_name (str): tiktoken encoding, e.g. "cl100k_base".
+            cache_size (int): Number of token counts kept.
+            encode (Optional[Callable[[str], List[int]]]): Tokenizer to use instead of tiktoken.
+        """
+        self.encoding_name = encoding_name
+        self.cache_size = cache_size
+        self._encode = encode
+        self._encoding_loaded = encode is not None
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+
+    def _tokenize(self, text: str) -> List:
+        if not self._encoding_loaded:
+            self._encode = _load_encoding(self.encoding_name)
+            self._encoding_loaded = True
+        if self._encode is None:
+            return _APPROXIMATE_TOKEN.findall(text)
+        return self._encode(text)
+
+    def count(self, text: str) -> int:
+        """Returns the number of tokens in `text`."""
+        key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        count = self._counts.get(key)
+        if count is None:
+            count = len(self._tokenize(text))
+            self._counts[key] = count
+            if len(self._counts) > self.cache_size:
+                self._counts.popitem(last=False)
+        else:
+            self._counts.move_to_end(key)
+        return count
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cuts `text` at a word boundary so that it has at most `max_tokens` tokens."""
+        if self.count(text) <= max_tokens:
+            return text
+        words = text.split()
+        low, high = 0, len(words)
+        # Binary search for the longest prefix of words within the budget
+        while low < high:
+            middle = (low + high + 1) // 2
+            if len(self._tokenize(" ".join(words[:middle]))) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return " ".join(words[:low])
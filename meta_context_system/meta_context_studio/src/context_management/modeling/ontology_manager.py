@@ -1,4 +1,5 @@
 """Handles ontology loading, validation, and inference."""
+from meta_context_studio.src.knowledge_base.compiled_graph import load_graph_cached
 
 
 class OntologyManager:
@@ -19,9 +20,12 @@ class OntologyManager:
         """
         Loads an ontology into the knowledge graph.
 
+        The parsed ontology is cached in compiled form next to the file and reused on the
+        next start for as long as the file and the rdflib version are unchanged.
+
         Args:
             ontology_path: The path to the ontology file.
             ontology_format: The format of the ontology file (e.g., "turtle", "xml").
         """
-        self.knowledge_graph_engine.load_ontology(ontology_path, ontology_format)
-        print(f"OntologyManager: Loaded ontology from '{ontology_path}'")
+        count = load_graph_cached(self.knowledge_graph_engine.graph, ontology_path, ontology_format)
+        print(f"OntologyManager: Loaded ontology from '{ontology_path}' ({count} triples)")
@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from meta_context_studio.config import settings
+from meta_context_studio.src.utils.persistent_cache import PersistentCache
+
+
+def _run_coroutine(coroutine):
+    """Runs a coroutine to completion from synchronous code, even inside a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+class ChunkSummarizer:
+    """
+    Summarizes text chunks with bounded concurrency and a persistent memo.
+
+    Summaries are keyed by a hash of the chunk text and the prompt version, so a chunk is
+    summarized once per prompt version no matter how often it is retrieved. The chunks
+    that still need a summary are sent to the LLM concurrently, at most `max_concurrency`
+    at a time, so a batch takes about as long as its slowest call.
+    """
+
+    def __init__(
+        self,
+        summarize_async: Callable[[str], Awaitable[str]],
+        prompt_version: str,
+        max_concurrency: int = settings.SUMMARIZATION_MAX_CONCURRENCY,
+        cache: Optional[PersistentCache] = None,
+        requests_per_minute: Optional[float] = None,
+    ):
+        """
+        Args:
+            summarize_async (Callable[[str], Awaitable[str]]): Async LLM call summarizing one text.
+            prompt_version (str): Identifies the prompt and model; change it to invalidate
+                the memoized summaries.
+            max_concurrency (int): Maximum number of LLM calls in flight.
+            cache (Optional[PersistentCache]): Memo of summaries; defaults to the SQLite
+                file configured in settings.
+            requests_per_minute (Optional[float]): Spaces out the start of LLM calls to stay
+                under a provider rate limit. None starts them as soon as a slot is free.
+        """
+        self.summarize_async = summarize_async
+        self.prompt_version = prompt_version
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.cache = cache if cache is not None else PersistentCache(
+            "chunk_summaries", max_entries=settings.SUMMARY_CACHE_SIZE, db_path=settings.SUMMARY_CACHE_PATH
+        )
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.prompt_version}\0{text}".encode("utf-8")).hexdigest()
+
+    async def _summarize_all(self, texts: List[str]) -> Dict[str, Optional[str]]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pacing = asyncio.Lock()
+        interval = 60.0 / self.requests_per_minute if self.requests_per_minute else 0.0
+        next_start = [time.monotonic()]
+
+        async def summarize(text: str) -> Optional[str]:
+            async with semaphore:
+                if interval:
+                    async with pacing:
+                        delay = next_start[0] - time.monotonic()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        next_start[0] = max(next_start[0], time.monotonic()) + interval
+                try:
+                    return await self.summarize_async(text)
+                except Exception as e:
+                    print(f"Error summarizing chunk: {e}. Using original text.")
+                    return None
+
+        summaries = await asyncio.gather(*(summarize(text) for text in texts))
+        return dict(zip(texts, summaries))
+
+    def summarize(self, texts: List[str], fallback: bool = True) -> List[Optional[str]]:
+        """
+        Returns a summary for each text, in order. Texts whose summarization fails are
+        returned unchanged (or as None with `fallback=False`) and are not memoized.
+        """
+        summaries: Dict[str, Optional[str]] = {text: self.cache.get(self.key(text)) for text in set(texts)}
+        missing = [text for text, summary in summaries.items() if summary is None]
+        if missing:
+            print(f"Summarizing {len(missing)} chunks ({len(summaries) - len(missing)} already summarized)...")
+            for text, summary in _run_coroutine(self._summarize_all(missing)).items():
+                if summary is not None:
+                    self.cache.put(self.key(text), summary)
+                summaries[text] = summary
+        return [summaries[text] or (text if fallback else None) for text in texts]
+
+    def summarize_pending(self, vector_store, batch_size: int = settings.SUMMARY_INGEST_BATCH_SIZE, limit: Optional[int] = None) -> int:
+        """
+        Precomputes the `summary` column for every chunk of `vector_store` (a
+        LanceDBIngestionPipeline) that does not have one yet.
+
+        Each batch is written as soon as it is summarized, so an interrupted run resumes with
+        the chunks that are still empty; summaries of a batch that was not written yet come
+        from the memo. Chunks whose summarization fails stay empty for the next run.
+
+        Returns:
+            The number of chunks that received a summary.
+        """
+        chunk_ids = vector_store.chunk_ids_without_summary()
+        if limit is not None:
+            chunk_ids = chunk_ids[:limit]
+        written = 0
+        for offset in range(0, len(chunk_ids), batch_size):
+            texts = vector_store.get_texts_by_chunk_ids(chunk_ids[offset : offset + batch_size])
+            batch_ids = list(texts)
+            summaries = self.summarize([texts[chunk_id] for chunk_id in batch_ids], fallback=False)
+            written += vector_store.update_summaries(
+                {chunk_id: summary for chunk_id, summary in zip(batch_ids, summaries) if summary is not None}
+            )
+            print(f"Summarized {written} of {len(chunk_ids)} chunks.")
+        return written
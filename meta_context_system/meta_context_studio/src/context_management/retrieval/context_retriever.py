@@ -1,26 +1,68 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+import time
+import numpy as np
 from meta_context_studio.src.lancedb_ingestion.ingestion_pipeline import LanceDBIngestionPipeline
+from meta_context_studio.src.context_management.retrieval.query_embedding_cache import QueryEmbeddingCache
+from meta_context_studio.src.context_management.retrieval.chunk_summarizer import ChunkSummarizer
+from meta_context_studio.src.context_management.retrieval.reranker import CrossEncoderReranker
+from meta_context_studio.src.context_management.heuristics.relevance_filter import RelevanceFilter
+from meta_context_studio.src.context_management.heuristics.context_quarantiner import ContextQuarantiner
+from meta_context_studio.src.knowledge_base.graph_store import GraphStore
+from meta_context_studio.src.reasoning_core.hybrid_reasoning import HybridReasoning
 from meta_context_studio.config import settings
+from meta_context_studio.src.utils.metrics import REGISTRY
+from meta_context_studio.src.utils.timing import StageTimer
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
 
+# Part of the key of memoized chunk summaries; bump it when the summarization prompt changes.
+SUMMARY_PROMPT_VERSION = "v1"
+SUMMARY_MODEL = "models/gemini-2.5-flash"
+
+# Latency of every retrieval stage (embed, search, expand, rerank, diversify, summarize, format, total)
+RETRIEVAL_STAGE_SECONDS = REGISTRY.histogram(
+    "context_retrieval_stage_seconds", "Latency of ContextRetriever stages in seconds.", label="stage"
+)
+
 class ContextRetriever:
     """
     A dedicated class to handle all interactions with the unstructured knowledge base (LanceDB).
     This serves as the primary, standardized interface for any agent needing to perform semantic searches.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        centrality_weight: float = settings.RETRIEVAL_CENTRALITY_WEIGHT,
+        rerank: bool = settings.RERANKER_ENABLED,
+        graph_expansion: bool = settings.GRAPH_EXPANSION_ENABLED,
+    ):
         """
         Initializes the ContextRetriever, setting up a connection to the LanceDB knowledge base.
+
+        Args:
+            centrality_weight (float): Share of the ranking score taken from the precomputed
+                graph centrality of a chunk's document. 0 ranks by vector distance only.
+            rerank (bool): Whether to rerank the candidates with a local cross-encoder.
+            graph_expansion (bool): Whether to add the knowledge-graph neighbours of the
+                vector hits to the candidates.
         """
+        self.centrality_weight = centrality_weight
+        # Optional second stage that scores (query, chunk) pairs with a cross-encoder
+        self.reranker = CrossEncoderReranker() if rerank else None
+        # Repeated queries reuse their embedding instead of calling the embedding model
+        self.query_embedding_cache = QueryEmbeddingCache()
         # The pipeline handles the connection to the DB path and table from settings
         self.ingestion_pipeline = LanceDBIngestionPipeline(
             db_path=settings.KNOWLEDGE_BASE_PATH,
-            table_name=settings.LANCE_TABLE_NAME
+            table_name=settings.LANCE_TABLE_NAME,
+            query_embedding_cache=self.query_embedding_cache,
         )
-        self.llm = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash", temperature=0.2)
+        # Optional stage that adds related blocks from the knowledge graph to the vector hits
+        self.hybrid_reasoning = HybridReasoning(
+            GraphStore(content_resolver=self.ingestion_pipeline.get_texts_by_chunk_ids)
+        ) if graph_expansion else None
+        self.llm = ChatGoogleGenerativeAI(model=SUMMARY_MODEL, temperature=0.2)
         self.summarization_prompt = PromptTemplate(
             input_variables=["context"],
             template="""Summarize the following text concisely, focusing on key information relevant to software engineering:
@@ -30,8 +72,16 @@ class ContextRetriever:
 Summary:"""
         )
         self.summarization_chain = LLMChain(llm=self.llm, prompt=self.summarization_prompt)
+        self.chunk_summarizer = ChunkSummarizer(
+            lambda text: self.summarization_chain.arun(context=text),
+            prompt_version=f"{SUMMARY_PROMPT_VERSION}:{SUMMARY_MODEL}",
+        )
+        # Drops near-duplicate chunks and diversifies the results (MMR)
+        self.context_quarantiner = ContextQuarantiner()
+        # Packs the retrieved chunks into a bounded number of prompt tokens
+        self.relevance_filter = RelevanceFilter()
 
-    def retrieve_context(self, query: str, top_k: int = 5, summarize_context: bool = False) -> str:
+    def retrieve_context(self, query: str, top_k: int = 5, summarize_context: bool = False, token_budget: Optional[int] = None) -> str:
         """
         Takes a natural language query, retrieves the most relevant document chunks,
         and formats them into a context payload suitable for injection into an agent's prompt.
@@ -40,31 +90,241 @@ Summary:"""
             query (str): The natural language query to search for.
             top_k (int): The number of top results to retrieve.
             summarize_context (bool): Whether to summarize each retrieved context chunk.
+            token_budget (Optional[int]): Maximum tokens of retrieved text; defaults to
+                settings.CONTEXT_TOKEN_BUDGET.
 
         Returns:
             str: A formatted string containing the retrieved context.
         """
-        search_results = self.ingestion_pipeline.search(query, limit=top_k)
+        return self.explain_retrieval(query, top_k, summarize_context=summarize_context, token_budget=token_budget)["context"]
+
+    def explain_retrieval(self, query: str, top_k: int = 5, summarize_context: bool = False, token_budget: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Runs a retrieval like `retrieve_context` and reports how the context was built.
+
+        Args:
+            query (str): The natural language query to search for.
+            top_k (int): The number of top results to retrieve.
+            summarize_context (bool): Whether to summarize each retrieved context chunk.
+            token_budget (Optional[int]): Maximum tokens of retrieved text.
+
+        Returns:
+            Dict[str, Any]: `context` (the formatted string); `candidates`, one entry per
+            candidate fetched from LanceDB with chunk_id, source, distance, graph_score,
+            rerank_score, centrality, score, and whether it was selected and packed into the context;
+            `timings_ms` per stage and in total; `cache` hit flags for the query embedding
+            and counts of precomputed, memoized and newly generated summaries.
+        """
+        timer = StageTimer()
+        start = time.perf_counter()
+        embedding_hits = self.query_embedding_cache.hits
+        summary_hits, summary_misses = self.chunk_summarizer.cache.hits, self.chunk_summarizer.cache.misses
+
+        candidates, selected = self._search(query, top_k, timer)
+        context, packed, precomputed = self._format(selected, summarize_context, query, token_budget, timer)
+        timer.record("total", time.perf_counter() - start)
+        self._observe(timer)
+
+        selected_ids = {id(result) for result in selected}
+        packed_ids = {id(selected[index]) for index in packed}
+        return {
+            "context": context,
+            "candidates": [
+                {
+                    "chunk_id": result.get('chunk_id'),
+                    "source": result.get('source'),
+                    "distance": result.get('_distance'),
+                    "graph_score": result.get('graph_score'),
+                    "rerank_score": result.get('rerank_score'),
+                    "centrality": result.get('centrality'),
+                    "score": self.relevance_score(result),
+                    "selected": id(result) in selected_ids,
+                    "packed": id(result) in packed_ids,
+                }
+                for result in candidates
+            ],
+            "timings_ms": {stage: sum(samples) * 1000 for stage, samples in timer.durations.items()},
+            "cache": {
+                "query_embedding_hit": self.query_embedding_cache.hits > embedding_hits,
+                "precomputed_summaries": precomputed,
+                "memoized_summaries": self.chunk_summarizer.cache.hits - summary_hits,
+                "generated_summaries": self.chunk_summarizer.cache.misses - summary_misses,
+            },
+        }
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Returns up to top_k LanceDB rows (text, source, chunk_id, _distance, ...) for a query,
+        ranked with the centrality prior and diversified. Near-duplicate chunks are dropped,
+        so fewer than top_k rows may be returned.
+        """
+        timer = StageTimer()
+        selected = self._search(query, top_k, timer)[1]
+        self._observe(timer)
+        return selected
+
+    def _search(self, query: str, top_k: int, timer: StageTimer) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Returns every candidate fetched from LanceDB, ranked, and the selected rows."""
+        with timer.stage("embed"):
+            query_vector = self.ingestion_pipeline.embed_query(query)
+        # Over-fetch so that reranking and duplicate removal have candidates to choose from
+        limit = max(settings.RERANKER_CANDIDATES, top_k) if self.reranker is not None else top_k * settings.RETRIEVAL_CANDIDATE_MULTIPLIER
+        with timer.stage("search"):
+            candidates = self.ingestion_pipeline.search(query, limit=limit, query_vector=query_vector)
+        if self.hybrid_reasoning is not None:
+            with timer.stage("expand"):
+                candidates = candidates + self.expand_with_graph(candidates)
+        if self.reranker is not None:
+            with timer.stage("rerank"):
+                candidates = self.reranker.rerank(query, candidates)
+        with timer.stage("diversify"):
+            candidates = self.apply_centrality_prior(candidates)
+            selected = self.diversify(candidates, top_k)
+        return candidates, selected
+
+    def expand_with_graph(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Returns the LanceDB rows of the blocks that the knowledge graph relates to the given
+        vector hits and that are not among them, each with its `graph_score` (the hit's
+        similarity decayed per hop).
+        """
+        expanded = self.hybrid_reasoning.graph_expanded_retrieval(
+            results,
+            max_hops=settings.GRAPH_EXPANSION_MAX_HOPS,
+            max_expanded=settings.GRAPH_EXPANSION_MAX_BLOCKS,
+        )
+        seen = {result.get('chunk_id') for result in results}
+        graph_scores = {
+            result['chunk_id']: result['score'] for result in expanded
+            if result['origin'] == "graph" and result.get('chunk_id') and result['chunk_id'] not in seen
+        }
+        rows = self.ingestion_pipeline.get_rows_by_chunk_ids(list(graph_scores))
+        for row in rows:
+            row['graph_score'] = graph_scores[row['chunk_id']]
+        return rows
 
+    def diversify(self, results: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """
+        Selects up to top_k of the ranked rows by maximal marginal relevance over their
+        `vector` column, skipping near-duplicates. Rows without vectors are cut to top_k.
+        """
+        if not results or any(result.get('vector') is None for result in results):
+            return results[:top_k]
+        selected = self.context_quarantiner.select(
+            np.array([result['vector'] for result in results], dtype=np.float32),
+            relevance=[self.relevance_score(result) for result in results],
+            k=top_k,
+        )
+        return [results[i] for i in selected]
+
+    def format_context(
+        self,
+        search_results: List[Dict[str, Any]],
+        summarize_context: bool = False,
+        query: Optional[str] = None,
+        token_budget: Optional[int] = None,
+    ) -> str:
+        """
+        Formats search results into a context payload suitable for injection into an agent's prompt.
+        The chunks are packed into the token budget by relevance; a chunk that does not fit
+        may be included as an extractive summary.
+
+        Args:
+            search_results (List[Dict[str, Any]]): Rows returned by `search`.
+            summarize_context (bool): Whether to summarize each retrieved context chunk.
+            query (Optional[str]): The query, used to pick sentences when a chunk is compressed.
+            token_budget (Optional[int]): Maximum tokens of retrieved text.
+
+        Returns:
+            str: A formatted string containing the retrieved context.
+        """
+        timer = StageTimer()
+        context = self._format(search_results, summarize_context, query, token_budget, timer)[0]
+        self._observe(timer)
+        return context
+
+    @staticmethod
+    def _observe(timer: StageTimer):
+        """Records the stage timings in the RETRIEVAL_STAGE_SECONDS histogram served at /metrics."""
+        for stage, samples in timer.durations.items():
+            for seconds in samples:
+                RETRIEVAL_STAGE_SECONDS.observe(stage, seconds)
+
+    def _format(
+        self,
+        search_results: List[Dict[str, Any]],
+        summarize_context: bool,
+        query: Optional[str],
+        token_budget: Optional[int],
+        timer: StageTimer,
+    ) -> Tuple[str, List[int], int]:
+        """Returns the formatted context, the indices of the packed rows and the number of precomputed summaries used."""
         if not search_results:
-            return "No relevant context found in the knowledge base."
-
-        # Format the results into a clean string for the agent's context
-        formatted_context = "--- Relevant Context from Knowledge Base ---\n\n"
-        for i, result in enumerate(search_results):
-            text = result.get('text', 'No text available.')
-            source = result.get('metadata', {}).get('source', 'Unknown source')
-
-            if summarize_context:
-                print(f"Summarizing context from {source}...")
-                try:
-                    text = self.summarization_chain.run(context=text)
-                except Exception as e:
-                    print(f"Error summarizing context from {source}: {e}. Using original text.")
-
-            formatted_context += f"Context [{i+1}] (Source: {source}):\n"
-            formatted_context += f'"""\n{text}\n"""\n\n'
-        
-        formatted_context += "--- End of Context ---"
-        
-        return formatted_context
+            return "No relevant context found in the knowledge base.", [], 0
+
+        texts = [result.get('text', 'No text available.') for result in search_results]
+        precomputed = 0
+        if summarize_context:
+            with timer.stage("summarize"):
+                # Use the summaries precomputed at ingest time (`summarize-chunks`). Chunks without
+                # one are summarized concurrently; previously summarized chunks come from the memo.
+                missing = [i for i, result in enumerate(search_results) if not result.get('summary')]
+                summaries = self.chunk_summarizer.summarize([texts[i] for i in missing]) if missing else []
+                texts = [result.get('summary') or text for result, text in zip(search_results, texts)]
+                for i, summary in zip(missing, summaries):
+                    texts[i] = summary
+                precomputed = len(search_results) - len(missing)
+
+        with timer.stage("format"):
+            packed = self.relevance_filter.pack(
+                texts,
+                query or "",
+                scores=[self.relevance_score(result) for result in search_results],
+                token_budget=token_budget,
+            )
+
+            # Format the results into a clean string for the agent's context
+            formatted_context = "--- Relevant Context from Knowledge Base ---\n\n"
+            for i, (index, text) in enumerate(packed):
+                result = search_results[index]
+                source = result.get('source') or result.get('metadata', {}).get('source', 'Unknown source')
+
+                formatted_context += f"Context [{i+1}] (Source: {source}):\n"
+                formatted_context += f'"""\n{text}\n"""\n\n'
+
+            formatted_context += "--- End of Context ---"
+
+        return formatted_context, [index for index, _ in packed], precomputed
+
+    def apply_centrality_prior(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Reorders search results by (1 - w) * similarity + w * centrality, where similarity is
+        1 / (1 + _distance) and centrality is the row's precomputed `centrality` column.
+        Rows without a score (not yet computed) count as 0.
+
+        Args:
+            results (List[Dict[str, Any]]): LanceDB search rows.
+
+        Returns:
+            List[Dict[str, Any]]: The same rows, best first.
+        """
+        if self.centrality_weight <= 0:
+            return results
+        return sorted(results, key=self.relevance_score, reverse=True)
+
+    def relevance_score(self, result: Dict[str, Any]) -> float:
+        """
+        Ranking score of a search row: the cross-encoder score if the row was reranked, else
+        1 / (1 + _distance), or the graph score of a row added by graph expansion, mixed with
+        the centrality prior.
+        """
+        if result.get('rerank_score') is not None:
+            similarity = float(result['rerank_score'])
+        elif result.get('_distance') is None and result.get('graph_score') is not None:
+            similarity = float(result['graph_score'])
+        else:
+            similarity = 1.0 / (1.0 + float(result.get('_distance', 0.0)))
+        weight = self.centrality_weight
+        if weight <= 0:
+            return similarity
+        return (1.0 - weight) * similarity + weight * float(result.get('centrality') or 0.0)
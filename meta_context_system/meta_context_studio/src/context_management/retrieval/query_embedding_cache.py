@@ -0,0 +1,57 @@
+import hashlib
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from meta_context_studio.config import settings
+from meta_context_studio.src.utils.persistent_cache import PersistentCache
+
+
+def normalize_query(query: str) -> str:
+    """Case-folds a query and collapses its whitespace, so trivial variants share an entry."""
+    return " ".join(query.casefold().split())
+
+
+class QueryEmbeddingCache:
+    """
+    Caches query embeddings by normalized query text and embedding model, so repeated
+    queries (templated agent queries, repeated chat questions) skip the embedding model.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.QUERY_EMBEDDING_CACHE_SIZE,
+        ttl_seconds: Optional[float] = settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+        db_path: Optional[str] = settings.QUERY_EMBEDDING_CACHE_PATH,
+    ):
+        """
+        Args:
+            max_entries (int): Size of the in-process LRU.
+            ttl_seconds (Optional[float]): Age after which an embedding is recomputed.
+            db_path (Optional[str]): SQLite file shared across processes; None disables it.
+        """
+        self.cache = PersistentCache("query_embeddings", max_entries=max_entries, ttl_seconds=ttl_seconds, db_path=db_path)
+
+    @staticmethod
+    def key(query: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\0{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def embed(self, query: str, model: str, embed_fn: Callable[[str], List[float]]) -> List[float]:
+        """
+        Returns the embedding of `query` under `model`, calling `embed_fn` only on a miss.
+        Embeddings are stored as float32 arrays.
+        """
+        key = self.key(query, model)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = np.asarray(embed_fn(query), dtype=np.float32)
+            self.cache.put(key, vector)
+        return vector.tolist()
+
+    @property
+    def hits(self) -> int:
+        return self.cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self.cache.misses
@@ -0,0 +1,99 @@
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from meta_context_studio.config import settings
+
+
+class CrossEncoderReranker:
+    """
+    Reranks retrieval candidates with a local cross-encoder, which reads the query and a
+    chunk together and scores their relevance far more accurately than embedding distance.
+
+    All (query, chunk) pairs are scored in one batched `predict` call on the CPU. The
+    reranker keeps a running estimate of the cost per pair, and when scoring every
+    candidate would exceed the latency budget it scores only as many of the best
+    first-stage candidates as fit; the rest are dropped.
+
+    Cross-encoders output unbounded logits, so scores are passed through a sigmoid and
+    lie in (0, 1) like the other relevance scores they are mixed and compared with.
+    """
+
+    def __init__(
+        self,
+        model_name: str = settings.RERANKER_MODEL,
+        latency_budget_ms: Optional[float] = settings.RERANKER_LATENCY_BUDGET_MS,
+        batch_size: int = settings.RERANKER_BATCH_SIZE,
+        model: Any = None,
+    ):
+        """
+        Args:
+            model_name (str): sentence-transformers cross-encoder to load.
+            latency_budget_ms (Optional[float]): Wall-clock budget for one rerank call;
+                None scores every candidate.
+            batch_size (int): Pairs per forward pass inside the batched predict call.
+            model (Any): An already loaded model with a `predict(pairs, batch_size=...)`
+                method; the cross-encoder is loaded on first use otherwise.
+        """
+        self.model_name = model_name
+        self.latency_budget_ms = latency_budget_ms
+        self.batch_size = batch_size
+        self._model = model
+        # Exponential moving average of the scoring time per pair
+        self.ms_per_pair = settings.RERANKER_INITIAL_MS_PER_PAIR
+        self.last_truncated = 0
+
+    @property
+    def model(self):
+        if self._model is None:
+            from sentence_transformers import CrossEncoder
+
+            print(f"CrossEncoderReranker: Loading cross-encoder model: {self.model_name}")
+            self._model = CrossEncoder(self.model_name, device="cpu")
+        return self._model
+
+    def affordable_pairs(self, elapsed_ms: float = 0.0) -> Optional[int]:
+        """Number of pairs that can be scored within the remaining budget, or None if unbounded."""
+        if self.latency_budget_ms is None:
+            return None
+        return max(0, int((self.latency_budget_ms - elapsed_ms) / max(self.ms_per_pair, 1e-6)))
+
+    def rerank(self, query: str, results: List[Dict[str, Any]], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Scores the candidates against the query and returns them best first, each with a
+        `rerank_score` in (0, 1). Candidates must be in first-stage order, since truncation keeps the
+        leading ones. If not even one pair fits the budget, the candidates are returned as is.
+
+        Args:
+            query (str): The search query.
+            results (List[Dict[str, Any]]): Candidate rows with a `text` field.
+            top_k (Optional[int]): Number of rows returned; defaults to every scored row.
+        """
+        start = time.perf_counter()
+        # Loading the model is a one-time cost and does not count against the budget
+        model = self.model
+        affordable = self.affordable_pairs()
+        candidates = results if affordable is None else results[:affordable]
+        self.last_truncated = len(results) - len(candidates)
+        if not candidates:
+            return results[:top_k] if top_k is not None else results
+
+        scoring_start = time.perf_counter()
+        scores = model.predict([(query, row.get("text", "")) for row in candidates], batch_size=self.batch_size)
+        elapsed_ms = (time.perf_counter() - scoring_start) * 1000
+        self.ms_per_pair = 0.7 * self.ms_per_pair + 0.3 * elapsed_ms / len(candidates)
+
+        # Clipped so that extreme logits do not overflow exp; the order is unaffected
+        probabilities = 1.0 / (1.0 + np.exp(-np.clip(np.asarray(scores, dtype=np.float64), -50.0, 50.0)))
+        reranked = sorted(
+            ({**row, "rerank_score": float(score)} for row, score in zip(candidates, probabilities)),
+            key=lambda row: row["rerank_score"],
+            reverse=True,
+        )
+        if self.last_truncated:
+            print(
+                f"CrossEncoderReranker: Scored {len(candidates)} of {len(results)} candidates "
+                f"in {(time.perf_counter() - start) * 1000:.0f} ms to stay within {self.latency_budget_ms:g} ms."
+            )
+        return reranked[:top_k] if top_k is not None else reranked
@@ -0,0 +1,151 @@
+import hashlib
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+import numpy as np
+
+from meta_context_studio.config import settings
+
+
+def chunk_digest(texts: Mapping[str, str]) -> str:
+    """Fingerprint of a set of chunks, from their ids and texts."""
+    digest = hashlib.sha256()
+    for chunk_id in sorted(texts):
+        digest.update(f"{chunk_id}\0{texts[chunk_id]}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SemanticResponseCache:
+    """
+    Caches generated answers by the embedding of the question that produced them.
+
+    A new question is answered from the cache when its embedding has a cosine similarity
+    of at least `similarity_threshold` with a cached question and the chunks the cached
+    answer was generated from are unchanged. If the LanceDB table version still matches
+    the cached one the chunks cannot have changed; otherwise their current texts are
+    fetched and compared with the cached fingerprint, and a stale entry is dropped.
+
+    Entries live in a fixed-size matrix of normalized embeddings, so a lookup is a single
+    matrix-vector product. When the cache is full the least recently used entry is evicted.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = settings.SEMANTIC_CACHE_SIMILARITY_THRESHOLD,
+        max_entries: int = settings.SEMANTIC_CACHE_MAX_ENTRIES,
+    ):
+        """
+        Args:
+            similarity_threshold (float): Minimum cosine similarity for a cache hit.
+            max_entries (int): Number of answers kept.
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self._matrix: Optional[np.ndarray] = None
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * max_entries
+        self._last_used = np.zeros(max_entries, dtype=np.int64)
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self._entries)
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _touch(self, slot: int):
+        self._clock += 1
+        self._last_used[slot] = self._clock
+
+    def lookup(
+        self,
+        query_vector,
+        table_version: Any,
+        fetch_texts: Optional[Callable[[List[str]], Dict[str, str]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached entry (query, answer, chunk_ids, similarity) for the most similar
+        cached question, or None on a miss.
+
+        Args:
+            query_vector: Embedding of the new question.
+            table_version: Current version of the LanceDB table.
+            fetch_texts: Looks up the current texts of chunk ids. Used to revalidate an
+                entry cached at another table version; without it such entries are misses.
+        """
+        if self._matrix is None or len(self) == 0:
+            self.misses += 1
+            return None
+        similarities = self._matrix @ self._normalize(query_vector)
+        for slot in np.argsort(-similarities):
+            entry = self._entries[slot]
+            if similarities[slot] < self.similarity_threshold:
+                break
+            if entry is None:
+                continue
+            if entry["table_version"] != table_version:
+                if fetch_texts is None or chunk_digest(fetch_texts(entry["chunk_ids"])) != entry["digest"]:
+                    self._drop(slot)
+                    self.stale += 1
+                    continue
+                entry["table_version"] = table_version
+            self._touch(slot)
+            self.hits += 1
+            return {**entry, "similarity": float(similarities[slot])}
+        self.misses += 1
+        return None
+
+    def put(self, query: str, query_vector, results: List[Dict[str, Any]], answer: str, table_version: Any) -> bool:
+        """
+        Caches an answer with the search results it was generated from. Answers without
+        retrieved chunks, or from rows without chunk ids, are not cached because they
+        cannot be revalidated. Returns whether the answer was cached.
+        """
+        texts = {row["chunk_id"]: row.get("text", "") for row in results if row.get("chunk_id")}
+        if not texts or len(texts) != len(results):
+            return False
+        vector = self._normalize(query_vector)
+        if self._matrix is None:
+            self._matrix = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+        free = [slot for slot, entry in enumerate(self._entries) if entry is None]
+        if free:
+            slot = free[0]
+        else:
+            slot = int(np.argmin(self._last_used))
+            self.evictions += 1
+        self._matrix[slot] = vector
+        self._entries[slot] = {
+            "query": query,
+            "answer": answer,
+            "chunk_ids": list(texts),
+            "digest": chunk_digest(texts),
+            "table_version": table_version,
+        }
+        self._touch(slot)
+        return True
+
+    def _drop(self, slot: int):
+        self._entries[slot] = None
+        self._matrix[slot] = 0
+        self._last_used[slot] = 0
+
+    def clear(self):
+        for slot in range(self.max_entries):
+            if self._entries[slot] is not None:
+                self._drop(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stale": self.stale,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,120 @@
+import datetime
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class DeadLetterEntry(BaseModel):
+    """A document that failed ingestion and is held back until its next retry."""
+    file_path: str = Field(..., description="Absolute path of the failing document.")
+    document_hash: Optional[str] = Field(None, description="Content hash of the document when it last failed.")
+    fingerprint: str = Field(..., description="Fingerprint of the last failure (see utils.error_reporting).")
+    last_error: str = Field("", description="Type and message of the last failure.")
+    attempts: int = Field(0, description="Number of failed ingestion attempts.")
+    first_failed_at: float = Field(default_factory=time.time, description="Unix time of the first failure.")
+    last_failed_at: float = Field(default_factory=time.time, description="Unix time of the most recent failure.")
+    next_retry_at: float = Field(0.0, description="Unix time after which the document may be retried.")
+
+
+class DeadLetterQueue:
+    """
+    Persistent store of documents that failed ingestion, with exponential backoff.
+
+    A quarantined document is skipped by the pipeline until its retry is due. A document
+    whose content changed since it failed is retried immediately, since the fix may be
+    in the document itself.
+    """
+
+    def __init__(self, store_path: str, base_delay_seconds: float = 300, max_delay_seconds: float = 86400):
+        self.store_path = store_path
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._entries: Dict[str, DeadLetterEntry] = self._load()
+
+    def _load(self) -> Dict[str, DeadLetterEntry]:
+        if not os.path.exists(self.store_path):
+            return {}
+        try:
+            with open(self.store_path, "r", encoding="utf-8") as f:
+                raw_entries = json.load(f)
+            return {path: DeadLetterEntry.model_validate(entry) for path, entry in raw_entries.items()}
+        except Exception as e:
+            print(f"DeadLetterQueue: Could not read {self.store_path}: {e}. Starting with an empty queue.")
+            return {}
+
+    def _save(self):
+        store_dir = os.path.dirname(self.store_path)
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+        tmp_path = f"{self.store_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({path: entry.model_dump() for path, entry in self._entries.items()}, f, indent=2)
+        os.replace(tmp_path, self.store_path)
+
+    def _backoff(self, attempts: int) -> float:
+        return min(self.max_delay_seconds, self.base_delay_seconds * (2 ** max(0, attempts - 1)))
+
+    def record_failure(self, file_path: str, document_hash: Optional[str], fingerprint: str, error_message: str) -> DeadLetterEntry:
+        """Records a failed attempt and schedules the next retry."""
+        now = time.time()
+        entry = self._entries.get(file_path)
+        if entry is None:
+            entry = DeadLetterEntry(file_path=file_path, fingerprint=fingerprint, first_failed_at=now)
+            self._entries[file_path] = entry
+        entry.document_hash = document_hash
+        entry.fingerprint = fingerprint
+        entry.last_error = error_message
+        entry.attempts += 1
+        entry.last_failed_at = now
+        entry.next_retry_at = now + self._backoff(entry.attempts)
+        self._save()
+        return entry
+
+    def record_success(self, file_path: str):
+        """Releases a document from the queue after it was ingested successfully."""
+        if self._entries.pop(file_path, None) is not None:
+            self._save()
+
+    def is_quarantined(self, file_path: str, document_hash: Optional[str] = None, now: Optional[float] = None) -> bool:
+        """
+        Checks whether a document should be skipped because its retry is not yet due.
+        If `document_hash` is given and differs from the failing version, it is not quarantined.
+        """
+        entry = self._entries.get(file_path)
+        if entry is None:
+            return False
+        if document_hash is not None and entry.document_hash is not None and document_hash != entry.document_hash:
+            return False
+        return (now if now is not None else time.time()) < entry.next_retry_at
+
+    def requeue(self, file_paths: Optional[List[str]] = None) -> List[str]:
+        """
+        Makes quarantined documents due for retry immediately. The attempt count is kept,
+        so a document that fails again resumes its backoff where it left off.
+
+        Args:
+            file_paths (Optional[List[str]]): Documents to requeue. Defaults to all entries.
+
+        Returns:
+            List[str]: The paths that were requeued.
+        """
+        now = time.time()
+        targets = self._entries.keys() if file_paths is None else [p for p in file_paths if p in self._entries]
+        requeued = []
+        for path in list(targets):
+            self._entries[path].next_retry_at = now
+            requeued.append(path)
+        if requeued:
+            self._save()
+        return requeued
+
+    def entries(self) -> List[DeadLetterEntry]:
+        """Returns all entries, soonest retry first."""
+        return sorted(self._entries.values(), key=lambda entry: entry.next_retry_at)
+
+
+def format_timestamp(unix_time: float) -> str:
+    return datetime.datetime.fromtimestamp(unix_time).strftime("%Y%m%dT%H%M%S")
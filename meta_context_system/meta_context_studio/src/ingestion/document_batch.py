@@ -0,0 +1,228 @@
+import base64
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+from meta_context_studio.src.ingestion.data_models import ParsedDocument, ContentBlock, ContentBlockType, DocumentType
+
+# Block types are stored as small integer codes; the code is the position in this tuple.
+BLOCK_TYPES: Tuple[ContentBlockType, ...] = tuple(ContentBlockType)
+_BLOCK_TYPE_CODES = {block_type: code for code, block_type in enumerate(BLOCK_TYPES)}
+
+
+def make_chunk_id(document_id: str, block_index: int) -> str:
+    """Stable id of a block, shared by its LanceDB row and its graph node."""
+    return f"{document_id}:{block_index}"
+
+
+class DocumentBatch:
+    """
+    Columnar representation of a parsed document.
+
+    All block texts live in one string addressed by an offsets array, block types are a
+    uint8 array, and embeddings are a single float32 matrix with a mask for blocks that
+    have none. This avoids one pydantic object and hundreds of boxed floats per block;
+    `to_parsed_document()` builds the equivalent ParsedDocument when one is needed.
+    """
+
+    def __init__(
+        self,
+        document_id: str,
+        document_type: DocumentType,
+        source_path: str,
+        metadata: Dict[str, Any],
+        text: str,
+        offsets: np.ndarray,
+        block_types: np.ndarray,
+        block_metadata: List[Dict[str, Any]],
+        embeddings: Optional[np.ndarray] = None,
+        embedding_mask: Optional[np.ndarray] = None,
+    ):
+        self.document_id = document_id
+        self.document_type = DocumentType(document_type)
+        self.source_path = source_path
+        self.metadata = metadata
+        self.text = text
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.block_types = np.asarray(block_types, dtype=np.uint8)
+        self.block_metadata = block_metadata
+        self.embeddings = embeddings
+        self.embedding_mask = embedding_mask
+
+    def __len__(self) -> int:
+        return len(self.block_types)
+
+    def block_text(self, index: int) -> str:
+        return self.text[self.offsets[index]:self.offsets[index + 1]]
+
+    def block_type(self, index: int) -> ContentBlockType:
+        return BLOCK_TYPES[self.block_types[index]]
+
+    def texts(self) -> List[str]:
+        offsets = self.offsets.tolist()
+        return [self.text[offsets[i]:offsets[i + 1]] for i in range(len(self))]
+
+    def iter_blocks(self) -> Iterator[Tuple[int, ContentBlockType, str, Dict[str, Any]]]:
+        """Yields (block_index, block_type, content, metadata) without building ContentBlocks."""
+        for index, content in enumerate(self.texts()):
+            yield index, BLOCK_TYPES[self.block_types[index]], content, self.block_metadata[index]
+
+    def text_block_mask(self) -> np.ndarray:
+        """Boolean mask of the blocks with non-blank text, i.e. the blocks worth indexing."""
+        return np.array([bool(text.strip()) for text in self.texts()], dtype=bool)
+
+    def has_embedding(self, index: int) -> bool:
+        return self.embeddings is not None and bool(self.embedding_mask[index])
+
+    def set_embeddings(self, embeddings: np.ndarray, embedding_mask: np.ndarray):
+        """Attaches a (num_blocks, dim) float32 matrix; rows where the mask is False are ignored."""
+        if embeddings.shape[0] != len(self):
+            raise ValueError(f"Expected {len(self)} embedding rows, got {embeddings.shape[0]}.")
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.embedding_mask = np.asarray(embedding_mask, dtype=bool)
+
+    @classmethod
+    def from_parsed_document(cls, document: ParsedDocument) -> "DocumentBatch":
+        builder = DocumentBatchBuilder()
+        for block in document.content_blocks:
+            builder.append(block.block_type, block.content, block.metadata)
+        batch = builder.build(document.document_id, document.document_type, document.source_path, document.metadata)
+        embedded = [block.embedding for block in document.content_blocks if block.embedding is not None]
+        if embedded:
+            dim = len(embedded[0])
+            matrix = np.zeros((len(batch), dim), dtype=np.float32)
+            mask = np.zeros(len(batch), dtype=bool)
+            for i, block in enumerate(document.content_blocks):
+                if block.embedding is not None:
+                    matrix[i] = block.embedding
+                    mask[i] = True
+            batch.set_embeddings(matrix, mask)
+        return batch
+
+    def to_parsed_document(self, include_embeddings: bool = True) -> ParsedDocument:
+        """Builds a ParsedDocument view of this batch for code that expects the pydantic model."""
+        content_blocks = []
+        for index, block_type, content, metadata in self.iter_blocks():
+            embedding = None
+            if include_embeddings and self.has_embedding(index):
+                embedding = self.embeddings[index].tolist()
+            content_blocks.append(ContentBlock(
+                block_type=block_type,
+                content=content,
+                block_index=index,
+                metadata=metadata,
+                embedding=embedding,
+            ))
+        return ParsedDocument(
+            document_id=self.document_id,
+            document_type=self.document_type,
+            source_path=self.source_path,
+            metadata=self.metadata,
+            content_blocks=content_blocks,
+        )
+
+    def to_arrow(self, include_vectors: bool = True):
+        """
+        Returns the embedded blocks as a pyarrow Table (text, vector, source, document_id,
+        block_index, chunk_id) ready for a bulk LanceDB write. The vector column is built from the
+        embedding matrix without converting it to Python floats.
+
+        With `include_vectors` False, e.g. for a store that embeds with its own model, the
+        vector column is left out and every block with text is returned, embedded or not.
+        """
+        if not include_vectors:
+            rows = np.flatnonzero(self.text_block_mask())
+        elif self.embeddings is None:
+            rows = np.zeros(0, dtype=np.int64)
+            vectors = np.zeros((0, 0), dtype=np.float32)
+        else:
+            rows = np.flatnonzero(self.embedding_mask)
+            vectors = self.embeddings[rows]
+        texts = self.texts()
+        columns = {"text": pa.array([texts[i] for i in rows], type=pa.string())}
+        if include_vectors:
+            columns["vector"] = pa.FixedSizeListArray.from_arrays(pa.array(vectors.reshape(-1), type=pa.float32()), vectors.shape[1])
+        columns.update({
+            "source": pa.array([self.source_path] * len(rows), type=pa.string()),
+            "document_id": pa.array([self.document_id] * len(rows), type=pa.string()),
+            "block_index": pa.array(rows, type=pa.int32()),
+            "chunk_id": pa.array([make_chunk_id(self.document_id, i) for i in rows], type=pa.string()),
+        })
+        return pa.table(columns)
+
+    def to_dict(self, include_embeddings: bool = True) -> Dict[str, Any]:
+        """
+        JSON-safe form; embeddings are stored as base64-encoded float32 bytes, or left out
+        when `include_embeddings` is False.
+        """
+        record = {
+            "document_id": self.document_id,
+            "document_type": self.document_type.value,
+            "source_path": self.source_path,
+            "metadata": self.metadata,
+            "text": self.text,
+            "offsets": self.offsets.tolist(),
+            "block_types": self.block_types.tolist(),
+            "block_metadata": self.block_metadata,
+            "embeddings": None,
+        }
+        if include_embeddings and self.embeddings is not None:
+            record["embeddings"] = {
+                "shape": list(self.embeddings.shape),
+                "data": base64.b64encode(self.embeddings.tobytes()).decode("ascii"),
+                "mask": base64.b64encode(np.packbits(self.embedding_mask).tobytes()).decode("ascii"),
+            }
+        return record
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "DocumentBatch":
+        batch = cls(
+            document_id=record["document_id"],
+            document_type=record["document_type"],
+            source_path=record["source_path"],
+            metadata=record["metadata"],
+            text=record["text"],
+            offsets=np.array(record["offsets"], dtype=np.int64),
+            block_types=np.array(record["block_types"], dtype=np.uint8),
+            block_metadata=record["block_metadata"],
+        )
+        embeddings = record.get("embeddings")
+        if embeddings:
+            rows, dim = embeddings["shape"]
+            matrix = np.frombuffer(base64.b64decode(embeddings["data"]), dtype=np.float32).reshape(rows, dim)
+            mask = np.unpackbits(np.frombuffer(base64.b64decode(embeddings["mask"]), dtype=np.uint8))[:rows]
+            batch.set_embeddings(matrix.copy(), mask.astype(bool))
+        return batch
+
+
+class DocumentBatchBuilder:
+    """Accumulates blocks during parsing and packs them into a DocumentBatch."""
+
+    def __init__(self):
+        self._texts: List[str] = []
+        self._block_types: List[int] = []
+        self._block_metadata: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def append(self, block_type: ContentBlockType, content: str, metadata: Optional[Dict[str, Any]] = None):
+        self._texts.append(content)
+        self._block_types.append(_BLOCK_TYPE_CODES[ContentBlockType(block_type)])
+        self._block_metadata.append(metadata or {})
+
+    def build(self, document_id: str, document_type: DocumentType, source_path: str, metadata: Dict[str, Any]) -> DocumentBatch:
+        offsets = np.zeros(len(self._texts) + 1, dtype=np.int64)
+        if self._texts:
+            np.cumsum([len(text) for text in self._texts], out=offsets[1:])
+        return DocumentBatch(
+            document_id=document_id,
+            document_type=document_type,
+            source_path=source_path,
+            metadata=metadata,
+            text="".join(self._texts),
+            offsets=offsets,
+            block_types=np.array(self._block_types, dtype=np.uint8),
+            block_metadata=self._block_metadata,
+        )
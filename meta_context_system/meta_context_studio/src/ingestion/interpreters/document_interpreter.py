@@ -1,6 +1,8 @@
 from typing import List
+import numpy as np
 from sentence_transformers import SentenceTransformer
-from meta_context_studio.src.ingestion.data_models import ParsedDocument, ContentBlock
+from meta_context_studio.src.ingestion.data_models import ParsedDocument
+from meta_context_studio.src.ingestion.document_batch import DocumentBatch
 
 class DocumentInterpreter:
     """
@@ -9,9 +11,10 @@ class DocumentInterpreter:
     such as entity extraction, relationship extraction, and embedding generation.
     """
 
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', encode_batch_size: int = 64):
         print(f"DocumentInterpreter: Initializing SentenceTransformer model: {model_name}")
         self.embedding_model = SentenceTransformer(model_name)
+        self.encode_batch_size = encode_batch_size
         print("DocumentInterpreter: SentenceTransformer model loaded.")
 
     def interpret_document(self, parsed_document: ParsedDocument) -> ParsedDocument:
@@ -19,19 +22,10 @@ class DocumentInterpreter:
         Processes a ParsedDocument to extract and enrich information.
         This method now generates embeddings for each content block.
         """
-        print(f"DocumentInterpreter: Interpreting document {parsed_document.document_id} with {len(parsed_document.content_blocks)} content blocks.")
+        batch = self.interpret_batch(DocumentBatch.from_parsed_document(parsed_document))
         for i, block in enumerate(parsed_document.content_blocks):
-            if not block.content or not block.content.strip():
-                print(f"Warning: Skipping embedding generation for empty content block {i} in document {parsed_document.document_id}.")
-                block.embedding = None
-                continue
-            try:
-                block.embedding = self._generate_embeddings(block.content)
-                print(f"Debug: Generated embedding for block {i} (content length: {len(block.content)}). Embedding is not None: {block.embedding is not None}")
-            except Exception as e:
-                print(f"Warning: Could not generate embedding for block {i} in document {parsed_document.document_id}. Error: {e}")
-                block.embedding = None
-        
+            block.embedding = batch.embeddings[i].tolist() if batch.has_embedding(i) else None
+
         # In a real scenario, you might also:
         # 2. Perform Named Entity Recognition (NER)
         # 3. Extract relationships between entities
@@ -39,9 +33,43 @@ class DocumentInterpreter:
 
         return parsed_document
 
-    def _generate_embeddings(self, text: str) -> List[float]:
+    def interpret_batch(self, batch: DocumentBatch) -> DocumentBatch:
+        """
+        Generates embeddings for all blocks of a DocumentBatch in batched model calls
+        and stores them as one float32 matrix on the batch. If the batched call fails,
+        the blocks are encoded one by one so that only the failing blocks lose their
+        embedding.
+        """
+        print(f"DocumentInterpreter: Interpreting document {batch.document_id} with {len(batch)} content blocks.")
+        texts = batch.texts()
+        mask = batch.text_block_mask()
+        skipped = len(texts) - int(mask.sum())
+        if skipped:
+            print(f"Warning: Skipping embedding generation for {skipped} empty content blocks in document {batch.document_id}.")
+
+        dim = self.embedding_model.get_sentence_embedding_dimension()
+        embeddings = np.zeros((len(texts), dim), dtype=np.float32)
+        if mask.any():
+            try:
+                embeddings[mask] = self._generate_embeddings([text for text, keep in zip(texts, mask) if keep])
+            except Exception as e:
+                print(f"Warning: Batched embedding failed for document {batch.document_id}, encoding blocks one by one. Error: {e}")
+                for index in np.flatnonzero(mask):
+                    try:
+                        embeddings[index] = self._generate_embeddings([texts[index]])[0]
+                    except Exception as block_error:
+                        print(f"Warning: Could not generate an embedding for block {index} of document {batch.document_id}. Error: {block_error}")
+                        mask[index] = False
+        batch.set_embeddings(embeddings, mask)
+        return batch
+
+    def _generate_embeddings(self, texts: List[str]) -> np.ndarray:
         """
-        Generates embeddings for the given text using the loaded SentenceTransformer model.
+        Generates embeddings for the given texts using the loaded SentenceTransformer model.
         """
-        # The encode method returns a numpy array, convert to list for Pydantic compatibility
-        return self.embedding_model.encode(text).tolist()
+        return self.embedding_model.encode(
+            texts,
+            batch_size=self.encode_batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ).astype(np.float32, copy=False)
@@ -0,0 +1,260 @@
+import json
+import os
+import uuid
+from typing import Any, Dict, List, Optional, Set, Union
+
+import pyarrow as pa
+
+from meta_context_studio.src.ingestion.data_models import ParsedDocument
+from meta_context_studio.src.ingestion.document_batch import DocumentBatch
+from meta_context_studio.src.utils.timing import StageTimer
+
+# Sinks are applied in this order and each one is recorded in the journal once it
+# has been written, so a replay only redoes the steps that never completed.
+JOURNAL_SINKS = ("vector", "graph", "processed")
+
+
+class JournalCommitError(RuntimeError):
+    """A batch could not be committed; `entries` are the documents that were in it."""
+
+    def __init__(self, entries: List["JournalEntry"], cause: Exception):
+        super().__init__(f"Failed to commit a batch of {len(entries)} documents: {type(cause).__name__}: {cause}")
+        self.entries = entries
+        self.cause = cause
+
+
+class JournalEntry:
+    """
+    A single parsed document waiting to be committed. Its journal record holds what a
+    replay needs (texts, offsets, block types, metadata and hashes) but no embeddings,
+    since the vector store embeds the texts itself.
+    """
+
+    def __init__(self, document: DocumentBatch, document_hash: str, file_path: str):
+        self.document = document
+        self.document_hash = document_hash
+        self.file_path = file_path
+
+    def to_record(self) -> Dict[str, Any]:
+        return {
+            "document_hash": self.document_hash,
+            "file_path": self.file_path,
+            "batch": self.document.to_dict(include_embeddings=False),
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "JournalEntry":
+        if "batch" in record:
+            document = DocumentBatch.from_dict(record["batch"])
+        else:
+            # Journals written before documents were staged in columnar form
+            document = DocumentBatch.from_parsed_document(ParsedDocument.model_validate(record["document"]))
+        return cls(
+            document=document,
+            document_hash=record["document_hash"],
+            file_path=record["file_path"],
+        )
+
+
+class IngestionJournal:
+    """
+    A write-ahead journal that commits interpreted documents in batches to the
+    vector store, the graph store and the processed-files log.
+
+    Documents are buffered until `batch_size` is reached. A flush first writes the
+    whole batch to the journal file, then performs one bulk write per sink, and
+    finally records a commit marker. A batch whose sink raises is aborted and handed
+    to the caller, which dead-letters its documents. On restart, `replay()` re-applies
+    every batch that has neither a commit nor an abort marker (i.e. the process died
+    mid-commit), skipping the sinks that were already written. A batch that fails
+    again on replay is moved to a quarantine file and aborted, so it cannot block
+    every later start; its documents are not in the processed-files log and are
+    ingested again on the next run.
+
+    The vector sink hands the texts of all non-blank blocks to `vector_store.upsert_chunks`,
+    which embeds them with the vector table's own model and skips chunks it already holds.
+    """
+
+    def __init__(
+        self,
+        journal_path: str,
+        processed_files_log: str,
+        graph_store: Any,
+        vector_store: Any,
+        batch_size: int = 16,
+        stage_timer: Optional[StageTimer] = None,
+    ):
+        self.journal_path = journal_path
+        self.processed_files_log = processed_files_log
+        self.graph_store = graph_store
+        self.vector_store = vector_store
+        self.batch_size = max(1, batch_size)
+        self.stage_timer = stage_timer or StageTimer()
+        self.quarantine_path = f"{journal_path}.quarantine"
+        self._pending: List[JournalEntry] = []
+        self._open_batches: Set[str] = set()
+
+    def stage(self, document: Union[DocumentBatch, ParsedDocument], document_hash: str, file_path: str) -> bool:
+        """
+        Buffers a document for the next commit.
+        Returns True if the buffer reached `batch_size` and was flushed.
+        """
+        if isinstance(document, ParsedDocument):
+            document = DocumentBatch.from_parsed_document(document)
+        self._pending.append(JournalEntry(document, document_hash, file_path))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+            return True
+        return False
+
+    def is_staged(self, document_hash: str) -> bool:
+        """Checks whether a document is buffered but not yet committed."""
+        return any(entry.document_hash == document_hash for entry in self._pending)
+
+    def flush(self) -> int:
+        """
+        Commits all buffered documents as one journaled batch.
+        Returns the number of documents committed. Raises JournalCommitError, which names
+        the documents of the batch, if a sink fails. The failed batch is aborted in the
+        journal, so it is not replayed behind the dead-letter queue's back and no longer
+        holds the journal open.
+        """
+        if not self._pending:
+            return 0
+        entries, self._pending = self._pending, []
+        batch_id = uuid.uuid4().hex
+        self._open_batches.add(batch_id)
+        self._append_record({
+            "op": "begin",
+            "batch_id": batch_id,
+            "entries": [entry.to_record() for entry in entries],
+        })
+        try:
+            self._apply_batch(batch_id, entries, completed_sinks=set())
+        except Exception as e:
+            self._append_record({"op": "abort", "batch_id": batch_id})
+            self._open_batches.discard(batch_id)
+            self._checkpoint()
+            raise JournalCommitError(entries, e) from e
+        self._checkpoint()
+        print(f"IngestionJournal: Committed batch {batch_id} with {len(entries)} documents.")
+        return len(entries)
+
+    def replay(self) -> int:
+        """
+        Re-applies every batch in the journal that was not committed, e.g. after a crash.
+        Returns the number of documents recovered.
+        """
+        recovered = 0
+        for batch_id, entries, completed_sinks in self._uncommitted_batches():
+            self._open_batches.add(batch_id)
+            print(f"IngestionJournal: Replaying uncommitted batch {batch_id} ({len(entries)} documents, already applied: {sorted(completed_sinks) or 'none'}).")
+            try:
+                self._apply_batch(batch_id, entries, completed_sinks)
+            except Exception as e:
+                self._quarantine_batch(batch_id, entries, e)
+                continue
+            recovered += len(entries)
+        self._checkpoint()
+        return recovered
+
+    def _quarantine_batch(self, batch_id: str, entries: List[JournalEntry], error: Exception):
+        """Copies a batch that cannot be replayed to the quarantine file and aborts it."""
+        record = {
+            "batch_id": batch_id,
+            "error": f"{type(error).__name__}: {error}",
+            "entries": [entry.to_record() for entry in entries],
+        }
+        with open(self.quarantine_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._append_record({"op": "abort", "batch_id": batch_id})
+        self._open_batches.discard(batch_id)
+        print(f"IngestionJournal: Batch {batch_id} failed to replay ({record['error']}); moved it to {self.quarantine_path}.")
+
+    def _apply_batch(self, batch_id: str, entries: List[JournalEntry], completed_sinks: Set[str]):
+        """Writes a batch to every sink that has not yet been applied, then commits it."""
+        for sink in JOURNAL_SINKS:
+            if sink in completed_sinks:
+                continue
+            with self.stage_timer.stage(f"commit_{sink}"):
+                getattr(self, f"_write_{sink}")(entries)
+            self._append_record({"op": "applied", "batch_id": batch_id, "sink": sink})
+        self._append_record({"op": "commit", "batch_id": batch_id})
+        self._open_batches.discard(batch_id)
+
+    def _write_vector(self, entries: List[JournalEntry]):
+        tables = [entry.document.to_arrow(include_vectors=False) for entry in entries]
+        tables = [table for table in tables if table.num_rows]
+        if tables:
+            self.vector_store.upsert_chunks(pa.concat_tables(tables))
+
+    def _write_graph(self, entries: List[JournalEntry]):
+        for entry in entries:
+            self.graph_store.add_document_to_graph(entry.document)
+        self.graph_store.save_graph()
+
+    def _write_processed(self, entries: List[JournalEntry]):
+        lines = "".join(f"{entry.document_hash},{entry.file_path}\n" for entry in entries)
+        with open(self.processed_files_log, "a") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _append_record(self, record: Dict[str, Any]):
+        """Appends a record to the journal and forces it to disk before returning."""
+        journal_dir = os.path.dirname(self.journal_path)
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_records(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.journal_path):
+            return []
+        records = []
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn write at the tail of the journal: the batch it belongs
+                    # to never reached its commit marker and is handled as uncommitted.
+                    print(f"IngestionJournal: Ignoring corrupt journal record in {self.journal_path}.")
+        return records
+
+    def _uncommitted_batches(self):
+        batches: Dict[str, List[JournalEntry]] = {}
+        applied: Dict[str, Set[str]] = {}
+        for record in self._read_records():
+            batch_id = record.get("batch_id")
+            if record.get("op") == "begin":
+                batches[batch_id] = [JournalEntry.from_record(r) for r in record.get("entries", [])]
+                applied[batch_id] = set()
+            elif record.get("op") == "applied" and batch_id in applied:
+                applied[batch_id].add(record.get("sink"))
+            elif record.get("op") in ("commit", "abort"):
+                batches.pop(batch_id, None)
+                applied.pop(batch_id, None)
+        return [(batch_id, entries, applied[batch_id]) for batch_id, entries in batches.items()]
+
+    def _checkpoint(self):
+        """Truncates the journal once every batch in it has been committed."""
+        if not self._open_batches and os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def pending_count(self) -> int:
+        """Returns the number of buffered, uncommitted documents."""
+        return len(self._pending)
+
+
+def default_journal_path(processed_files_log: str) -> str:
+    """Places the journal next to the processed-files log it protects."""
+    return f"{processed_files_log}.wal"
+
@@ -1,7 +1,7 @@
 import hashlib
-from typing import List
 from bs4 import BeautifulSoup
-from meta_context_studio.src.ingestion.data_models import ParsedDocument, ContentBlock, DocumentType, ContentBlockType
+from meta_context_studio.src.ingestion.data_models import ParsedDocument, DocumentType, ContentBlockType
+from meta_context_studio.src.ingestion.document_batch import DocumentBatch, DocumentBatchBuilder
 
 def generate_document_id(content: str) -> str:
     """Generates a unique SHA256 hash for the document content."""
@@ -15,8 +15,19 @@ def parse_html_document(
     """
     Parses an HTML document and extracts its content into a structured ParsedDocument.
     """
+    return parse_html_to_batch(file_path, document_type, source_content).to_parsed_document()
+
+def parse_html_to_batch(
+    file_path: str,
+    document_type: DocumentType,
+    source_content: str
+) -> DocumentBatch:
+    """
+    Parses an HTML document into a columnar DocumentBatch, without creating
+    a ContentBlock object per extracted block.
+    """
     soup = BeautifulSoup(source_content, 'html.parser')
-    content_blocks: List[ContentBlock] = []
+    content_blocks = DocumentBatchBuilder()
 
     # Extract title for metadata
     title_tag = soup.find('title')
@@ -43,20 +54,19 @@ def parse_html_document(
                 block_type = ContentBlockType.PARAGRAPH # Treat as a general text block
 
         if block_type and element.get_text(strip=True):
-            content_blocks.append(ContentBlock(
-                block_type=block_type,
-                content=element.get_text(separator=' ', strip=True),
-                block_index=len(content_blocks), # Assign a sequential index
-                metadata={'tag': element.name, 'class': element.get('class', [])}
-            ))
+            # The block index is the block's position in the batch
+            content_blocks.append(
+                block_type,
+                element.get_text(separator=' ', strip=True),
+                {'tag': element.name, 'class': element.get('class', [])}
+            )
     print(f"HTMLParser: Extracted {len(content_blocks)} content blocks.")
 
     document_id = generate_document_id(source_content)
 
-    return ParsedDocument(
+    return content_blocks.build(
         document_id=document_id,
         document_type=document_type,
         source_path=file_path,
-        metadata={'title': title},
-        content_blocks=content_blocks
+        metadata={'title': title}
     )
@@ -1,32 +1,76 @@
 import os
 import hashlib
 from typing import Optional, List
-import inspect
-import sys
 
 from meta_context_studio.src.ingestion.data_models import ParsedDocument, DocumentType
-from meta_context_studio.src.ingestion.parsers.html_parser import parse_html_document
-from meta_context_studio.src.ingestion.interpreters.document_interpreter import DocumentInterpreter
-from meta_context_studio.src.utils.error_reporting import generate_error_report
+from meta_context_studio.src.ingestion.parsers.html_parser import parse_html_to_batch
+from meta_context_studio.src.ingestion.document_batch import DocumentBatch
+from meta_context_studio.src.ingestion.journal import IngestionJournal, JournalCommitError, default_journal_path
+from meta_context_studio.src.ingestion.dead_letter_queue import DeadLetterQueue
+from meta_context_studio.src.utils.error_reporting import generate_error_report, extract_code_context, flush_error_reports, fingerprint_exception
+from meta_context_studio.src.utils.timing import StageTimer
+from meta_context_studio.config import settings
 
 from meta_context_studio.src.knowledge_base.graph_store import GraphStore
 from meta_context_studio.src.agent_orchestration.knowledge_graph_update_agent import KnowledgeGraphUpdateAgent
 from meta_context_studio.src.lancedb_ingestion.ingestion_pipeline import LanceDBIngestionPipeline # New import
+from meta_context_studio.src.context_management.retrieval.chunk_summarizer import ChunkSummarizer
 
 class IngestionPipeline:
     """
-    Orchestrates the document ingestion process, including parsing, interpretation,
-    idempotency checks, and managing a staging area.
+    Orchestrates the document ingestion process, including parsing, idempotency checks,
+    and managing a staging area. Block embeddings are computed by the LanceDB table's own
+    embedding model when the journal commits a batch, not during ingestion.
     """
-    def __init__(self, ingestion_queue_path: str, processed_files_log: str, staging_area_path: str):
+    def __init__(
+        self,
+        ingestion_queue_path: str,
+        processed_files_log: str,
+        staging_area_path: str,
+        commit_batch_size: int = settings.INGESTION_COMMIT_BATCH_SIZE,
+        journal_path: Optional[str] = None,
+        dead_letter_queue_path: str = settings.DEAD_LETTER_QUEUE_PATH,
+        chunk_summarizer: Optional[ChunkSummarizer] = None,
+        knowledge_base_path: str = settings.KNOWLEDGE_BASE_PATH,
+        graph_path: str = settings.KNOWLEDGE_GRAPH_PATH,
+    ):
         print("IngestionPipeline: __init__ called.")
         self.ingestion_queue_path = ingestion_queue_path
         self.processed_files_log = processed_files_log
         self.staging_area_path = staging_area_path
-        self.document_interpreter = DocumentInterpreter()
-        self.lancedb_pipeline = LanceDBIngestionPipeline() # Initialize LanceDBIngestionPipeline
-        self.graph_store = GraphStore() # Initialize GraphStore
+        self.stage_timer = StageTimer() # Per-stage latencies, reported by the ingestion benchmark
+        self.lancedb_pipeline = LanceDBIngestionPipeline(
+            db_path=knowledge_base_path,
+            table_name=settings.LANCE_TABLE_NAME
+        ) # Initialize LanceDBIngestionPipeline
+        # In "reference" content mode the graph resolves block texts from LanceDB
+        self.graph_store = GraphStore(graph_path, content_resolver=self.lancedb_pipeline.get_texts_by_chunk_ids)
         self.knowledge_graph_update_agent = KnowledgeGraphUpdateAgent(graph_store=self.graph_store) # Initialize KnowledgeGraphUpdateAgent
+        # Vector store, graph store and processed log are written together through the journal
+        self.journal = IngestionJournal(
+            journal_path=journal_path or default_journal_path(processed_files_log),
+            processed_files_log=processed_files_log,
+            graph_store=self.graph_store,
+            vector_store=self.lancedb_pipeline,
+            batch_size=commit_batch_size,
+            stage_timer=self.stage_timer,
+        )
+        # Documents that keep failing are parked here instead of being re-parsed on every run
+        self.dead_letter_queue = DeadLetterQueue(
+            dead_letter_queue_path,
+            base_delay_seconds=settings.DEAD_LETTER_BASE_DELAY_SECONDS,
+            max_delay_seconds=settings.DEAD_LETTER_MAX_DELAY_SECONDS,
+        )
+        # Optional ingest stage that precomputes chunk summaries for summarized retrieval
+        self.chunk_summarizer = chunk_summarizer
+        try:
+            recovered = self.journal.replay()
+        except Exception as e:
+            # Batches that fail are quarantined by the journal; this only guards an unreadable journal
+            print(f"IngestionPipeline: Could not replay the ingestion journal {self.journal.journal_path}: {type(e).__name__}: {e}")
+            recovered = 0
+        if recovered:
+            print(f"IngestionPipeline: Recovered {recovered} documents from an interrupted commit.")
 
     def _calculate_document_hash(self, file_path: str) -> str:
         """Calculates the SHA256 hash of a file's content, ensuring consistent encoding."""
@@ -38,7 +82,10 @@ class IngestionPipeline:
         """
         Checks if a document with the given hash has already been processed.
         This is a simplified check; a real system might use a database.
+        Documents buffered in the journal but not yet committed count as processed.
         """
+        if self.journal.is_staged(document_hash):
+            return True
         if not os.path.exists(self.processed_files_log):
             return False
         with open(self.processed_files_log, 'r') as f:
@@ -49,16 +96,30 @@ class IngestionPipeline:
 
     def _mark_document_as_processed(self, document_hash: str, file_path: str):
         """Records the hash and path of a processed document."""
-        with open(file_path, 'a') as f:
+        with open(self.processed_files_log, 'a') as f:
             f.write(f"{document_hash},{file_path}\n")
 
-    def ingest_document(self, file_path: str, document_type: DocumentType) -> Optional[ParsedDocument]:
+    def ingest_document(self, file_path: str, document_type: DocumentType, defer_commit: bool = False, document_hash: Optional[str] = None) -> Optional[ParsedDocument]:
         """
         Ingests a single document, processes it, and returns a ParsedDocument.
         Returns None if the document has already been processed.
+
+        With `defer_commit`, the document is buffered in the ingestion journal and
+        committed with the rest of its batch; otherwise it is committed immediately.
+        A precomputed `document_hash` can be passed to avoid hashing the file twice.
+        """
+        batch = self.ingest_document_batch(file_path, document_type, defer_commit, document_hash)
+        return batch.to_parsed_document() if batch is not None else None
+
+    def ingest_document_batch(self, file_path: str, document_type: DocumentType, defer_commit: bool = False, document_hash: Optional[str] = None) -> Optional[DocumentBatch]:
+        """
+        Same as `ingest_document`, but returns the columnar DocumentBatch that flows
+        through the parser and writers instead of a ParsedDocument view.
         """
         print(f"Attempting to ingest: {file_path}")
-        document_hash = self._calculate_document_hash(file_path)
+        if document_hash is None:
+            with self.stage_timer.stage("hash"):
+                document_hash = self._calculate_document_hash(file_path)
 
         if self._is_document_processed(document_hash):
             print(f"Document {file_path} (hash: {document_hash}) already processed. Skipping.")
@@ -69,37 +130,74 @@ class IngestionPipeline:
 
         # Parse the document
         if document_type == DocumentType.TECHNICAL_REPORT or document_type == DocumentType.PHILOSOPHY_GUIDELINE:
-            parsed_document = parse_html_document(file_path, document_type, source_content)
+            with self.stage_timer.stage("parse"):
+                parsed_batch = parse_html_to_batch(file_path, document_type, source_content)
         else:
             raise ValueError(f"Unsupported document type: {document_type}")
 
-        # Interpret the document
-        interpreted_document = self.document_interpreter.interpret_document(parsed_document)
-
-        # Add to graph store
-        self.graph_store.add_document_to_graph(interpreted_document)
-
-        # Ingest into LanceDB
-        self.lancedb_pipeline.ingest_documents([{"text": block.content, "vector": block.embedding, "metadata": block.metadata} for block in interpreted_document.content_blocks if block.embedding is not None])
-
-        # Mark as processed
-        self._mark_document_as_processed(document_hash, file_path)
+        # Stage for the graph store, LanceDB and the processed log; the journal
+        # writes all three in bulk once the batch is full.
+        self.journal.stage(parsed_batch, document_hash, file_path)
+        if not defer_commit:
+            self.journal.flush()
 
         # Move to staging area (simplified: in a real system, this would involve writing to a DB)
         # For now, we'll just print a message.
         print(f"Document {file_path} successfully ingested and moved to staging area.")
 
-        return interpreted_document
+        return parsed_batch
+
+    def _record_failure(self, file_path: str, document_hash: Optional[str], error: Exception):
+        """Moves a document to the dead-letter queue and files an error report for it."""
+        filename = os.path.basename(file_path)
+        entry = self.dead_letter_queue.record_failure(
+            os.path.abspath(file_path), document_hash, fingerprint_exception(error), f"{type(error).__name__}: {error}"
+        )
+        print(f"{filename} moved to the dead-letter queue (attempt {entry.attempts}).")
+
+        # Locate the failing line in this module; snippets are cached per location
+        code_context = extract_code_context(error, os.path.abspath(__file__))
+        code_context["agent_name"] = "IngestionAgent"
+
+        error_report_path = generate_error_report(
+            summary=f"Ingestion pipeline failed for {filename} due to {type(error).__name__}",
+            error=error,
+            code_context=code_context,
+            reproduction_steps={
+                "command": f"python {os.path.join(os.getcwd(), 'meta_context_studio/scripts/run_ingestion.py')}",
+                "input_file": os.path.abspath(file_path),
+                "intended_vs_actual": f"The ingestion pipeline was intended to process {filename} but encountered an error."
+            },
+            key_dependencies=[
+                "haystack-ai", "lancedb", "pyarrow", "sentence-transformers",
+                "markdown-it-py", "beautifulsoup4", "lxml", "fastapi",
+                "uvicorn", "langchain", "pydantic", "rdflib"
+            ]
+        )
+        print(f"Error processing {filename}. A detailed report has been generated at: {error_report_path}")
+
+    def _record_commit_failure(self, error: JournalCommitError, processed_documents: List[DocumentBatch]):
+        """
+        Dead-letters every document of a batch whose commit failed and leaves them out of
+        the graph update. The journal has aborted the batch, so the documents are only
+        retried through the dead-letter queue.
+        """
+        failed_ids = {entry.document.document_id for entry in error.entries}
+        processed_documents[:] = [batch for batch in processed_documents if batch.document_id not in failed_ids]
+        for entry in error.entries:
+            self._record_failure(entry.file_path, entry.document_hash, error.cause)
 
     def run_ingestion_pipeline(self, file_paths: List[str]) -> List[ParsedDocument]:
         """
         Runs the ingestion pipeline, processing the provided file paths.
-        Returns a list of ParsedDocument objects with embeddings.
+        Returns a list of ParsedDocument objects.
         """
         print("IngestionPipeline: run_ingestion_pipeline called.")
         print(f"Starting ingestion pipeline for {len(file_paths)} files.")
         
-        processed_documents: List[ParsedDocument] = [] # List to collect ParsedDocuments for graph update and LanceDB
+        processed_documents: List[DocumentBatch] = [] # Columnar documents collected for the graph update
+        # Documents buffered in the journal: they count as ingested only once their batch commits
+        awaiting_commit: List[str] = []
 
         for file_path in file_paths:
             if os.path.isfile(file_path):
@@ -110,54 +208,55 @@ class IngestionPipeline:
                 else:
                     doc_type = DocumentType.TECHNICAL_REPORT
 
+                document_path = os.path.abspath(file_path)
+                document_hash = None
                 try:
-                    interpreted_document = self.ingest_document(file_path, doc_type)
-                    if interpreted_document:
-                        processed_documents.append(interpreted_document) # For graph update and LanceDB
+                    with self.stage_timer.stage("hash"):
+                        document_hash = self._calculate_document_hash(file_path)
+                    if self.dead_letter_queue.is_quarantined(document_path, document_hash):
+                        print(f"Skipping {filename}: it is in the dead-letter queue until its next retry.")
+                        continue
 
+                    parsed_batch = self.ingest_document_batch(file_path, doc_type, defer_commit=True, document_hash=document_hash)
+                    if parsed_batch is None:
+                        # Already committed by an earlier run
+                        self.dead_letter_queue.record_success(document_path)
+                        continue
+                    processed_documents.append(parsed_batch) # For graph update and LanceDB
+                    awaiting_commit.append(document_path)
+
+                except JournalCommitError as e:
+                    # Staging this document filled the batch and the commit failed: the failure
+                    # belongs to every document of that batch, not to this one alone.
+                    self._record_commit_failure(e, processed_documents)
+                    awaiting_commit = []
+                    continue
                 except Exception as e:
-                    # Get code context for error reporting
-                    exc_type, exc_obj, exc_tb = sys.exc_info()
-                    # Get the filename where the exception occurred
-                    frame = exc_tb.tb_frame
-                    while frame.f_code.co_filename != os.path.abspath(__file__):
-                        frame = frame.f_back
-                        if frame is None: # Should not happen if error is within this file
-                            break
-                    
-                    if frame: # Ensure frame is not None
-                        lineno = frame.f_lineno
-                        lines, start_lineno = inspect.getsourcelines(frame.f_code)
-                        snippet = "".join(lines[max(0, lineno - start_lineno - 3):lineno - start_lineno + 2])
-                        function_name = frame.f_code.co_name
-                    else:
-                        lineno = "N/A"
-                        snippet = "N/A"
-                        function_name = "N/A"
-
-                    error_report_path = generate_error_report(
-                        summary=f"Ingestion pipeline failed for {filename} due to {type(e).__name__}",
-                        error=e,
-                        code_context={
-                            "file": os.path.abspath(__file__),
-                            "function": function_name,
-                            "snippet": snippet,
-                            "agent_name": "IngestionAgent"
-                        },
-                        reproduction_steps={
-                            "command": f"python {os.path.join(os.getcwd(), 'meta_context_studio/scripts/run_ingestion.py')}",
-                            "input_file": os.path.abspath(file_path),
-                            "intended_vs_actual": f"The ingestion pipeline was intended to process {filename} but encountered an error."
-                        },
-                        key_dependencies=[
-                            "haystack-ai", "lancedb", "pyarrow", "sentence-transformers",
-                            "markdown-it-py", "beautifulsoup4", "lxml", "fastapi",
-                            "uvicorn", "langchain", "pydantic", "rdflib"
-                        ]
-                    )
-                    print(f"Error processing {filename}. A detailed report has been generated at: {error_report_path}")
-        
+                    self._record_failure(file_path, document_hash, e)
+                    continue
+
+                if self.journal.pending_count() == 0:
+                    # The batch was flushed and committed
+                    for committed_path in awaiting_commit:
+                        self.dead_letter_queue.record_success(committed_path)
+                    awaiting_commit = []
+
+        # Commit whatever is left in the last, partially filled batch
+        try:
+            self.journal.flush()
+            for committed_path in awaiting_commit:
+                self.dead_letter_queue.record_success(committed_path)
+        except JournalCommitError as e:
+            self._record_commit_failure(e, processed_documents)
+
+        # Reports are aggregated and written in the background; make sure they are on disk
+        flush_error_reports()
+
         # After processing all documents, validate and merge them into the knowledge graph
         self.knowledge_graph_update_agent.validate_and_merge(processed_documents)
+        if self.chunk_summarizer is not None:
+            with self.stage_timer.stage("summarize"):
+                self.chunk_summarizer.summarize_pending(self.lancedb_pipeline)
         print("Ingestion pipeline finished.")
-        return processed_documents # Return processed documents for further use (e.g., Haystack pipeline)
+        # Return ParsedDocument views for further use (e.g., Haystack pipeline)
+        return [batch.to_parsed_document() for batch in processed_documents]
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import rdflib
+from rdflib import BNode, Dataset, Graph, Literal, URIRef
+
+from meta_context_studio.src.knowledge_base.rdf_utils import graph_identifier
+
+# Bumped whenever the layout of the compiled files changes.
+COMPILED_FORMAT_VERSION = 2
+# Quad ids are decoded into terms this many rows at a time.
+DECODE_SLICE_ROWS = 65536
+
+Quad = Tuple[Any, Any, Any, Optional[Any]]
+
+
+def compiled_paths(source: str) -> Tuple[str, str]:
+    """The term table and the quad id array stored next to `source`."""
+    return f"{source}.compiled.json", f"{source}.compiled.npy"
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_key(source: str) -> List[Any]:
+    return [COMPILED_FORMAT_VERSION, rdflib.__version__, file_digest(source)]
+
+
+def _encode_term(term) -> List[Optional[str]]:
+    if isinstance(term, Literal):
+        return ["l", str(term), str(term.datatype) if term.datatype else None, term.language]
+    if isinstance(term, BNode):
+        return ["b", str(term)]
+    return ["u", str(term)]
+
+
+def _decode_term(encoded: List[Optional[str]]):
+    kind = encoded[0]
+    if kind == "l":
+        _, lexical, datatype, language = encoded
+        return Literal(lexical, lang=language, datatype=URIRef(datatype) if datatype else None)
+    if kind == "b":
+        return BNode(encoded[1])
+    return URIRef(encoded[1])
+
+
+def save_compiled(source: str, quads: Iterable[Quad], namespaces: Iterable[Tuple[str, URIRef]]):
+    """
+    Writes the compiled form of `source`: a JSON table of its distinct terms and an
+    int32 array of (s, p, o, graph) term ids, with -1 for the default graph. The term
+    table is plain data, so loading a cache file cannot execute code.
+
+    The array is written first and the term table, which carries the cache key, last, so
+    an interrupted write leaves no valid-looking cache behind.
+    """
+    terms: List[Any] = []
+    term_ids = {}
+
+    def term_id(term) -> int:
+        if term is None:
+            return -1
+        i = term_ids.get(term)
+        if i is None:
+            i = term_ids[term] = len(terms)
+            terms.append(term)
+        return i
+
+    rows = [(term_id(s), term_id(p), term_id(o), term_id(graph_identifier(g))) for s, p, o, g in quads]
+    ids = np.array(rows, dtype=np.int32).reshape(-1, 4)
+    table_path, ids_path = compiled_paths(source)
+    with open(f"{ids_path}.tmp", "wb") as f:
+        np.save(f, ids)
+    os.replace(f"{ids_path}.tmp", ids_path)
+    table = {
+        "key": _cache_key(source),
+        "rows": len(ids),
+        "namespaces": [[prefix, str(namespace)] for prefix, namespace in namespaces],
+        "terms": [_encode_term(term) for term in terms],
+    }
+    with open(f"{table_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(table, f)
+    os.replace(f"{table_path}.tmp", table_path)
+
+
+def _decode_quads(terms: List[Any], ids: np.ndarray) -> Iterator[Quad]:
+    for start in range(0, len(ids), DECODE_SLICE_ROWS):
+        for s, p, o, g in ids[start:start + DECODE_SLICE_ROWS].tolist():
+            yield terms[s], terms[p], terms[o], terms[g]
+
+
+def load_compiled(source: str) -> Optional[Tuple[Iterator[Quad], List[Tuple[str, URIRef]]]]:
+    """
+    Returns the quads and namespaces of `source` from its compiled form, or None when
+    there is none or it was built from other file contents or another rdflib version.
+
+    The term table is read up front; the quad id array is memory-mapped and decoded in
+    slices of DECODE_SLICE_ROWS as the returned iterator is consumed, so the quads are
+    never all held in memory. Loading still touches every quad, it just skips parsing.
+    """
+    table_path, ids_path = compiled_paths(source)
+    if not (os.path.exists(source) and os.path.exists(table_path) and os.path.exists(ids_path)):
+        return None
+    try:
+        with open(table_path, encoding="utf-8") as f:
+            table = json.load(f)
+        if table.get("key") != _cache_key(source):
+            return None
+        ids = np.load(ids_path, mmap_mode="r")
+        if ids.shape != (table["rows"], 4):
+            return None
+        terms = [_decode_term(encoded) for encoded in table["terms"]]
+    except Exception as e:
+        print(f"Ignoring unreadable compiled graph for {source}: {e}")
+        return None
+    terms.append(None)  # id -1 is the default graph
+    namespaces = [(prefix, URIRef(namespace)) for prefix, namespace in table["namespaces"]]
+    return _decode_quads(terms, ids), namespaces
+
+
+def parse_cached(source: str, format: str = "turtle") -> Tuple[Iterable[Quad], List[Tuple[str, URIRef]]]:
+    """
+    Returns the quads and namespaces of an RDF file, from the compiled cache when it is
+    valid and otherwise by parsing the file and writing the cache for the next start.
+    Quads from the cache are decoded lazily and can be iterated once.
+    """
+    compiled = load_compiled(source)
+    if compiled is not None:
+        return compiled
+    parsed = Dataset()
+    parsed.parse(source, format=format)
+    quads = list(parsed.quads((None, None, None, None)))
+    namespaces = list(parsed.namespaces())
+    try:
+        save_compiled(source, quads, namespaces)
+    except OSError as e:
+        print(f"Could not write compiled graph for {source}: {e}")
+    return [(s, p, o, graph_identifier(g)) for s, p, o, g in quads], namespaces
+
+
+def load_graph_cached(graph: Graph, source: str, format: str = "turtle") -> int:
+    """
+    Adds the contents of an RDF file to `graph` through the compiled cache, like
+    `graph.parse(source, format=format)`. Returns the number of statements added.
+    """
+    quads, namespaces = parse_cached(source, format)
+    for prefix, namespace in namespaces:
+        graph.bind(prefix, namespace, override=False)
+    contexts = {None: graph.default_graph} if isinstance(graph, Dataset) else None
+    added = 0
+
+    def statements():
+        nonlocal added
+        for s, p, o, g in quads:
+            added += 1
+            if contexts is None:
+                yield s, p, o, graph
+                continue
+            context = contexts.get(g)
+            if context is None:
+                context = contexts[g] = graph.get_context(g)
+            yield s, p, o, context
+
+    graph.addN(statements())
+    return added
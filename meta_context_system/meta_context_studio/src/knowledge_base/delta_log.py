@@ -0,0 +1,112 @@
+import os
+from itertools import groupby
+from typing import Any, List, Optional, Tuple
+
+from rdflib import Dataset
+from rdflib.plugins.serializers.nquads import _nq_row
+from rdflib.plugins.serializers.nt import _nt_row
+from rdflib.plugins.stores.memory import Memory
+
+from meta_context_studio.src.knowledge_base.rdf_utils import graph_identifier
+
+# A change is ("+" | "-", (subject, predicate, object), graph identifier). The graph is None
+# for the default graph when adding, and for "every graph" when removing.
+Change = Tuple[str, tuple, Optional[Any]]
+
+
+class TrackedMemory(Memory):
+    """
+    In-memory rdflib store that records every added and removed quad, so that a save
+    only has to persist what changed since the previous one. `version` is bumped on
+    every mutation.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._changes: List[Change] = []
+        self.version = 0
+
+    def add(self, triple, context, quoted: bool = False):
+        super().add(triple, context, quoted=quoted)
+        self.version += 1
+        if not quoted:
+            self._changes.append(("+", triple, graph_identifier(context)))
+
+    def remove(self, triple_pattern, context=None):
+        removed = [triple for triple, _ in self.triples(triple_pattern, context=context)]
+        super().remove(triple_pattern, context=context)
+        self.version += 1
+        graph = graph_identifier(context)
+        self._changes.extend(("-", triple, graph) for triple in removed)
+
+    def drain_changes(self) -> List[Change]:
+        """Returns the changes recorded since the last call and forgets them."""
+        changes, self._changes = self._changes, []
+        return changes
+
+    def restore_changes(self, changes: List[Change]):
+        """Puts drained changes that could not be persisted back in front of newer ones."""
+        self._changes[:0] = changes
+
+
+class DeltaLog:
+    """
+    Append-only N-Quads log of graph changes. Each line is a `+` or `-` followed by one
+    N-Quads statement, e.g. `+ <http://a> <http://b> "c" <http://graph> .` A statement
+    without a graph adds to the default graph, or removes the triple from every graph.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def append(self, changes: List[Change], path: Optional[str] = None):
+        """Appends the changes and fsyncs the log."""
+        if not changes:
+            return
+        path = path or self.path
+        lines = [
+            f"{sign} {_nq_row(triple, graph) if graph is not None else _nt_row(triple)}"
+            for sign, triple, graph in changes
+        ]
+        if not self._ends_with_newline(path):
+            # Start on a fresh line after a record that was cut off by a crash.
+            lines.insert(0, "\n")
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _ends_with_newline(path: str) -> bool:
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return True
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def size(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    @staticmethod
+    def replay(path: str, dataset: Dataset) -> int:
+        """
+        Applies the changes recorded at `path` to the dataset in order and returns how many
+        were applied. Consecutive lines with the same sign are parsed as one N-Quads chunk,
+        so blank node labels are only stable within a chunk; the knowledge graph uses none.
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            # A line without its terminating " ." was cut off by a crash mid-append.
+            lines = [line for line in f if line[:2] in ("+ ", "- ") and line.endswith(" .\n")]
+        for sign, run in groupby(lines, key=lambda line: line[0]):
+            chunk = Dataset()
+            chunk.parse(data="".join(line[2:] for line in run), format="nquads")
+            for s, p, o, graph in chunk.quads((None, None, None, None)):
+                graph = graph_identifier(graph)
+                quad = (s, p, o) if graph is None else (s, p, o, graph)
+                if sign == "+":
+                    dataset.add(quad)
+                else:
+                    dataset.remove(quad)
+        return len(lines)
@@ -0,0 +1,200 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+from rdflib import BNode, Literal, URIRef
+from rdflib.namespace import RDF
+from scipy import sparse
+
+from meta_context_studio.src.knowledge_base.graph_store import GENESIS, GraphStore
+
+# Edge weights by predicate. Predicates not listed use DEFAULT_EDGE_WEIGHT; a weight of 0
+# drops the edge (rdf:type would otherwise link every block through its class node).
+EDGE_WEIGHTS: Dict[URIRef, float] = {
+    GENESIS.partOf: 1.0,
+    RDF.type: 0.0,
+}
+DEFAULT_EDGE_WEIGHT = 0.5
+
+
+class GraphAdjacency:
+    """
+    Weighted, undirected CSR adjacency matrix over the resource nodes of a GraphStore.
+
+    Edges are kept per named graph, so `refresh()` only re-reads the documents whose
+    content hash changed since the last build (plus graphs without a hash, such as the
+    default graph, when their size changed) and then reassembles the CSR matrix from
+    numpy arrays. Refreshing is skipped entirely while the store's version is unchanged.
+    When documents were replaced or removed, node ids are compacted so that the nodes of
+    old document versions do not accumulate in the matrix.
+    """
+
+    def __init__(
+        self,
+        graph_store: GraphStore,
+        edge_weights: Optional[Mapping[URIRef, float]] = None,
+        default_weight: float = DEFAULT_EDGE_WEIGHT,
+    ):
+        self.graph_store = graph_store
+        self.edge_weights = dict(EDGE_WEIGHTS if edge_weights is None else edge_weights)
+        self.default_weight = default_weight
+        self.nodes: List[URIRef] = []
+        self.node_ids: Dict[URIRef, int] = {}
+        self.matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._propagation: Optional[sparse.csr_matrix] = None
+        # graph identifier -> (signature, (rows, cols, weights))
+        self._edges: Dict[URIRef, Tuple[object, Tuple[np.ndarray, np.ndarray, np.ndarray]]] = {}
+        self._version = None
+
+    def _node_id(self, node: URIRef) -> int:
+        node_id = self.node_ids.get(node)
+        if node_id is None:
+            node_id = self.node_ids[node] = len(self.nodes)
+            self.nodes.append(node)
+        return node_id
+
+    def _signature(self, graph) -> object:
+        content_hash = graph.value(graph.identifier, GENESIS.hasContentHash)
+        return content_hash if content_hash is not None else len(graph)
+
+    def _read_edges(self, graph) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rows, cols, weights = [], [], []
+        for s, p, o in graph.triples((None, None, None)):
+            if isinstance(o, Literal) or not isinstance(o, (URIRef, BNode)):
+                continue
+            weight = self.edge_weights.get(p, self.default_weight)
+            if weight <= 0 or s == o:
+                continue
+            rows.append(self._node_id(s))
+            cols.append(self._node_id(o))
+            weights.append(weight)
+        return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(weights, dtype=np.float32)
+
+    def refresh(self) -> bool:
+        """Brings the matrix up to date with the graph. Returns False if nothing had changed."""
+        version = self.graph_store.version
+        if version == self._version:
+            return False
+        seen = set()
+        dropped_edges = False
+        for graph in self.graph_store.graph.graphs():
+            identifier = graph.identifier
+            seen.add(identifier)
+            signature = self._signature(graph)
+            cached = self._edges.get(identifier)
+            if cached is None or cached[0] != signature:
+                dropped_edges = dropped_edges or cached is not None
+                self._edges[identifier] = (signature, self._read_edges(graph))
+        for identifier in set(self._edges) - seen:
+            del self._edges[identifier]
+            dropped_edges = True
+        if dropped_edges:
+            self._compact_nodes()
+        self._build_matrix()
+        self._version = version
+        return True
+
+    def _compact_nodes(self):
+        """Drops the nodes that no edge refers to any more and renumbers the rest."""
+        parts = [edges for _, edges in self._edges.values()]
+        used = np.unique(np.concatenate([np.zeros(0, dtype=np.int64)] + [a for rows, cols, _ in parts for a in (rows, cols)]))
+        if len(used) == len(self.nodes):
+            return
+        remap = np.full(len(self.nodes), -1, dtype=np.int64)
+        remap[used] = np.arange(len(used))
+        self.nodes = [self.nodes[i] for i in used]
+        self.node_ids = {node: i for i, node in enumerate(self.nodes)}
+        self._edges = {
+            identifier: (signature, (remap[rows], remap[cols], weights))
+            for identifier, (signature, (rows, cols, weights)) in self._edges.items()
+        }
+
+    def _build_matrix(self):
+        n = len(self.nodes)
+        parts = [edges for _, edges in self._edges.values()]
+        if parts:
+            rows = np.concatenate([p[0] for p in parts])
+            cols = np.concatenate([p[1] for p in parts])
+            weights = np.concatenate([p[2] for p in parts])
+        else:
+            rows = cols = np.zeros(0, dtype=np.int64)
+            weights = np.zeros(0, dtype=np.float32)
+        # Undirected: an edge can be followed from either end. Parallel edges are summed.
+        directed = sparse.coo_matrix(
+            (np.concatenate([weights, weights]), (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+            shape=(n, n),
+        )
+        self.matrix = directed.tocsr()
+        self.matrix.sum_duplicates()
+        self._propagation = None
+
+    @property
+    def propagation(self) -> sparse.csr_matrix:
+        """
+        Transposed row-normalized adjacency: `propagation @ scores` moves each node's score
+        to its neighbours, split by edge weight so hubs do not dominate.
+        """
+        if self._propagation is None:
+            out_weight = np.asarray(self.matrix.sum(axis=1)).ravel()
+            inverse = np.divide(1.0, out_weight, out=np.zeros_like(out_weight), where=out_weight > 0)
+            self._propagation = (sparse.diags(inverse.astype(np.float32)) @ self.matrix).T.tocsr()
+        return self._propagation
+
+    def expand(
+        self,
+        seeds: Mapping[URIRef, float],
+        max_hops: int = 2,
+        max_nodes: int = 50,
+        decay: float = 0.5,
+        frontier_size: int = 200,
+    ) -> List[Tuple[URIRef, float]]:
+        """
+        Bounded, weighted breadth-first expansion from scored seed nodes.
+
+        Each hop propagates the current frontier's scores one step through the normalized
+        adjacency with a single sparse mat-vec, damped by `decay`. Only the `frontier_size`
+        best newly reached nodes continue to the next hop. Returns up to `max_nodes`
+        (node, score) pairs, best first, excluding the seeds themselves.
+
+        Args:
+            seeds: Graph nodes with their retrieval scores; unknown nodes are ignored.
+            max_hops: Maximum path length from a seed.
+            max_nodes: Maximum number of nodes returned.
+            decay: Score multiplier applied per hop.
+            frontier_size: Maximum number of nodes expanded per hop.
+        """
+        self.refresh()
+        n = len(self.nodes)
+        frontier = np.zeros(n, dtype=np.float32)
+        for node, score in seeds.items():
+            node_id = self.node_ids.get(node)
+            if node_id is not None:
+                frontier[node_id] = max(frontier[node_id], score)
+        visited = frontier > 0
+        scores = np.zeros(n, dtype=np.float32)
+        propagation = self.propagation
+        for _ in range(max_hops):
+            if not frontier.any():
+                break
+            reached = decay * (propagation @ frontier)
+            reached[visited] = 0
+            new_nodes = np.flatnonzero(reached)
+            if len(new_nodes) > frontier_size:
+                new_nodes = new_nodes[np.argpartition(reached[new_nodes], -frontier_size)[-frontier_size:]]
+            frontier = np.zeros(n, dtype=np.float32)
+            frontier[new_nodes] = reached[new_nodes]
+            scores[new_nodes] = reached[new_nodes]
+            visited[new_nodes] = True
+        found = np.flatnonzero(scores)
+        if len(found) > max_nodes:
+            found = found[np.argpartition(scores[found], -max_nodes)[-max_nodes:]]
+        found = found[np.argsort(-scores[found], kind="stable")]
+        return [(self.nodes[i], float(scores[i])) for i in found]
+
+    def neighbors(self, node: URIRef) -> Iterable[Tuple[URIRef, float]]:
+        """Direct neighbours of a node with their edge weights."""
+        self.refresh()
+        node_id = self.node_ids.get(node)
+        if node_id is None:
+            return []
+        start, end = self.matrix.indptr[node_id], self.matrix.indptr[node_id + 1]
+        return [(self.nodes[j], float(w)) for j, w in zip(self.matrix.indices[start:end], self.matrix.data[start:end])]
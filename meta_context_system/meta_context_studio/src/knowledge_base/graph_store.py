@@ -1,23 +1,131 @@
-from rdflib import Graph, Literal, URIRef, Namespace
+from rdflib import Dataset, Graph, Literal, URIRef, Namespace
 from rdflib.namespace import RDF, RDFS
 from meta_context_studio.src.ingestion.data_models import DocumentType
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Hashable, Iterable, Iterator, Optional, Tuple, Union
+import hashlib
 import os
+import threading
+from collections import defaultdict
 
-from meta_context_studio.src.ingestion.data_models import ParsedDocument, ContentBlock
+from meta_context_studio.config import settings
+from meta_context_studio.src.ingestion.data_models import ParsedDocument, ContentBlock, ContentBlockType
+from meta_context_studio.src.ingestion.document_batch import DocumentBatch, make_chunk_id
+from meta_context_studio.src.knowledge_base.compiled_graph import load_graph_cached, save_compiled
+from meta_context_studio.src.knowledge_base.delta_log import DeltaLog, TrackedMemory
+from meta_context_studio.src.knowledge_base.query_cache import SPARQLQueryCache
+from meta_context_studio.src.knowledge_base.query_cursor import QueryCursor
+from meta_context_studio.src.knowledge_base.sqlite_triple_store import SQLiteTripleStore
 
 # Define Namespaces for our ontology (simplified for now)
 GENESIS = Namespace("http://genesis.engine.org/ontology/")
 
+GRAPH_STORE_BACKENDS = ("memory", "sqlite", "oxigraph")
+
+# "inline" stores block text under genesis:hasContent; "reference" stores only the block's
+# chunk id under genesis:hasContentRef and resolves the text from the vector store on demand.
+CONTENT_MODES = ("inline", "reference")
+
+# Block predicates that are not copied into ContentBlock.metadata.
+_STRUCTURAL_BLOCK_PREDICATES = frozenset({
+    RDF.type, GENESIS.partOf, GENESIS.hasContent, GENESIS.hasContentRef, GENESIS.hasBlockType, GENESIS.hasBlockIndex,
+})
+
+# Maps chunk ids to block texts, e.g. LanceDBIngestionPipeline.get_texts_by_chunk_ids.
+ContentResolver = Callable[[List[str]], Dict[str, str]]
+
+
+def default_store_path(graph_path: str, backend: str) -> str:
+    """Location of a persistent store next to the Turtle file, e.g. knowledge_graph.sqlite."""
+    return f"{os.path.splitext(graph_path)[0]}.{backend}"
+
+
 class GraphStore:
     """
     Handles interactions with the RDF graph for storing and querying structured knowledge.
+
+    The graph is a Dataset in which every document lives in its own named graph, keyed by
+    its source path and tagged with the document's content hash (its document_id). Adding
+    an unchanged document is a no-op; adding a changed one replaces only its named graph.
+    Queries see the union of all named graphs.
+
+    The Dataset lives in one of GRAPH_STORE_BACKENDS. With a persistent backend the store is
+    opened in place and `save_graph()` commits the pending changes; the Turtle file at
+    `graph_path` is imported once into an empty store and can be written with `export_turtle()`.
+
+    The memory backend keeps a TriG snapshot next to the Turtle file: `save_graph()` appends
+    the quads added and removed since the last save to a delta log, and once the log grows
+    past `compaction_threshold_bytes` a new snapshot is written in the background.
+
+    In "reference" content mode block texts are not copied into the graph; they are looked
+    up through `content_resolver` when a document is materialized, which raises if no
+    resolver was given.
+
+    `query_graph()` reuses prepared queries and caches results per graph `version`.
     """
-    def __init__(self, graph_path: str = "meta_context_studio/knowledge_base/ontologies/knowledge_graph.ttl"):
-        self.graph = Graph()
+    def __init__(
+        self,
+        graph_path: str = settings.KNOWLEDGE_GRAPH_PATH,
+        backend: str = settings.GRAPH_STORE_BACKEND,
+        store_path: Optional[str] = None,
+        compaction_threshold_bytes: int = settings.GRAPH_DELTA_LOG_COMPACTION_BYTES,
+        content_mode: str = settings.GRAPH_CONTENT_MODE,
+        content_resolver: Optional[ContentResolver] = None,
+    ):
+        if backend not in GRAPH_STORE_BACKENDS:
+            raise ValueError(f"Unknown graph store backend '{backend}'. Expected one of {GRAPH_STORE_BACKENDS}.")
+        if content_mode not in CONTENT_MODES:
+            raise ValueError(f"Unknown content mode '{content_mode}'. Expected one of {CONTENT_MODES}.")
+        self.content_mode = content_mode
+        self.content_resolver = content_resolver
         self.graph_path = graph_path
+        self.backend = backend
+        self.store_path = store_path or default_store_path(graph_path, backend)
+        self.snapshot_path = f"{os.path.splitext(graph_path)[0]}.trig"
+        self.delta_log = DeltaLog(f"{graph_path}.delta.nq")
+        self.compaction_threshold_bytes = compaction_threshold_bytes
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._version = 0
+        self.query_cache = SPARQLQueryCache(
+            max_prepared=settings.SPARQL_PREPARED_QUERY_CACHE_SIZE,
+            max_results=settings.SPARQL_RESULT_CACHE_SIZE,
+        )
+        self.graph = self._open_graph()
         self._bind_namespaces()
         self.load_graph()
+        if isinstance(self.graph.store, SQLiteTripleStore):
+            # Binding namespaces opens a write transaction; left open, it would lock every
+            # other connection to the file out of writing
+            self.graph.store.commit()
+
+    @property
+    def version(self) -> Hashable:
+        """
+        Value that changes whenever the graph is mutated. The SQLite store also sees commits
+        made by other connections to its file (other GraphStores, other processes); the memory
+        store counts every mutation; for other stores only GraphStore's own mutating methods
+        are counted.
+        """
+        return getattr(self.graph.store, "version", self._version)
+
+    @property
+    def is_persistent(self) -> bool:
+        return self.backend != "memory"
+
+    def _open_graph(self) -> Dataset:
+        """Creates the rdflib Dataset on top of the configured store."""
+        if self.backend == "memory":
+            return Dataset(store=TrackedMemory(), default_union=True)
+        if self.backend == "sqlite":
+            graph = Dataset(store=SQLiteTripleStore(), default_union=True)
+        else:
+            try:
+                import oxrdflib  # noqa: F401 - registers the "Oxigraph" rdflib store plugin
+            except ImportError as e:
+                raise ImportError("The 'oxigraph' graph store backend requires the 'oxrdflib' package.") from e
+            graph = Dataset(store="Oxigraph", default_union=True)
+        graph.open(self.store_path, create=True)
+        return graph
 
     def _bind_namespaces(self):
         """Binds common namespaces to the graph."""
@@ -26,89 +134,356 @@ class GraphStore:
         self.graph.bind("rdfs", RDFS)
 
     def load_graph(self):
-        """Loads the RDF graph from a file if it exists."""
-        if os.path.exists(self.graph_path):
+        """
+        Loads the RDF graph from the Turtle file if it exists. A persistent store already
+        holds the graph, so the Turtle file is only imported when the store is still empty.
+        The memory backend loads its TriG snapshot instead, if there is one, and then replays
+        the delta logs written since the snapshot.
+        """
+        if self.is_persistent and not self._store_is_empty():
+            print(f"Opened knowledge graph store at {self.store_path}")
+            return
+        if not self.is_persistent and os.path.exists(self.snapshot_path):
+            try:
+                load_graph_cached(self.graph, self.snapshot_path, format="trig")
+                print(f"Loaded knowledge graph snapshot from {self.snapshot_path}")
+            except Exception as e:
+                print(f"Error loading graph snapshot from {self.snapshot_path}: {e}")
+        elif os.path.exists(self.graph_path):
             try:
-                self.graph.parse(self.graph_path, format="turtle")
+                self.import_turtle(self.graph_path)
                 print(f"Loaded knowledge graph from {self.graph_path}")
             except Exception as e:
                 print(f"Error loading graph from {self.graph_path}: {e}")
         else:
             print(f"No existing knowledge graph found at {self.graph_path}. A new one will be created.")
+        if not self.is_persistent:
+            # A log left by an interrupted compaction is older than the live log.
+            replayed = DeltaLog.replay(self._compacting_log_path, self.graph)
+            replayed += DeltaLog.replay(self.delta_log.path, self.graph)
+            if replayed:
+                print(f"Replayed {replayed} changes from {self.delta_log.path}")
+            self.graph.store.drain_changes()
+
+    @property
+    def _compacting_log_path(self) -> str:
+        return f"{self.delta_log.path}.compacting"
+
+    def _store_is_empty(self) -> bool:
+        if isinstance(self.graph.store, SQLiteTripleStore):
+            return self.graph.store.is_empty()
+        return next(iter(self.graph.triples((None, None, None))), None) is None
 
     def save_graph(self):
-        """Saves the RDF graph to a file."""
+        """
+        Commits pending changes to the persistent store, or appends them to the delta log for
+        the memory backend. Either way the cost is proportional to the changes, not the graph.
+        A failed commit raises, so that callers such as the ingestion journal do not treat
+        the graph as written.
+        """
+        if self.is_persistent:
+            self.graph.commit()
+            print(f"Committed knowledge graph changes to {self.store_path}")
+            return
+        changes = self.graph.store.drain_changes()
         try:
-            self.graph.serialize(destination=self.graph_path, format="turtle")
-            print(f"Saved knowledge graph to {self.graph_path}")
+            with self._compaction_lock:
+                self.delta_log.append(changes)
+        except Exception:
+            # Keep the changes for the next save instead of dropping them
+            self.graph.store.restore_changes(changes)
+            raise
+        print(f"Appended {len(changes)} changes to {self.delta_log.path}")
+        if self.delta_log.size() >= self.compaction_threshold_bytes:
+            self.compact(background=True)
+
+    def compact(self, background: bool = False):
+        """
+        Writes a new TriG snapshot of the memory graph and drops the delta log it covers.
+
+        The live log is renamed before the graph is copied, so saves made while the snapshot
+        is serialized go to a fresh log. Until the snapshot replaces the old one, loading
+        replays the renamed log as well; replaying it again afterwards is harmless because
+        each triple ends in the state of its last recorded change.
+        """
+        if self.is_persistent or (self._compaction_thread and self._compaction_thread.is_alive()):
+            return
+        with self._compaction_lock:
+            if os.path.exists(self.delta_log.path):
+                if os.path.exists(self._compacting_log_path):
+                    # An earlier compaction did not finish; keep its changes in front.
+                    with open(self.delta_log.path, encoding="utf-8") as f:
+                        with open(self._compacting_log_path, "a", encoding="utf-8") as compacting:
+                            compacting.write(f.read())
+                    os.remove(self.delta_log.path)
+                else:
+                    os.replace(self.delta_log.path, self._compacting_log_path)
+            quads = list(self.graph.quads((None, None, None, None)))
+            namespaces = list(self.graph.namespaces())
+        if background:
+            self._compaction_thread = threading.Thread(target=self._write_snapshot, args=(quads, namespaces), daemon=True)
+            self._compaction_thread.start()
+        else:
+            self._write_snapshot(quads, namespaces)
+
+    def _write_snapshot(self, quads: List[Tuple], namespaces: List[Tuple[str, URIRef]]):
+        snapshot = Dataset()
+        for prefix, namespace in namespaces:
+            snapshot.bind(prefix, namespace)
+        for s, p, o, graph in quads:
+            snapshot.add((s, p, o) if graph is None else (s, p, o, graph))
+        temp_path = f"{self.snapshot_path}.tmp"
+        try:
+            snapshot.serialize(destination=temp_path, format="trig")
+            os.replace(temp_path, self.snapshot_path)
+            save_compiled(self.snapshot_path, quads, namespaces)
+            if os.path.exists(self._compacting_log_path):
+                os.remove(self._compacting_log_path)
+            print(f"Compacted knowledge graph snapshot {self.snapshot_path} ({len(quads)} quads)")
         except Exception as e:
-            print(f"Error saving graph to {self.graph_path}: {e}")
+            print(f"Error compacting knowledge graph to {self.snapshot_path}: {e}")
+
+    def wait_for_compaction(self):
+        """Blocks until a running background compaction has finished."""
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+
+    def import_turtle(self, source: str):
+        """
+        Adds the triples of a Turtle file to the graph. Each document and its blocks go to
+        the document's named graph; everything else goes to the default graph.
+        """
+        imported = Graph()
+        load_graph_cached(imported, source, format="turtle")
+        remaining = set(imported)
+        for doc_uri in imported.subjects(RDF.type, GENESIS.Document):
+            graph_id = self.document_graph_id(str(imported.value(doc_uri, GENESIS.hasSourcePath)))
+            subjects = [doc_uri, *imported.subjects(GENESIS.partOf, doc_uri)]
+            triples = [triple for subject in subjects for triple in imported.triples((subject, None, None))]
+            document_id = str(doc_uri)[len(str(GENESIS)):]
+            document_graph = self.graph.get_context(graph_id)
+            self.graph.addN((s, p, o, document_graph) for s, p, o in [*triples, (graph_id, GENESIS.hasContentHash, Literal(document_id))])
+            remaining.difference_update(triples)
+        self.graph.addN((s, p, o, self.graph.default_graph) for s, p, o in remaining)
+        self._version += 1
+        if self.is_persistent:
+            self.graph.commit()
+
+    def export_turtle(self, destination: Optional[str] = None) -> str:
+        """Writes the whole graph as Turtle (to `graph_path` by default) and returns the path."""
+        destination = destination or self.graph_path
+        self.graph.serialize(destination=destination, format="turtle")
+        return destination
+
+    def close(self):
+        """Commits and closes a persistent store, or waits for a running compaction."""
+        if self.is_persistent:
+            self.graph.close(commit_pending_transaction=True)
+        else:
+            self.wait_for_compaction()
+
+    @staticmethod
+    def _iter_blocks(document: Union[ParsedDocument, DocumentBatch]) -> Iterator[Tuple[int, ContentBlockType, str, Dict[str, Any]]]:
+        """Yields (block_index, block_type, content, metadata) for either document representation."""
+        if isinstance(document, DocumentBatch):
+            yield from document.iter_blocks()
+        else:
+            for i, block in enumerate(document.content_blocks):
+                yield i, block.block_type, block.content, block.metadata
+
+    @staticmethod
+    def document_graph_id(source_path: str) -> URIRef:
+        """Identifier of the named graph holding the document read from `source_path`."""
+        return URIRef(GENESIS[f"documentGraph/{hashlib.sha1(source_path.encode('utf-8')).hexdigest()[:16]}"])
 
-    def add_document_to_graph(self, document: ParsedDocument):
+    def add_document_to_graph(self, document: Union[ParsedDocument, DocumentBatch]) -> bool:
         """
-        Adds a ParsedDocument and its extracted entities/relationships to the graph.
+        Adds a ParsedDocument (or its columnar DocumentBatch) and its extracted
+        entities/relationships to the graph.
         This is a simplified example; real entity/relationship extraction would be done
         by the KnowledgeGraphUpdateAgent.
+
+        Returns False if the same version of the document is already in the graph. A different
+        version of the same source replaces the previous one.
         """
+        graph_id = self.document_graph_id(document.source_path)
+        document_graph = self.graph.get_context(graph_id)
+        content_hash = Literal(document.document_id)
+        current_hash = document_graph.value(graph_id, GENESIS.hasContentHash)
+        if current_hash == content_hash:
+            return False
+        if current_hash is not None:
+            self.graph.remove_graph(document_graph)
+        triples = [*self._document_triples(document), (graph_id, GENESIS.hasContentHash, content_hash)]
+        self.graph.addN((s, p, o, document_graph) for s, p, o in triples)
+        self._version += 1
+        return True
+
+    def remove_document(self, source_path: str) -> bool:
+        """Drops the named graph of the document read from `source_path`. Returns False if there was none."""
+        graph_id = self.document_graph_id(source_path)
+        document_graph = self.graph.get_context(graph_id)
+        if document_graph.value(graph_id, GENESIS.hasContentHash) is None:
+            return False
+        self.graph.remove_graph(document_graph)
+        self._version += 1
+        return True
+
+    def _document_triples(self, document: Union[ParsedDocument, DocumentBatch]) -> Iterator[Tuple[URIRef, URIRef, Any]]:
         doc_uri = URIRef(GENESIS[document.document_id])
-        self.graph.add((doc_uri, RDF.type, GENESIS.Document))
-        self.graph.add((doc_uri, RDFS.label, Literal(document.metadata.get("title", document.document_id))))
-        self.graph.add((doc_uri, GENESIS.hasSourcePath, Literal(document.source_path)))
-        self.graph.add((doc_uri, GENESIS.hasDocumentType, Literal(document.document_type.value)))
+        yield doc_uri, RDF.type, GENESIS.Document
+        yield doc_uri, RDFS.label, Literal(document.metadata.get("title", document.document_id))
+        yield doc_uri, GENESIS.hasSourcePath, Literal(document.source_path)
+        yield doc_uri, GENESIS.hasDocumentType, Literal(document.document_type.value)
 
         # Add content blocks as part of the document
-        for i, block in enumerate(document.content_blocks):
+        for i, block_type, content, metadata in self._iter_blocks(document):
             block_uri = URIRef(GENESIS[f"{document.document_id}_block_{i}"])
-            self.graph.add((block_uri, RDF.type, GENESIS.ContentBlock))
-            self.graph.add((block_uri, GENESIS.partOf, doc_uri))
-            self.graph.add((block_uri, GENESIS.hasContent, Literal(block.content)))
-            self.graph.add((block_uri, GENESIS.hasBlockType, Literal(block.block_type.value)))
-            for key, value in block.metadata.items():
-                self.graph.add((block_uri, GENESIS[key], Literal(value)))
+            yield block_uri, RDF.type, GENESIS.ContentBlock
+            yield block_uri, GENESIS.partOf, doc_uri
+            if self.content_mode == "reference":
+                yield block_uri, GENESIS.hasContentRef, Literal(make_chunk_id(document.document_id, i))
+            else:
+                yield block_uri, GENESIS.hasContent, Literal(content)
+            yield block_uri, GENESIS.hasBlockType, Literal(block_type.value)
+            yield block_uri, GENESIS.hasBlockIndex, Literal(i)
+            for key, value in metadata.items():
+                yield block_uri, GENESIS[key], Literal(value)
 
-    def query_graph(self, query: str) -> List[Dict[str, Any]]:
+    def resolve_block_contents(self, block_uris: Iterable[URIRef]) -> Dict[URIRef, str]:
+        """
+        Returns the text of each block, whether it is stored inline or as a chunk reference.
+        References are resolved with a single `content_resolver` call; unresolvable ones map to "".
+        """
+        return self._resolve_contents({
+            block_uri: {
+                GENESIS.hasContent: self.graph.value(block_uri, GENESIS.hasContent),
+                GENESIS.hasContentRef: self.graph.value(block_uri, GENESIS.hasContentRef),
+            }
+            for block_uri in block_uris
+        })
+
+    def _resolve_contents(self, blocks: Dict[URIRef, Dict[URIRef, Any]]) -> Dict[URIRef, str]:
+        """Like resolve_block_contents, for blocks whose properties were already fetched."""
+        contents: Dict[URIRef, str] = {}
+        references: Dict[str, URIRef] = {}
+        for block_uri, properties in blocks.items():
+            content = properties.get(GENESIS.hasContent)
+            if content is not None:
+                contents[block_uri] = str(content)
+                continue
+            chunk_id = properties.get(GENESIS.hasContentRef)
+            if chunk_id is not None:
+                references[str(chunk_id)] = block_uri
+            contents[block_uri] = ""
+        if references and self.content_resolver is None:
+            raise RuntimeError(
+                f"{len(references)} block(s) store their content by reference, but this GraphStore "
+                "has no content_resolver. Pass LanceDBIngestionPipeline.get_texts_by_chunk_ids."
+            )
+        if references:
+            for chunk_id, text in self.content_resolver(list(references)).items():
+                contents[references[chunk_id]] = text
+        return contents
+
+    def query_graph(self, query: str, init_bindings: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Executes a SPARQL query against the graph and returns the results.
+
+        The query is parsed once and reused; results are cached until the graph changes.
+        `init_bindings` pre-binds query variables, e.g. {"doc": URIRef(...)}.
         """
+        key = self.query_cache.result_key(query, init_bindings, self.version)
+        cached = self.query_cache.get_result(key)
+        if cached is not None:
+            return [dict(row) for row in cached]
         results = []
         try:
-            for row in self.graph.query(query):
+            prepared = self.query_cache.prepare(query, dict(self.graph.namespaces()))
+            for row in self.graph.query(prepared, initBindings=init_bindings or {}):
                 results.append(row.asdict())
         except Exception as e:
             print(f"Error executing SPARQL query: {e}")
-        return results
+            return results
+        self.query_cache.put_result(key, results)
+        return [dict(row) for row in results]
+
+    def open_cursor(
+        self,
+        query: str,
+        page_size: int = settings.SPARQL_PAGE_SIZE,
+        max_rows: int = settings.SPARQL_MAX_ROWS,
+        timeout_seconds: float = settings.SPARQL_QUERY_TIMEOUT_SECONDS,
+        init_bindings: Optional[Dict[str, Any]] = None,
+    ) -> QueryCursor:
+        """
+        Starts a SPARQL query whose rows are read page by page with `fetch_page()`.
+
+        Unlike `query_graph`, results are neither materialized nor cached, which suits broad
+        exploratory queries. Raises on a malformed query.
+        """
+        prepared = self.query_cache.prepare(query, dict(self.graph.namespaces()))
+        return QueryCursor(
+            self.graph,
+            prepared,
+            page_size=page_size,
+            max_rows=max_rows,
+            timeout_seconds=timeout_seconds,
+            init_bindings=init_bindings,
+        )
 
     def get_document_by_id(self, document_id: str) -> ParsedDocument | None:
         """
         Retrieves a ParsedDocument from the graph based on its ID.
         This is a simplified reconstruction and might not capture all nuances.
+
+        The document's named graph is read in one pass and grouped by subject, so the cost is
+        proportional to the document's own triples. Blocks are returned in block order.
         """
         doc_uri = URIRef(GENESIS[document_id])
-        if (doc_uri, RDF.type, GENESIS.Document) in self.graph:
-            title = str(self.graph.value(doc_uri, RDFS.label))
-            source_path = str(self.graph.value(doc_uri, GENESIS.hasSourcePath))
-            doc_type = str(self.graph.value(doc_uri, GENESIS.hasDocumentType))
-
-            content_blocks: List[ContentBlock] = []
-            for s, p, o in self.graph.triples((None, GENESIS.partOf, doc_uri)):
-                if (s, RDF.type, GENESIS.ContentBlock) in self.graph:
-                    content = str(self.graph.value(s, GENESIS.hasContent))
-                    block_type = str(self.graph.value(s, GENESIS.hasBlockType))
-                    block_metadata = {}
-                    for bp, bo in self.graph.predicate_objects(s):
-                        if str(bp).startswith(str(GENESIS)) and bp not in [GENESIS.partOf, GENESIS.hasContent, GENESIS.hasBlockType]:
-                            block_metadata[str(bp).replace(str(GENESIS), "")] = str(bo)
-                    content_blocks.append(ContentBlock(
-                        block_type=block_type,
-                        content=content,
-                        metadata=block_metadata
-                    ))
-            
-            return ParsedDocument(
-                document_id=document_id,
-                document_type=DocumentType(doc_type),
-                source_path=source_path,
-                metadata={"title": title},
-                content_blocks=content_blocks
-            )
-        return None
+        source_path = self.graph.value(doc_uri, GENESIS.hasSourcePath)
+        if source_path is None:
+            return None
+        document_graph = self.graph.get_context(self.document_graph_id(str(source_path)))
+
+        properties: Dict[URIRef, Dict[URIRef, Any]] = defaultdict(dict)
+        for s, p, o in document_graph.triples((None, None, None)):
+            properties[s][p] = o
+        document = properties.get(doc_uri)
+        if document is None or document.get(RDF.type) != GENESIS.Document:
+            return None
+
+        blocks = {
+            subject: values for subject, values in properties.items()
+            if values.get(GENESIS.partOf) == doc_uri and values.get(RDF.type) == GENESIS.ContentBlock
+        }
+        contents = self._resolve_contents(blocks)
+        content_blocks: List[ContentBlock] = []
+        for block_uri, values in blocks.items():
+            block_metadata = {
+                str(p)[len(GENESIS):]: str(o) for p, o in values.items()
+                if p not in _STRUCTURAL_BLOCK_PREDICATES and p.startswith(GENESIS)
+            }
+            content_blocks.append(ContentBlock(
+                block_type=str(values.get(GENESIS.hasBlockType)),
+                content=contents[block_uri],
+                block_index=self._block_index(block_uri, values),
+                metadata=block_metadata
+            ))
+        content_blocks.sort(key=lambda block: block.block_index)
+
+        return ParsedDocument(
+            document_id=document_id,
+            document_type=DocumentType(str(document[GENESIS.hasDocumentType])),
+            source_path=str(source_path),
+            metadata={"title": str(document.get(RDFS.label, document_id))},
+            content_blocks=content_blocks
+        )
+
+    @staticmethod
+    def _block_index(block_uri: URIRef, values: Dict[URIRef, Any]) -> int:
+        """Reads genesis:hasBlockIndex; blocks written before it existed carry the index in their URI."""
+        index = values.get(GENESIS.hasBlockIndex)
+        if index is not None:
+            return int(index)
+        return int(str(block_uri).rsplit("_block_", 1)[1])
@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Mapping, Optional
+
+from rdflib.plugins.sparql import prepareQuery
+from rdflib.plugins.sparql.sparql import Query
+
+
+class SPARQLQueryCache:
+    """
+    LRU caches for parsed SPARQL queries and for their results.
+
+    Prepared queries are keyed by query text and namespace bindings. Results are keyed by
+    query text, initial bindings and the graph version they were computed at, so a
+    mutation of the graph makes older entries unreachable; they age out of the LRU.
+    """
+
+    def __init__(self, max_prepared: int = 256, max_results: int = 1024):
+        self.max_prepared = max_prepared
+        self.max_results = max_results
+        self._prepared: "OrderedDict[Hashable, Query]" = OrderedDict()
+        self._results: "OrderedDict[Hashable, List[Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def prepare(self, query: str, namespaces: Mapping[str, Any]) -> Query:
+        """Returns the parsed and algebra-translated form of `query`, parsing it only once."""
+        key = (query, tuple(sorted((prefix, str(uri)) for prefix, uri in namespaces.items())))
+        prepared = self._prepared.get(key)
+        if prepared is None:
+            prepared = prepareQuery(query, initNs=dict(namespaces))
+            self._prepared[key] = prepared
+            if len(self._prepared) > self.max_prepared:
+                self._prepared.popitem(last=False)
+        else:
+            self._prepared.move_to_end(key)
+        return prepared
+
+    @staticmethod
+    def result_key(query: str, bindings: Optional[Mapping[str, Any]], version: Hashable) -> Hashable:
+        bound = tuple(sorted((str(name), value) for name, value in (bindings or {}).items()))
+        return query, bound, version
+
+    def get_result(self, key: Hashable) -> Optional[List[Dict[str, Any]]]:
+        rows = self._results.get(key)
+        if rows is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._results.move_to_end(key)
+        return rows
+
+    def put_result(self, key: Hashable, rows: List[Dict[str, Any]]):
+        self._results[key] = rows
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        self._prepared.clear()
+        self._results.clear()
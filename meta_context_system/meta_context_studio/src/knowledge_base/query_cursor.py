@@ -0,0 +1,108 @@
+import time
+from typing import Any, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from rdflib import Graph
+from rdflib.plugins.sparql.sparql import Query
+
+
+class QueryCursor:
+    """
+    Streams the rows of a SPARQL query one page at a time.
+
+    The query is evaluated lazily: each `fetch_page()` pulls only the next `page_size`
+    rows from rdflib's binding generator, so nothing past the current page is computed or
+    held in memory. A cursor stops for good once the results are exhausted, `max_rows`
+    rows have been read, or the evaluation time spent across all pages exceeds
+    `timeout_seconds`; `stop_reason` then says which.
+
+    The timeout is checked between rows. Operators that must see every row before
+    yielding the first (ORDER BY, GROUP BY) still run to completion on the first page.
+    """
+
+    def __init__(
+        self,
+        graph: Graph,
+        query: Any,
+        page_size: int = 100,
+        max_rows: int = 10000,
+        timeout_seconds: float = 10.0,
+        init_bindings: Optional[Mapping[str, Any]] = None,
+        init_ns: Optional[Mapping[str, Any]] = None,
+    ):
+        """
+        Args:
+            graph: The rdflib Graph or Dataset to query.
+            query: SPARQL query text or a prepared Query.
+            page_size: Rows returned per `fetch_page()` call.
+            max_rows: Total number of rows the cursor will read.
+            timeout_seconds: Total evaluation time the cursor may spend.
+            init_bindings: Pre-bound query variables.
+            init_ns: Prefixes for query text that is not prepared yet.
+        """
+        self.page_size = page_size
+        self.max_rows = max_rows
+        self.timeout_seconds = timeout_seconds
+        self.rows_read = 0
+        self.elapsed = 0.0
+        self.stop_reason: Optional[str] = None
+
+        started = time.monotonic()
+        kwargs = {"initBindings": dict(init_bindings or {})}
+        if init_ns and not isinstance(query, Query):
+            kwargs["initNs"] = dict(init_ns)
+        self.columns, self._rows = self._open(graph.query(query, **kwargs))
+        self.elapsed += time.monotonic() - started
+
+    @staticmethod
+    def _open(result) -> Tuple[List[str], Iterator[Sequence[Any]]]:
+        if result.type == "ASK":
+            return ["ask"], iter([(result.askAnswer,)])
+        if result.type in ("CONSTRUCT", "DESCRIBE"):
+            return ["subject", "predicate", "object"], iter(result.graph)
+        variables = list(result.vars or [])
+        # Read rdflib's binding generator directly: iterating the Result itself also appends
+        # every row to an internal list, which is what a cursor is meant to avoid.
+        bindings = getattr(result, "_genbindings", None)
+        if bindings is None:
+            bindings = iter(result.bindings)
+        rows = (tuple(binding.get(var) for var in variables) for binding in bindings if binding)
+        return [str(var) for var in variables], rows
+
+    @property
+    def exhausted(self) -> bool:
+        return self.stop_reason is not None
+
+    def fetch_page(self) -> List[Tuple[Any, ...]]:
+        """Returns the next page of rows as tuples of rdflib terms (None for unbound)."""
+        page: List[Tuple[Any, ...]] = []
+        if self.exhausted:
+            return page
+        started = time.monotonic()
+        limit = min(self.page_size, self.max_rows - self.rows_read)
+        try:
+            while len(page) < limit:
+                if self.elapsed + (time.monotonic() - started) > self.timeout_seconds:
+                    self.stop_reason = "timeout"
+                    break
+                row = next(self._rows, None)
+                if row is None:
+                    self.stop_reason = "end"
+                    break
+                page.append(tuple(row))
+        finally:
+            self.elapsed += time.monotonic() - started
+            self.rows_read += len(page)
+        if self.stop_reason is None and self.rows_read >= self.max_rows:
+            self.stop_reason = "row_limit"
+        if self.exhausted:
+            self.close()
+        return page
+
+    def close(self):
+        """Stops the underlying evaluation and releases its state."""
+        if self.stop_reason is None:
+            self.stop_reason = "closed"
+        close = getattr(self._rows, "close", None)
+        if close is not None:
+            close()
+        self._rows = iter(())
@@ -0,0 +1,12 @@
+from typing import Any, Optional
+
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
+
+
+def graph_identifier(context: Any) -> Optional[Any]:
+    """
+    Identifier of a quad's graph, given the graph or its identifier; None for the
+    Dataset's default graph.
+    """
+    identifier = getattr(context, "identifier", context)
+    return None if identifier == DATASET_DEFAULT_GRAPH_ID else identifier
@@ -0,0 +1,316 @@
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rdflib import BNode, Literal, URIRef
+from rdflib.graph import Graph
+from rdflib.store import Store, VALID_STORE, NO_STORE
+from rdflib.term import Node
+
+# Term kinds stored in the `terms` table.
+_URI, _BNODE, _LITERAL = "U", "B", "L"
+
+# Term id caches are cleared once they reach this many entries to keep memory bounded.
+_TERM_CACHE_LIMIT = 100_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    datatype TEXT NOT NULL DEFAULT '',
+    lang TEXT NOT NULL DEFAULT '',
+    UNIQUE (kind, value, datatype, lang)
+);
+CREATE TABLE IF NOT EXISTS quads (
+    s INTEGER NOT NULL,
+    p INTEGER NOT NULL,
+    o INTEGER NOT NULL,
+    c INTEGER NOT NULL,
+    PRIMARY KEY (s, p, o, c)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS quads_pos ON quads (p, o, s);
+CREATE INDEX IF NOT EXISTS quads_osp ON quads (o, s, p);
+CREATE INDEX IF NOT EXISTS quads_c ON quads (c);
+CREATE TABLE IF NOT EXISTS graphs (
+    c INTEGER PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS namespaces (
+    prefix TEXT PRIMARY KEY,
+    uri TEXT NOT NULL UNIQUE
+);
+"""
+
+
+class SQLiteTripleStore(Store):
+    """
+    Context-aware rdflib Store persisted in a single SQLite file.
+
+    Terms are interned into integer ids and quads are indexed as SPO (primary key), POS
+    and OSP, so pattern lookups hit an index and opening the store does not read the
+    graph into memory. Writes are grouped in a transaction until `commit()`. `version`
+    changes on every mutation and rollback through this store and whenever another
+    connection to the same file, in this or another process, commits a change.
+
+    Usage:
+        graph = Graph(store=SQLiteTripleStore(), identifier=URIRef("urn:graph"))
+        graph.open("knowledge_graph.sqlite", create=True)
+    """
+
+    context_aware = True
+    formula_aware = False
+    transaction_aware = True
+    graph_aware = True
+
+    def __init__(self, configuration: Optional[str] = None, identifier: Optional[URIRef] = None):
+        self._connection: Optional[sqlite3.Connection] = None
+        self._term_ids: Dict[Node, int] = {}
+        self._terms: Dict[int, Node] = {}
+        self._mutations = 0
+        super().__init__(configuration, identifier)
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        """
+        (`PRAGMA data_version`, local mutation count). SQLite moves data_version when any
+        other connection commits to the database file, so caches keyed on the version are
+        invalidated by writers in other GraphStores and processes as well.
+        """
+        if self._connection is None:
+            return 0, self._mutations
+        return self._connection.execute("PRAGMA data_version").fetchone()[0], self._mutations
+
+    def open(self, configuration: str, create: bool = False) -> int:
+        if not create and not os.path.exists(configuration):
+            return NO_STORE
+        directory = os.path.dirname(configuration)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(configuration, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._connection.commit()
+        return VALID_STORE
+
+    def close(self, commit_pending_transaction: bool = False):
+        if self._connection is None:
+            return
+        if commit_pending_transaction:
+            self._connection.commit()
+        else:
+            self._connection.rollback()
+        self._connection.close()
+        self._connection = None
+
+    def destroy(self, configuration: str):
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(configuration + suffix):
+                os.remove(configuration + suffix)
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+        self._mutations += 1
+        # Ids of terms inserted in the rolled back transaction are no longer valid.
+        self._term_ids.clear()
+        self._terms.clear()
+
+    def is_empty(self) -> bool:
+        """True if the store holds no triples; does not scan the quads table."""
+        return self._connection.execute("SELECT 1 FROM quads LIMIT 1").fetchone() is None
+
+    # -- Term encoding -------------------------------------------------------------
+
+    @staticmethod
+    def _encode(term: Node) -> Tuple[str, str, str, str]:
+        if isinstance(term, Literal):
+            return _LITERAL, str(term), str(term.datatype or ""), term.language or ""
+        if isinstance(term, BNode):
+            return _BNODE, str(term), "", ""
+        if isinstance(term, URIRef):
+            return _URI, str(term), "", ""
+        raise TypeError(f"SQLiteTripleStore cannot store term {term!r} of type {type(term).__name__}.")
+
+    @staticmethod
+    def _decode(kind: str, value: str, datatype: str, lang: str) -> Node:
+        if kind == _LITERAL:
+            return Literal(value, lang=lang or None, datatype=URIRef(datatype) if datatype else None)
+        if kind == _BNODE:
+            return BNode(value)
+        return URIRef(value)
+
+    def _remember(self, term: Node, term_id: int):
+        if len(self._term_ids) >= _TERM_CACHE_LIMIT:
+            self._term_ids.clear()
+            self._terms.clear()
+        self._term_ids[term] = term_id
+        self._terms[term_id] = term
+
+    def _lookup_id(self, term: Node) -> Optional[int]:
+        """Returns the id of a known term, or None if the term was never stored."""
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            row = self._connection.execute(
+                "SELECT id FROM terms WHERE kind = ? AND value = ? AND datatype = ? AND lang = ?",
+                self._encode(term),
+            ).fetchone()
+            if row is None:
+                return None
+            term_id = row[0]
+            self._remember(term, term_id)
+        return term_id
+
+    def _intern(self, term: Node) -> int:
+        term_id = self._lookup_id(term)
+        if term_id is None:
+            term_id = self._connection.execute(
+                "INSERT INTO terms (kind, value, datatype, lang) VALUES (?, ?, ?, ?)",
+                self._encode(term),
+            ).lastrowid
+            self._remember(term, term_id)
+        return term_id
+
+    def _term(self, term_id: int) -> Node:
+        term = self._terms.get(term_id)
+        if term is None:
+            row = self._connection.execute(
+                "SELECT kind, value, datatype, lang FROM terms WHERE id = ?", (term_id,)
+            ).fetchone()
+            term = self._decode(*row)
+            self._remember(term, term_id)
+        return term
+
+    @staticmethod
+    def _context_identifier(context: Any) -> Optional[Node]:
+        if context is None:
+            return None
+        return getattr(context, "identifier", context)
+
+    # -- Triples ---------------------------------------------------------------------
+
+    def add(self, triple, context, quoted: bool = False):
+        if quoted:
+            raise NotImplementedError("SQLiteTripleStore does not support quoted graphs.")
+        s, p, o = triple
+        c = self._intern(self._context_identifier(context))
+        self._connection.execute(
+            "INSERT OR IGNORE INTO quads (s, p, o, c) VALUES (?, ?, ?, ?)",
+            (self._intern(s), self._intern(p), self._intern(o), c),
+        )
+        self._connection.execute("INSERT OR IGNORE INTO graphs (c) VALUES (?)", (c,))
+        self._mutations += 1
+        super().add(triple, context, quoted)
+
+    def addN(self, quads: Iterable[Tuple[Node, Node, Node, Any]]):
+        rows = []
+        contexts = set()
+        for s, p, o, context in quads:
+            c = self._intern(self._context_identifier(context))
+            contexts.add(c)
+            rows.append((self._intern(s), self._intern(p), self._intern(o), c))
+        self._connection.executemany("INSERT OR IGNORE INTO quads (s, p, o, c) VALUES (?, ?, ?, ?)", rows)
+        self._connection.executemany("INSERT OR IGNORE INTO graphs (c) VALUES (?)", [(c,) for c in contexts])
+        self._mutations += 1
+
+    def _where(self, triple_pattern, context) -> Optional[Tuple[str, List[int]]]:
+        """
+        Builds the WHERE clause for a triple pattern. Returns None if a bound term was never
+        stored, in which case nothing can match.
+        """
+        clauses, params = [], []
+        for column, term in zip(("s", "p", "o", "c"), (*triple_pattern, self._context_identifier(context))):
+            if term is None:
+                continue
+            term_id = self._lookup_id(term)
+            if term_id is None:
+                return None
+            clauses.append(f"{column} = ?")
+            params.append(term_id)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def remove(self, triple_pattern, context=None):
+        where = self._where(triple_pattern, context)
+        if where is None:
+            return
+        clause, params = where
+        self._connection.execute(f"DELETE FROM quads{clause}", params)
+        self._mutations += 1
+        super().remove(triple_pattern, context)
+
+    def triples(self, triple_pattern, context=None) -> Iterator[Tuple[Tuple[Node, Node, Node], Iterator[Graph]]]:
+        where = self._where(triple_pattern, context)
+        if where is None:
+            return
+        clause, params = where
+        # Rows are fetched up front so callers may modify the store while iterating.
+        rows = self._connection.execute(f"SELECT DISTINCT s, p, o FROM quads{clause}", params).fetchall()
+        for s, p, o in rows:
+            yield (self._term(s), self._term(p), self._term(o)), self._contexts_of(s, p, o)
+
+    def _contexts_of(self, s: int, p: int, o: int) -> Iterator[Graph]:
+        rows = self._connection.execute("SELECT c FROM quads WHERE s = ? AND p = ? AND o = ?", (s, p, o)).fetchall()
+        for (c,) in rows:
+            yield self._graph(c)
+
+    def _graph(self, c: int) -> Graph:
+        return Graph(store=self, identifier=self._term(c))
+
+    def __len__(self, context=None) -> int:
+        identifier = self._context_identifier(context)
+        if identifier is None:
+            return self._connection.execute("SELECT COUNT(*) FROM (SELECT DISTINCT s, p, o FROM quads)").fetchone()[0]
+        c = self._lookup_id(identifier)
+        if c is None:
+            return 0
+        return self._connection.execute("SELECT COUNT(*) FROM quads WHERE c = ?", (c,)).fetchone()[0]
+
+    def contexts(self, triple=None) -> Iterator[Graph]:
+        if triple is None:
+            rows = self._connection.execute("SELECT c FROM graphs").fetchall()
+        else:
+            ids = [self._lookup_id(term) for term in triple]
+            if None in ids:
+                return
+            rows = self._connection.execute(
+                "SELECT c FROM quads WHERE s = ? AND p = ? AND o = ?", ids
+            ).fetchall()
+        for (c,) in rows:
+            yield self._graph(c)
+
+    def add_graph(self, graph: Graph):
+        self._connection.execute("INSERT OR IGNORE INTO graphs (c) VALUES (?)", (self._intern(graph.identifier),))
+
+    def remove_graph(self, graph: Graph):
+        c = self._lookup_id(graph.identifier)
+        if c is None:
+            return
+        self._connection.execute("DELETE FROM quads WHERE c = ?", (c,))
+        self._connection.execute("DELETE FROM graphs WHERE c = ?", (c,))
+        self._mutations += 1
+
+    # -- Namespaces ------------------------------------------------------------------
+
+    def bind(self, prefix: str, namespace: URIRef, override: bool = True):
+        bound_namespace = self.namespace(prefix)
+        bound_prefix = self.prefix(namespace)
+        if override:
+            self._connection.execute("DELETE FROM namespaces WHERE prefix = ? OR uri = ?", (prefix, str(namespace)))
+            self._connection.execute("INSERT INTO namespaces (prefix, uri) VALUES (?, ?)", (prefix, str(namespace)))
+        elif bound_namespace is None and bound_prefix is None:
+            self._connection.execute("INSERT INTO namespaces (prefix, uri) VALUES (?, ?)", (prefix, str(namespace)))
+
+    def namespace(self, prefix: str) -> Optional[URIRef]:
+        row = self._connection.execute("SELECT uri FROM namespaces WHERE prefix = ?", (prefix,)).fetchone()
+        return URIRef(row[0]) if row else None
+
+    def prefix(self, namespace: URIRef) -> Optional[str]:
+        row = self._connection.execute("SELECT prefix FROM namespaces WHERE uri = ?", (str(namespace),)).fetchone()
+        return row[0] if row else None
+
+    def namespaces(self) -> Iterator[Tuple[str, URIRef]]:
+        for prefix, uri in self._connection.execute("SELECT prefix, uri FROM namespaces").fetchall():
+            yield prefix, URIRef(uri)
@@ -1,9 +1,12 @@
+import hashlib
 import logging
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import lancedb
+import pyarrow as pa
+import pyarrow.compute as pc
 from langchain_community.document_loaders import (
     TextLoader,
     UnstructuredHTMLLoader,
@@ -15,6 +18,8 @@ from lancedb.pydantic import LanceModel, Vector
 from pydantic import Field
 
 from meta_context_studio.config import settings
+from meta_context_studio.src.ingestion.document_batch import make_chunk_id
+from meta_context_studio.src.context_management.retrieval.query_embedding_cache import QueryEmbeddingCache
 
 # --- Setup Logging ---
 logging.basicConfig(
@@ -30,6 +35,35 @@ class LanceDBSchema(LanceModel):
     vector: Vector(768) = Field(doc="The vector embedding of the text chunk.")
     text: str = Field(doc="The text content of the document chunk.")
     source: str = Field(doc="The source file path of the document.")
+    chunk_id: str = Field(doc="Stable id of the chunk, '<document_id or source>:<index>'.")
+    document_id: Optional[str] = Field(default=None, doc="Id of the parsed document the chunk belongs to, if any.")
+    block_index: Optional[int] = Field(default=None, doc="Index of the chunk's content block in that document.")
+
+
+# Columns added to LanceDBSchema after the first tables were created, with the SQL
+# expression that fills them in existing rows.
+ADDED_SCHEMA_COLUMNS = {
+    "chunk_id": "CAST(NULL AS STRING)",
+    "document_id": "CAST(NULL AS STRING)",
+    "block_index": "CAST(NULL AS BIGINT)",
+}
+
+
+# Filters that select rows by key list at most this many keys, so that a large lookup
+# runs as several bounded queries instead of one unbounded SQL string.
+KEY_FILTER_BATCH_SIZE = 512
+
+
+def _sql_string(value: str) -> str:
+    """Quotes a value as a SQL string literal for a LanceDB filter."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _in_filters(column: str, values: List[str]) -> Iterator[str]:
+    """Yields `<column> IN (...)` filters over consecutive slices of KEY_FILTER_BATCH_SIZE values."""
+    for offset in range(0, len(values), KEY_FILTER_BATCH_SIZE):
+        quoted = ", ".join(_sql_string(value) for value in values[offset:offset + KEY_FILTER_BATCH_SIZE])
+        yield f"{column} IN ({quoted})"
 
 
 class LanceDBIngestionPipeline:
@@ -48,17 +82,29 @@ class LanceDBIngestionPipeline:
         db_path: str,
         table_name: str,
         embedding_model_name: str = "models/embedding-001",
+        query_embedding_cache: QueryEmbeddingCache | None = None,
     ):
         self.db_path = db_path
+        self.embedding_model_name = embedding_model_name
+        self.query_embedding_cache = query_embedding_cache
         self.table_name = table_name
         self.db = lancedb.connect(db_path)
 
         # Create or open the LanceDB table with the defined schema
         try:
             self.table = self.db.open_table(table_name)
-        except FileNotFoundError:
+        except (FileNotFoundError, ValueError):
+            # Older lancedb releases raise FileNotFoundError for a missing table, newer ones ValueError
             logging.info(f"Table '{table_name}' not found. Creating new table.")
             self.table = self.db.create_table(table_name, schema=LanceDBSchema)
+        # Older tables are migrated, otherwise writes would silently drop the new columns
+        missing_columns = {
+            name: expression for name, expression in ADDED_SCHEMA_COLUMNS.items()
+            if name not in self.table.schema.names
+        }
+        if missing_columns:
+            logging.info(f"Adding columns {sorted(missing_columns)} to table '{table_name}'.")
+            self.table.add_columns(missing_columns)
 
         # Setup text splitter for intelligent chunking
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -101,10 +147,19 @@ class LanceDBIngestionPipeline:
             docs = loader.load()
             chunks = self.text_splitter.split_documents(docs)
 
-            # Prepare data for batch embedding
+            # Chunks are keyed by the file's content hash, like the documents of the
+            # IngestionPipeline, so a changed file replaces its earlier chunks
+            source = str(Path(file_path).resolve())
+            document_id = hashlib.sha256(Path(file_path).read_bytes()).hexdigest()
             chunk_data = [
-                {"text": chunk.page_content, "source": str(Path(file_path).resolve())}
-                for chunk in chunks
+                {
+                    "text": chunk.page_content,
+                    "source": source,
+                    "chunk_id": make_chunk_id(document_id, index),
+                    "document_id": document_id,
+                    "block_index": index,
+                }
+                for index, chunk in enumerate(chunks)
             ]
             return chunk_data
         except Exception as e:
@@ -113,7 +168,8 @@ class LanceDBIngestionPipeline:
 
     def ingest_files(self, file_paths: List[str], batch_size: int = 100):
         """
-        Ingests a list of files into the LanceDB knowledge base.
+        Ingests a list of files into the LanceDB knowledge base through `upsert_chunks`,
+        so ingesting an unchanged file again writes nothing.
         """
         all_chunks = []
         logging.info(f"Starting ingestion for {len(file_paths)} files...")
@@ -135,24 +191,203 @@ class LanceDBIngestionPipeline:
             logging.info("No new document chunks were generated.")
             return
 
-        logging.info(f"Generated {len(all_chunks)} chunks. Starting embedding...")
+        logging.info(f"Generated {len(all_chunks)} chunks. Embedding and writing new chunks to LanceDB...")
+        records = pa.Table.from_pylist(all_chunks, schema=pa.schema([
+            ("text", pa.string()),
+            ("source", pa.string()),
+            ("chunk_id", pa.string()),
+            ("document_id", pa.string()),
+            ("block_index", pa.int64()),
+        ]))
+        inserted = self.upsert_chunks(records, batch_size=batch_size)
+        logging.info(f"Successfully ingested {inserted} new chunks into the KB.")
+
+    def ingest_documents(self, records: List[Dict] | pa.Table, batch_size: int = 500):
+        """
+        Writes records that were already embedded with this table's embedding model
+        to LanceDB in bulk. Accepts a list of dicts or a pyarrow Table; fields that
+        are not part of the table schema are dropped, and columns added to the table
+        later (such as centrality scores) are filled with nulls.
+        """
+        schema = self.table.schema
+        columns = set(schema.names)
+        if isinstance(records, pa.Table):
+            rows = records.select([name for name in records.column_names if name in columns])
+            for field in schema:
+                if field.name not in rows.column_names:
+                    rows = rows.append_column(field, pa.nulls(rows.num_rows, type=field.type))
+            for offset in range(0, rows.num_rows, batch_size):
+                self.table.add(rows.slice(offset, batch_size))
+            logging.info(f"Wrote {rows.num_rows} pre-embedded records to LanceDB.")
+            return
+        rows = [{name: record.get(name) for name in schema.names} for record in records]
+        for i in range(0, len(rows), batch_size):
+            self.table.add(rows[i : i + batch_size])
+        logging.info(f"Wrote {len(rows)} pre-embedded records to LanceDB.")
+
+    def upsert_chunks(self, records: pa.Table, batch_size: int = 100) -> int:
+        """
+        Writes chunks from the IngestionPipeline journal, embedding their texts with this
+        table's embedding model so that the index holds a single embedding space. Chunks
+        are keyed by `chunk_id`, which is derived from the document's content hash, so a
+        chunk that is already in the table is neither embedded nor written again; replaying
+        a batch after a crash therefore does not duplicate rows. When a changed document is
+        ingested again, the rows of its earlier versions (same source, other document_id)
+        are deleted first, so that only the current version stays searchable.
+
+        Fields that are not part of the table schema (including any precomputed vector)
+        are dropped and missing columns are filled with nulls.
+
+        Returns:
+            The number of chunks inserted.
+        """
+        schema = self.table.schema
+        rows = records.select([name for name in records.column_names if name in schema.names and name != "vector"])
+        if rows.num_rows == 0:
+            return 0
+        self._delete_replaced_chunks(rows)
+        dataset = self.table.to_lance()
+        existing = [
+            dataset.to_table(columns=["chunk_id"], filter=chunk_filter).column("chunk_id").combine_chunks()
+            for chunk_filter in _in_filters("chunk_id", rows.column("chunk_id").to_pylist())
+        ]
+        rows = rows.filter(pc.invert(pc.is_in(rows.column("chunk_id"), value_set=pa.concat_arrays(existing))))
+
+        vector_field = schema.field("vector")
+        for offset in range(0, rows.num_rows, batch_size):
+            batch = rows.slice(offset, batch_size)
+            vectors = self.embedding_model.embed_documents(batch.column("text").to_pylist())
+            batch = batch.append_column(vector_field, pa.array(vectors, type=vector_field.type))
+            for field in schema:
+                if field.name not in batch.column_names:
+                    batch = batch.append_column(field, pa.nulls(batch.num_rows, type=field.type))
+            self.table.merge_insert("chunk_id").when_not_matched_insert_all().execute(batch.select(schema.names).cast(schema))
+        logging.info(f"Inserted {rows.num_rows} of {records.num_rows} chunks into LanceDB.")
+        return rows.num_rows
+
+    def _delete_replaced_chunks(self, rows: pa.Table):
+        """Deletes the rows that share a source with `rows` but belong to another document version."""
+        if "document_id" not in rows.column_names:
+            return
+        documents = {
+            (source, document_id)
+            for source, document_id in zip(rows.column("source").to_pylist(), rows.column("document_id").to_pylist())
+            if document_id is not None
+        }
+        documents = sorted(documents)
+        for offset in range(0, len(documents), KEY_FILTER_BATCH_SIZE):
+            self.table.delete(" OR ".join(
+                f"(source = {_sql_string(source)} AND (document_id IS NULL OR document_id != {_sql_string(document_id)}))"
+                for source, document_id in documents[offset:offset + KEY_FILTER_BATCH_SIZE]
+            ))
+
+    def update_centrality(self, scores: Dict[str, Tuple[float, float]], tolerance: float = 1e-4) -> int:
+        """
+        Stores document centrality as the `centrality` (PageRank) and `degree_centrality`
+        columns of every chunk of the document, keyed by source path. The columns are added
+        on first use. Only the chunks of the scored sources are read, and those whose score
+        moved by more than `tolerance` are rewritten in a single merge keyed on chunk id.
+        Rows without a chunk id cannot be keyed and keep their scores.
 
-        # Batch embed all chunks
-        texts_to_embed = [chunk["text"] for chunk in all_chunks]
-        embeddings = self.embedding_model.embed_documents(texts_to_embed)
+        Returns:
+            The number of sources updated.
+        """
+        if "centrality" not in self.table.schema.names:
+            self.table.add_columns({
+                "centrality": "CAST(NULL AS FLOAT)",
+                "degree_centrality": "CAST(NULL AS FLOAT)",
+            })
+        dataset = self.table.to_lance()
+        changed = []
+        for source_filter in _in_filters("source", list(scores)):
+            rows = dataset.to_table(filter=f"({source_filter}) AND chunk_id IS NOT NULL")
+            sources = rows.column("source").to_pylist()
+            old_pageranks = rows.column("centrality").to_pylist()
+            old_degrees = rows.column("degree_centrality").to_pylist()
+            moved = [
+                old_pagerank is None or old_degree is None
+                or abs(old_pagerank - scores[source][0]) > tolerance
+                or abs(old_degree - scores[source][1]) > tolerance
+                for source, old_pagerank, old_degree in zip(sources, old_pageranks, old_degrees)
+            ]
+            rows = rows.filter(pa.array(moved, type=pa.bool_()))
+            if rows.num_rows == 0:
+                continue
+            sources = rows.column("source").to_pylist()
+            for position, name in enumerate(("centrality", "degree_centrality")):
+                index = rows.schema.get_field_index(name)
+                field = rows.schema.field(index)
+                rows = rows.set_column(index, field, pa.array([scores[source][position] for source in sources], type=field.type))
+            changed.append(rows)
+        updated = 0
+        if changed:
+            rows = pa.concat_tables(changed)
+            self.table.merge_insert("chunk_id").when_matched_update_all().execute(rows)
+            updated = len(set(rows.column("source").to_pylist()))
+        logging.info(f"Updated centrality for {updated} of {len(scores)} documents.")
+        return updated
 
-        # Add embeddings to chunks
-        for i, chunk in enumerate(all_chunks):
-            chunk["vector"] = embeddings[i]
+    def chunk_ids_without_summary(self) -> List[str]:
+        """Ids of the chunks whose `summary` column is still empty; adds the column on first use."""
+        if "summary" not in self.table.schema.names:
+            self.table.add_columns({"summary": "CAST(NULL AS STRING)"})
+        rows = self.table.to_lance().to_table(columns=["chunk_id"], filter="summary IS NULL AND chunk_id IS NOT NULL")
+        return rows.column("chunk_id").to_pylist()
 
-        logging.info("Embedding complete. Writing to LanceDB...")
+    def update_summaries(self, summaries: Dict[str, str]) -> int:
+        """
+        Writes precomputed chunk summaries to the `summary` column in one merge, keyed by
+        chunk id. Returns the number of chunks updated.
+        """
+        if not summaries:
+            return 0
+        dataset = self.table.to_lance()
+        rows = pa.concat_tables([
+            dataset.to_table(filter=chunk_filter) for chunk_filter in _in_filters("chunk_id", list(summaries))
+        ])
+        rows = rows.set_column(
+            rows.schema.get_field_index("summary"),
+            rows.schema.field("summary"),
+            pa.array([summaries[chunk_id] for chunk_id in rows.column("chunk_id").to_pylist()], type=pa.string()),
+        )
+        self.table.merge_insert("chunk_id").when_matched_update_all().execute(rows)
+        return rows.num_rows
 
-        # Batch write to LanceDB
-        for i in range(0, len(all_chunks), batch_size):
-            batch = all_chunks[i : i + batch_size]
-            try:
-                self.table.add(batch)
-            except Exception as e:
-                logging.error(f"Failed to add batch to LanceDB: {e}")
+    def embed_query(self, query: str) -> List[float]:
+        """Embeds a search query, through the query embedding cache when one is configured."""
+        if self.query_embedding_cache is None:
+            return self.embedding_model.embed_query(query)
+        return self.query_embedding_cache.embed(query, self.embedding_model_name, self.embedding_model.embed_query)
 
-        logging.info(f"Successfully ingested {len(all_chunks)} chunks into the KB.")
\ No newline at end of file
+    def table_version(self) -> int:
+        """Version of the LanceDB table; it changes with every write."""
+        return self.table.version
+
+    def search(self, query: str, limit: int = 5, query_vector: List[float] | None = None) -> List[Dict[str, Any]]:
+        """
+        Returns the `limit` chunks nearest to the query, with their `_distance`. Pass
+        `query_vector` when the query has already been embedded.
+        """
+        if query_vector is None:
+            query_vector = self.embed_query(query)
+        return self.table.search(query_vector).limit(limit).to_list()
+
+    def get_rows_by_chunk_ids(self, chunk_ids: List[str], columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Looks up rows by chunk id, with all columns unless `columns` is given. Rows written
+        before the chunk_id column existed have no id and are not found.
+        """
+        rows = []
+        for chunk_filter in _in_filters("chunk_id", chunk_ids):
+            query = self.table.search().where(chunk_filter).limit(KEY_FILTER_BATCH_SIZE)
+            if columns is not None:
+                query = query.select(columns)
+            rows.extend(query.to_list())
+        return rows
+
+    def get_texts_by_chunk_ids(self, chunk_ids: List[str]) -> Dict[str, str]:
+        """
+        Looks up chunk texts by chunk id. Used by the GraphStore to resolve blocks stored
+        as references.
+        """
+        return {row["chunk_id"]: row["text"] for row in self.get_rows_by_chunk_ids(chunk_ids, ["chunk_id", "text"])}
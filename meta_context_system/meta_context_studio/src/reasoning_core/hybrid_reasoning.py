@@ -1,14 +1,107 @@
 """Integration logic for neurosymbolic approaches."""
-from typing import Any
+from typing import Any, Dict, List, Optional
+
+from rdflib import Literal, URIRef
+from rdflib.namespace import RDF, RDFS
+
+from meta_context_studio.src.ingestion.document_batch import make_chunk_id
+from meta_context_studio.src.knowledge_base.graph_adjacency import GraphAdjacency
+from meta_context_studio.src.knowledge_base.graph_store import GENESIS, GraphStore
 
 class HybridReasoning:
     """
     Integrates symbolic reasoning (e.g., knowledge graphs) with neural reasoning (LLMs).
     """
 
+    def __init__(self, graph_store: Optional[GraphStore] = None):
+        self.graph_store = graph_store
+        # Built lazily on the first graph-expanded retrieval and refreshed as the graph changes
+        self._adjacency: Optional[GraphAdjacency] = None
+
     def neuro_symbolic_reasoning(self, llm_output: str, kg_query_result: Any) -> str:
         """
         Combines LLM output with knowledge graph query results for enhanced reasoning.
         """
         print("HybridReasoning: Performing neuro-symbolic reasoning.")
-        return f"Combined result: LLM output ({llm_output[:50]}...) + KG data ({kg_query_result[:50]}...)"
\ No newline at end of file
+        return f"Combined result: LLM output ({llm_output[:50]}...) + KG data ({kg_query_result[:50]}...)"
+
+    @property
+    def adjacency(self) -> GraphAdjacency:
+        if self.graph_store is None:
+            raise ValueError("HybridReasoning needs a GraphStore for graph-expanded retrieval.")
+        if self._adjacency is None:
+            self._adjacency = GraphAdjacency(self.graph_store)
+        return self._adjacency
+
+    def _hit_node(self, hit: Dict[str, Any]) -> Optional[URIRef]:
+        """Maps a vector search hit to its block node, or to its document node by source path."""
+        if hit.get("document_id") and hit.get("block_index") is not None:
+            return URIRef(GENESIS[f"{hit['document_id']}_block_{int(hit['block_index'])}"])
+        if hit.get("source"):
+            return self.graph_store.graph.value(predicate=GENESIS.hasSourcePath, object=Literal(hit["source"]))
+        return None
+
+    def graph_expanded_retrieval(
+        self,
+        vector_hits: List[Dict[str, Any]],
+        max_hops: int = 2,
+        max_expanded: int = 10,
+        decay: float = 0.5,
+    ) -> List[Dict[str, Any]]:
+        """
+        Expands the top-k vector search hits with their neighbourhood in the knowledge graph.
+
+        Each hit is mapped to a graph node and seeded with a score of 1 / (1 + _distance).
+        A bounded, weighted BFS over the cached CSR adjacency then adds related blocks and
+        documents, e.g. the other sections of a hit's report.
+
+        Args:
+            vector_hits: LanceDB rows (text, source, document_id, block_index, _distance).
+            max_hops: Maximum graph distance from a hit.
+            max_expanded: Maximum number of graph results added after the hits.
+            decay: Score multiplier per hop.
+
+        Returns:
+            The hits with origin "vector", followed by graph results with origin "graph",
+            each with node, score, text, source and, for blocks, the chunk_id of their
+            LanceDB row.
+        """
+        seeds: Dict[URIRef, float] = {}
+        results: List[Dict[str, Any]] = []
+        for hit in vector_hits:
+            node = self._hit_node(hit)
+            score = 1.0 / (1.0 + float(hit.get("_distance", 0.0)))
+            if node is not None:
+                seeds[node] = max(seeds.get(node, 0.0), score)
+            results.append({**hit, "origin": "vector", "node": node, "score": score})
+
+        expanded = self.adjacency.expand(seeds, max_hops=max_hops, max_nodes=max_expanded * 4, decay=decay)
+        graph = self.graph_store.graph
+        text_nodes = [
+            (node, score) for node, score in expanded
+            if (node, RDF.type, GENESIS.ContentBlock) in graph or (node, RDF.type, GENESIS.Document) in graph
+        ][:max_expanded]
+        contents = self.graph_store.resolve_block_contents(
+            node for node, _ in text_nodes if (node, RDF.type, GENESIS.ContentBlock) in graph
+        )
+        for node, score in text_nodes:
+            chunk_id = None
+            if node in contents:
+                document = graph.value(node, GENESIS.partOf)
+                text = contents[node]
+                chunk_id = make_chunk_id(
+                    str(document)[len(str(GENESIS)):],
+                    GraphStore._block_index(node, {GENESIS.hasBlockIndex: graph.value(node, GENESIS.hasBlockIndex)}),
+                )
+            else:
+                document = node
+                text = str(graph.value(node, RDFS.label) or "")
+            results.append({
+                "origin": "graph",
+                "node": node,
+                "score": score,
+                "text": text,
+                "source": str(graph.value(document, GENESIS.hasSourcePath) or ""),
+                "chunk_id": chunk_id,
+            })
+        return results
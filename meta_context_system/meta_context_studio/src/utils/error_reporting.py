@@ -1,61 +1,263 @@
 import os
+import re
+import atexit
 import datetime
+import hashlib
+import linecache
+import threading
 import traceback
 import platform
 import sys
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
 
 REQUEST_FOR_RESOLUTION_DIR = "request_for_resolution"
 
-def generate_error_report(
-    summary: str,
-    error: Exception,
-    code_context: Dict[str, Any],
-    reproduction_steps: Dict[str, Any],
-    key_dependencies: List[str]
-) -> str:
-    """Generates a structured markdown report for an unhandled exception."""
-    timestamp = datetime.datetime.now().strftime("%Y%m%dT%H%M%S")
-    report_filename = f"resolution_request_{code_context.get('agent_name', 'unknown_agent')}_{timestamp}.md"
-    report_path = os.path.join(REQUEST_FOR_RESOLUTION_DIR, report_filename)
+# Maximum number of distinct sample inputs kept per fingerprint.
+MAX_SAMPLE_INPUTS = 5
+# How often the background writer flushes changed reports to disk, in seconds.
+REPORT_FLUSH_INTERVAL = 2.0
+
+# Variable parts of exception messages (quoted values, paths, addresses, numbers) are
+# replaced so that the same failure on different inputs yields the same template.
+_MESSAGE_TEMPLATE_PATTERNS = [
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "<str>"),
+    (re.compile(r"(?:[A-Za-z]:)?(?:[\\/][\w.\- ]+){2,}"), "<path>"),
+    (re.compile(r"0x[0-9a-fA-F]+"), "<hex>"),
+    (re.compile(r"\b[0-9a-fA-F]{16,}\b"), "<hash>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<num>"),
+]
+
+
+def message_template(message: str) -> str:
+    """Reduces an exception message to a template without input-specific values."""
+    for pattern, placeholder in _MESSAGE_TEMPLATE_PATTERNS:
+        message = pattern.sub(placeholder, message)
+    return message
+
+
+def _innermost_frame(error: BaseException) -> Optional[traceback.FrameSummary]:
+    frames = traceback.extract_tb(error.__traceback__) if error.__traceback__ else []
+    return frames[-1] if frames else None
+
+
+def fingerprint_exception(error: BaseException) -> str:
+    """
+    Computes a stable fingerprint for an exception from its type, the frame that
+    raised it and its message template.
+    """
+    frame = _innermost_frame(error)
+    location = f"{os.path.basename(frame.filename)}:{frame.name}:{frame.lineno}" if frame else "unknown"
+    key = f"{type(error).__module__}.{type(error).__qualname__}|{location}|{message_template(str(error))}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=256)
+def _source_snippet(filename: str, lineno: int, before: int = 2, after: int = 2) -> str:
+    lines = [linecache.getline(filename, n) for n in range(max(1, lineno - before), lineno + after + 1)]
+    return "".join(lines)
+
+
+def extract_code_context(error: BaseException, source_file: str) -> Dict[str, Any]:
+    """
+    Finds the deepest traceback frame of `error` inside `source_file` and returns its
+    file, function and a short source snippet. Snippets are cached per location.
+    """
+    frame = None
+    for entry in traceback.extract_tb(error.__traceback__):
+        if os.path.abspath(entry.filename) == os.path.abspath(source_file):
+            frame = entry
+    if frame is None:
+        return {"file": source_file, "function": "N/A", "snippet": "N/A"}
+    return {
+        "file": source_file,
+        "function": frame.name,
+        "snippet": _source_snippet(frame.filename, frame.lineno),
+    }
+
+
+class AggregatedError:
+    """All occurrences of one fingerprinted failure, rendered as a single report."""
+
+    def __init__(self, fingerprint: str, report_path: str, summary: str, stack_trace: str,
+                 code_context: Dict[str, Any], reproduction_steps: Dict[str, Any], key_dependencies: List[str]):
+        self.fingerprint = fingerprint
+        self.report_path = report_path
+        self.summary = summary
+        self.stack_trace = stack_trace
+        self.code_context = code_context
+        self.reproduction_steps = reproduction_steps
+        self.key_dependencies = key_dependencies
+        self.count = 0
+        self.first_seen = datetime.datetime.now().strftime("%Y%m%dT%H%M%S")
+        self.last_seen = self.first_seen
+        self.sample_inputs: List[str] = []
+        self._restore_previous_occurrences()
 
-    os.makedirs(REQUEST_FOR_RESOLUTION_DIR, exist_ok=True)
+    def _restore_previous_occurrences(self):
+        """Continues the counts of a report written by an earlier run."""
+        if not os.path.exists(self.report_path):
+            return
+        with open(self.report_path, "r", encoding="utf-8") as f:
+            previous = f.read()
+        count = re.search(r"^- Count: (\d+)$", previous, re.MULTILINE)
+        first_seen = re.search(r"^- First Seen: (\S+)$", previous, re.MULTILINE)
+        if count:
+            self.count = int(count.group(1))
+        if first_seen:
+            self.first_seen = first_seen.group(1)
+        self.sample_inputs = re.findall(r"^  - Sample Input: (.+)$", previous, re.MULTILINE)[:MAX_SAMPLE_INPUTS]
 
-    stack_trace = traceback.format_exc()
+    def add_occurrence(self, input_file: Optional[str]):
+        self.count += 1
+        self.last_seen = datetime.datetime.now().strftime("%Y%m%dT%H%M%S")
+        if input_file and input_file not in self.sample_inputs and len(self.sample_inputs) < MAX_SAMPLE_INPUTS:
+            self.sample_inputs.append(input_file)
 
-    report_content = f"""
+    def render(self) -> str:
+        return f"""
 # Request for Resolution
 
 ## Summary
-{summary}
+{self.summary}
 
-## Error & Stack Trace
+## Occurrences
+- Fingerprint: {self.fingerprint}
+- Count: {self.count}
+- First Seen: {self.first_seen}
+- Last Seen: {self.last_seen}
+- Sample Inputs:
+{chr(10).join([f'  - Sample Input: {sample}' for sample in self.sample_inputs]) or '  - N/A'}
+
+## Error & Stack Trace (first occurrence)
 ```python
-{stack_trace}
+{self.stack_trace}
 ```
 
 ## Code Context
-- File: {code_context.get('file', 'N/A')}
-- Function/Method: {code_context.get('function', 'N/A')}
+- File: {self.code_context.get('file', 'N/A')}
+- Function/Method: {self.code_context.get('function', 'N/A')}
 ```python
-{code_context.get('snippet', 'N/A')}
+{self.code_context.get('snippet', 'N/A')}
 ```
 
 ## Reproduction Steps
-- Command: {reproduction_steps.get('command', 'N/A')}
-- Input File: {reproduction_steps.get('input_file', 'N/A')}
+- Command: {self.reproduction_steps.get('command', 'N/A')}
+- Input File: {self.reproduction_steps.get('input_file', 'N/A')}
 
 ## System Environment
 - Python Version: {sys.version}
 - Operating System: {platform.system()} {platform.release()}
 - Key Dependencies:
-{chr(10).join([f'  - {dep}' for dep in key_dependencies])}
+{chr(10).join([f'  - {dep}' for dep in self.key_dependencies])}
 
 ## Intended vs. Actual Behavior
-{reproduction_steps.get('intended_vs_actual', 'N/A')}
+{self.reproduction_steps.get('intended_vs_actual', 'N/A')}
 """
 
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write(report_content)
 
-    return report_path
+class ErrorReportAggregator:
+    """
+    Aggregates failures by fingerprint into one report file each and writes changed
+    reports from a background thread, so a failure storm costs one write per
+    fingerprint per flush interval instead of one file per failure. `close()` stops
+    the thread and writes what is left; it runs at interpreter exit.
+    """
+
+    def __init__(self, report_dir: str = REQUEST_FOR_RESOLUTION_DIR, flush_interval: float = REPORT_FLUSH_INTERVAL):
+        self.report_dir = report_dir
+        self.flush_interval = flush_interval
+        self._errors: Dict[str, AggregatedError] = {}
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def record(
+        self,
+        summary: str,
+        error: BaseException,
+        code_context: Dict[str, Any],
+        reproduction_steps: Dict[str, Any],
+        key_dependencies: List[str],
+    ) -> str:
+        """Records one occurrence and returns the path of the report it is aggregated into."""
+        fingerprint = fingerprint_exception(error)
+        with self._lock:
+            aggregated = self._errors.get(fingerprint)
+            if aggregated is None:
+                agent_name = code_context.get('agent_name', 'unknown_agent')
+                report_path = os.path.join(self.report_dir, f"resolution_request_{agent_name}_{fingerprint}.md")
+                stack_trace = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+                aggregated = AggregatedError(fingerprint, report_path, summary, stack_trace,
+                                             code_context, reproduction_steps, key_dependencies)
+                self._errors[fingerprint] = aggregated
+            aggregated.add_occurrence(reproduction_steps.get('input_file'))
+            self._dirty.add(fingerprint)
+        self._ensure_writer()
+        return aggregated.report_path
+
+    def flush(self):
+        """Writes every changed report to disk."""
+        with self._write_lock:
+            with self._lock:
+                pending = [(self._errors[fp].report_path, self._errors[fp].render()) for fp in self._dirty]
+                self._dirty.clear()
+            if not pending:
+                return
+            os.makedirs(self.report_dir, exist_ok=True)
+            for report_path, content in pending:
+                tmp_path = f"{report_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.replace(tmp_path, report_path)
+
+    def close(self):
+        """Stops the background writer, waits for a write in progress and flushes the rest."""
+        self._stop.set()
+        writer = self._writer
+        if writer is not None and writer is not threading.current_thread():
+            writer.join()
+        self.flush()
+
+    def _ensure_writer(self):
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._lock:
+            if self._stop.is_set():
+                # Closed: reports recorded from now on are written by the caller's flush
+                return
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name="error-report-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"ErrorReportAggregator: Failed to write error reports: {e}")
+
+
+_default_aggregator = ErrorReportAggregator()
+atexit.register(_default_aggregator.close)
+
+
+def generate_error_report(
+    summary: str,
+    error: Exception,
+    code_context: Dict[str, Any],
+    reproduction_steps: Dict[str, Any],
+    key_dependencies: List[str]
+) -> str:
+    """
+    Records an unhandled exception in the structured markdown report for its fingerprint.
+    The report is written asynchronously; call `flush_error_reports()` to force it to disk.
+    """
+    return _default_aggregator.record(summary, error, code_context, reproduction_steps, key_dependencies)
+
+
+def flush_error_reports():
+    """Synchronously writes all pending error reports."""
+    _default_aggregator.flush()
@@ -0,0 +1,135 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+
+class PersistentCache:
+    """
+    In-process LRU cache with an optional time-to-live, optionally backed by a SQLite
+    file so that entries are shared between processes and survive restarts.
+
+    Lookups try the in-process LRU first and then the SQLite file; a value found on disk
+    is promoted into the LRU. Values are pickled on disk. Several caches can share one
+    SQLite file as long as their `namespace` differs. The file is opened in WAL mode, so
+    concurrent readers do not block a writer.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = None,
+        db_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            namespace (str): Name of this cache inside a shared SQLite file.
+            max_entries (int): Size of the in-process LRU.
+            ttl_seconds (Optional[float]): Age after which an entry is treated as missing.
+                None keeps entries until they are evicted.
+            db_path (Optional[str]): SQLite file for persistence. None keeps the cache in
+                process memory only.
+            clock (Callable[[], float]): Source of the current time in seconds.
+        """
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        if db_path:
+            self._open(db_path)
+
+    def _open(self, db_path: str):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, created REAL NOT NULL, value BLOB NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds is not None and self.clock() - created > self.ttl_seconds
+
+    def _remember(self, key: str, created: float, value: Any):
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value for `key`, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                entry = None
+            if entry is None and self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT created, value FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+                if row is not None and not self._expired(row[0]):
+                    entry = (row[0], pickle.loads(row[1]))
+                    self._remember(key, *entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Any):
+        """Stores `value` under `key` in process memory and, if configured, on disk."""
+        created = self.clock()
+        with self._lock:
+            self._remember(key, created, value)
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, created, value) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, created, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)),
+                )
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Returns the cached value for `key`, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def purge_expired(self) -> int:
+        """Deletes expired entries from the SQLite file. Returns the number deleted."""
+        if self._connection is None or self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND created < ?",
+                (self.namespace, self.clock() - self.ttl_seconds),
+            )
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,60 @@
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+class StageTimer:
+    """
+    Collects wall-clock durations for named processing stages (e.g. parse, interpret,
+    commit) so that pipelines can report where their time goes.
+    """
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Times the enclosed block and records it under `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name].append(time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        """Records a duration measured elsewhere."""
+        self.durations[name].append(seconds)
+
+    def reset(self):
+        self.durations.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarizes the recorded durations per stage.
+
+        Returns:
+            Dict[str, Dict[str, float]]: For each stage, the call count and the total,
+            mean, p50, p95 and max latency in milliseconds.
+        """
+        report = {}
+        for name, samples in self.durations.items():
+            ordered = sorted(samples)
+            report[name] = {
+                "count": len(ordered),
+                "total_ms": sum(ordered) * 1000,
+                "mean_ms": sum(ordered) / len(ordered) * 1000,
+                "p50_ms": percentile(ordered, 50) * 1000,
+                "p95_ms": percentile(ordered, 95) * 1000,
+                "max_ms": ordered[-1] * 1000,
+            }
+        return report
+
+
+def percentile(ordered_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list of samples."""
+    if not ordered_samples:
+        return 0.0
+    rank = max(0, min(len(ordered_samples) - 1, math.ceil(pct / 100 * len(ordered_samples)) - 1))
+    return ordered_samples[rank]
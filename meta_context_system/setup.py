@@ -28,6 +28,9 @@ setup(
             'chat-with-kb = meta_context_studio.scripts.chat_with_kb:main',
             'run-ingestion = meta_context_studio.scripts.run_ingestion:main',
             'run-meta-agent = meta_context_studio.scripts.run_meta_agent:main',
+            'requeue-dead-letters = meta_context_studio.scripts.requeue_dead_letters:main',
+            'compute-centrality = meta_context_studio.scripts.compute_centrality:main',
+            'summarize-chunks = meta_context_studio.scripts.summarize_chunks:main',
         ],
     },
 )
\ No newline at end of file